@@ -13,6 +13,8 @@ def create_app():
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
+    # bcrypt work factor for new hashes; logins rehash passwords stored with another factor
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
     
     # Initialize extensions with app
     CORS(app)
@@ -20,6 +22,22 @@ def create_app():
     jwt.init_app(app)
     bcrypt.init_app(app)
     
+    # Request timing, per-stage spans and DB statement counts
+    from app.services.instrumentation import init_instrumentation
+    init_instrumentation(app)
+    
+    # On-demand sampling of the next N requests to a blueprint
+    from app.services.sampling_profiler import init_request_profiler
+    init_request_profiler(app)
+    
+    # Slow-query log and per-request repeated statement detection
+    from app.services.query_profiler import init_query_profiler
+    init_query_profiler(app)
+    
+    # orjson-backed JSON when installed, and gzip/brotli compression of large responses
+    from app.services.response_encoding import init_response_encoding
+    init_response_encoding(app)
+    
     # Import and register blueprints
     from app.routes.auth import auth_bp
     from app.routes.questions import questions_bp
@@ -28,6 +46,9 @@ def create_app():
     from app.routes.syllabus_progress import syllabus_progress_bp
     from app.routes.topper_analysis import topper_analysis_bp
     from app.routes.file_upload import file_upload_bp
+    from app.routes.metrics import metrics_bp
+    from app.routes.admin import admin_bp
+    from app.routes.jobs import jobs_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(questions_bp, url_prefix='/api/questions')
@@ -36,6 +57,9 @@ def create_app():
     app.register_blueprint(syllabus_progress_bp, url_prefix='/api/syllabus-progress')
     app.register_blueprint(topper_analysis_bp, url_prefix='/api/topper-analysis')
     app.register_blueprint(file_upload_bp, url_prefix='/api/file-upload')
+    app.register_blueprint(metrics_bp, url_prefix='/metrics')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
     
     # Database initialization will be done separately
     
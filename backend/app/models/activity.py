@@ -0,0 +1,30 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+from datetime import datetime
+
+class UserStreak(db.Model):
+    """Practice streak state per user, advanced as answers are written (see activity_service)"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    timezone = db.Column(db.String(64), nullable=False, default='UTC')  # IANA name; days roll over at local midnight
+    current_streak = db.Column(db.Integer, nullable=False, default=0)  # Consecutive days ending on last_active_day
+    longest_streak = db.Column(db.Integer, nullable=False, default=0)
+    last_active_day = db.Column(db.Date, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<UserStreak user {self.user_id}: {self.current_streak} days>'
+
+class DailyActivity(db.Model):
+    """Answers and score totals per user per local day, maintained on write (see activity_service)"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    week_start = db.Column(db.Date, nullable=False)  # Monday of the day's week, for weekly downsampling
+    month_start = db.Column(db.Date, nullable=False)  # First of the day's month, for monthly downsampling
+    answers_count = db.Column(db.Integer, nullable=False, default=0)
+    scored_count = db.Column(db.Integer, nullable=False, default=0)  # Answers with an overall score
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)  # Sum of overall scores
+    
+    def __repr__(self):
+        return f'<DailyActivity user {self.user_id} {self.day}: {self.answers_count} answers>'
@@ -19,9 +19,12 @@ class Answer(db.Model):
     
     # Feedback
     feedback = db.Column(db.Text, nullable=True)
-    keywords_used = db.Column(db.Text, nullable=True)  # JSON string of keywords
-    thinkers_mentioned = db.Column(db.Text, nullable=True)  # JSON string of thinkers
-    theories_referenced = db.Column(db.Text, nullable=True)  # JSON string of theories
+    keywords_used = db.Column(db.JSON(none_as_null=True), nullable=True)  # List of keywords
+    thinkers_mentioned = db.Column(db.JSON(none_as_null=True), nullable=True)  # List of thinkers
+    theories_referenced = db.Column(db.JSON(none_as_null=True), nullable=True)  # List of theories
+    structure_features = db.Column(db.Text, nullable=True)  # JSON list, see structure_features.FEATURE_NAMES
+    minhash_signature = db.Column(db.LargeBinary, nullable=True)  # uint32 MinHash values for near-duplicate detection
+    activity_day = db.Column(db.Date, nullable=True)  # Local day the answer was counted on in daily_activity
     
     # Metadata
     topic = db.Column(db.String(100), nullable=True)
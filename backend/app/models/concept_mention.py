@@ -0,0 +1,23 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+
+class ConceptMention(db.Model):
+    """One keyword, thinker or theory extracted from an answer or topper answer (see concept_index)"""
+    id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(10), nullable=False)  # 'keyword', 'thinker' or 'theory'
+    entity = db.Column(db.String(200), nullable=False)  # Lowercased, whitespace collapsed
+    source_type = db.Column(db.String(10), nullable=False)  # 'answer' or 'topper'
+    source_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)  # Owner of answer documents
+    question_id = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_concept_mention_source', 'source_type', 'source_id'),
+        db.Index('ix_concept_mention_user', 'user_id', 'entity_type', 'entity', 'question_id'),
+        db.Index('ix_concept_mention_question', 'question_id', 'source_type', 'entity_type', 'entity'),
+    )
+
+    def __repr__(self):
+        return f'<ConceptMention {self.entity_type}:{self.entity} -> {self.source_type} {self.source_id}>'
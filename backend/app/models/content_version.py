@@ -0,0 +1,23 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+from datetime import datetime
+
+class ContentVersion(db.Model):
+    """Version counter per kind of reference data; bumping it makes every process reload its cached copy"""
+    name = db.Column(db.String(50), primary_key=True)  # e.g. 'syllabus'
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ContentVersion {self.name} v{self.version}>'
+
+class UserDataVersion(db.Model):
+    """Version counter per user, bumped whenever the user's answers or similarity analyses change (see response_cache)"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<UserDataVersion user {self.user_id} v{self.version}>'
@@ -0,0 +1,24 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+
+class LLMJob(db.Model):
+    """State of a background LLM job, shared by every server process (see llm_worker)"""
+    __tablename__ = 'llm_job'
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    kind = db.Column(db.String(20), nullable=False)  # 'evaluation' or 'suggestions'
+    owner_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(10), nullable=False)  # pending, running, completed or failed
+    info = db.Column(db.Text, nullable=True)  # JSON object echoed back with the job, e.g. answer_id
+    result = db.Column(db.Text, nullable=True)  # JSON result once completed
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.Float, nullable=False)  # Unix time
+    finished_at = db.Column(db.Float, nullable=True)  # Unix time
+
+    __table_args__ = (
+        db.Index('ix_llm_job_finished_at', 'finished_at'),
+    )
+
+    def __repr__(self):
+        return f'<LLMJob {self.id} {self.kind}: {self.status}>'
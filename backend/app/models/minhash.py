@@ -0,0 +1,21 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+
+class LshBucket(db.Model):
+    """One LSH band bucket of a MinHash signature for an answer or topper answer"""
+    id = db.Column(db.Integer, primary_key=True)
+    band = db.Column(db.Integer, nullable=False)
+    bucket = db.Column(db.BigInteger, nullable=False)
+    source_type = db.Column(db.String(10), nullable=False)  # 'answer' or 'topper'
+    source_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)  # Owner of answer documents
+    
+    __table_args__ = (
+        db.Index('ix_lsh_bucket_band_bucket', 'band', 'bucket'),
+        db.Index('ix_lsh_bucket_source', 'source_type', 'source_id'),
+    )
+    
+    def __repr__(self):
+        return f'<LshBucket {self.band}:{self.bucket} -> {self.source_type} {self.source_id}>'
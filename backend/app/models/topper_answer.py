@@ -16,9 +16,11 @@ class TopperAnswer(db.Model):
     
     # Answer content
     answer_text = db.Column(db.Text, nullable=False)
-    keywords_used = db.Column(db.Text, nullable=True)  # JSON string
-    thinkers_mentioned = db.Column(db.Text, nullable=True)  # JSON string
-    theories_referenced = db.Column(db.Text, nullable=True)  # JSON string
+    keywords_used = db.Column(db.JSON(none_as_null=True), nullable=True)  # List of keywords
+    thinkers_mentioned = db.Column(db.JSON(none_as_null=True), nullable=True)  # List of thinkers
+    theories_referenced = db.Column(db.JSON(none_as_null=True), nullable=True)  # List of theories
+    structure_features = db.Column(db.Text, nullable=True)  # JSON list, see structure_features.FEATURE_NAMES
+    minhash_signature = db.Column(db.LargeBinary, nullable=True)  # uint32 MinHash values for near-duplicate detection
     
     # Analysis features
     word_count = db.Column(db.Integer, nullable=True)
@@ -70,7 +72,8 @@ class AnswerSimilarity(db.Model):
     
     # Feedback
     feedback_text = db.Column(db.Text, nullable=True)
-    improvement_suggestions = db.Column(db.Text, nullable=True)  # JSON string
+    improvement_suggestions = db.Column(db.JSON(none_as_null=True), nullable=True)  # List of suggestions
+    ranked_matches = db.Column(db.Text, nullable=True)  # Compact JSON: [[topper_id, overall, content, keyword, structure, theory], ...]
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -0,0 +1,79 @@
+from flask import Blueprint, Response, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from functools import wraps
+import os
+from app.services.sampling_profiler import (
+    profile_process, request_profiler, MAX_PROFILE_SECONDS
+)
+from app.services.evaluation_policy import evaluation_stats
+from app.services.llm_worker import get_llm_worker
+
+admin_bp = Blueprint('admin', __name__)
+
+def admin_user_ids():
+    """User ids allowed to call admin endpoints, from ADMIN_USER_IDS (comma separated)"""
+    return {value.strip() for value in os.environ.get('ADMIN_USER_IDS', '').split(',') if value.strip()}
+
+def admin_required(fn):
+    """Require a valid JWT whose identity is listed in ADMIN_USER_IDS"""
+    @wraps(fn)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if str(get_jwt_identity()) not in admin_user_ids():
+            return jsonify({'error': 'Admin access required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+@admin_bp.route('/profile', methods=['POST'])
+@admin_required
+def profile_process_endpoint():
+    """Sample the live process for a bounded time and return collapsed stacks"""
+    seconds = request.args.get('seconds', 5, type=float)
+    interval_ms = request.args.get('interval_ms', 5, type=float)
+    include_idle = request.args.get('include_idle', 'false').lower() == 'true'
+    
+    if seconds <= 0 or seconds > MAX_PROFILE_SECONDS:
+        return jsonify({'error': f'seconds must be between 0 and {MAX_PROFILE_SECONDS}'}), 400
+    
+    profiler = profile_process(seconds, interval=interval_ms / 1000, include_idle=include_idle)
+    if profiler is None:
+        return jsonify({'error': 'A profile is already running'}), 409
+    
+    return Response(profiler.collapsed(), mimetype='text/plain', headers={
+        'X-Profile-Samples': str(profiler.samples)
+    })
+
+@admin_bp.route('/profile/requests', methods=['POST'])
+@admin_required
+def arm_request_profile():
+    """Profile the next N requests handled by a blueprint"""
+    data = request.get_json() or {}
+    blueprint = data.get('blueprint')
+    count = data.get('count', 10)
+    interval_ms = data.get('interval_ms', 2)
+    
+    if blueprint not in current_app.blueprints:
+        return jsonify({'error': f'Unknown blueprint: {blueprint}', 'blueprints': sorted(current_app.blueprints)}), 400
+    if blueprint == admin_bp.name:
+        return jsonify({'error': 'Cannot profile the admin blueprint'}), 400
+    if not isinstance(count, int) or not 1 <= count <= 1000:
+        return jsonify({'error': 'count must be an integer between 1 and 1000'}), 400
+    
+    request_profiler.arm(blueprint, count, interval=max(float(interval_ms), 1) / 1000)
+    
+    return jsonify({'message': 'Request profiling armed', 'status': request_profiler.status()}), 202
+
+@admin_bp.route('/profile/requests', methods=['GET'])
+@admin_required
+def get_request_profile():
+    """Status of the armed request profile, or its collapsed stacks with ?format=collapsed"""
+    if request.args.get('format') == 'collapsed':
+        return Response(request_profiler.collapsed(), mimetype='text/plain')
+    
+    return jsonify({'status': request_profiler.status()}), 200
+
+@admin_bp.route('/evaluation-stats', methods=['GET'])
+@admin_required
+def get_evaluation_stats():
+    """Evaluation counts per tier, LLM token usage and estimated cost since start, and background jobs"""
+    return jsonify(dict(evaluation_stats(), llm_worker=get_llm_worker().stats())), 200
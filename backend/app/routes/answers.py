@@ -1,9 +1,19 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from concurrent.futures import ThreadPoolExecutor
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.answer import Answer
 from app.models.question import Question
-from app.services.evaluation_service import evaluate_answer
+from app.services.evaluation_service import (
+    begin_evaluation, evaluate_answer, finish_evaluation_async, stream_evaluate_answer
+)
+from app.services.llm_worker import get_llm_worker
 from app.services.similarity_service import SimilarityAnalysisService
+from app.services.structure_features import extract_structure_features
+from app.services.minhash_service import NearDuplicateService, SOURCE_ANSWER
+from app.services.instrumentation import span
+from app.services.activity_service import record_answer_activity, record_answer_score
+from app.services.response_cache import bump_user_data_version
+from app.services.concept_index import index_answer
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -12,6 +22,78 @@ from datetime import datetime
 import json
 
 answers_bp = Blueprint('answers', __name__)
+near_duplicate_service = NearDuplicateService()
+
+BATCH_MAX_ANSWERS = int(os.environ.get('BATCH_MAX_ANSWERS', 50))
+BATCH_EVALUATION_WORKERS = int(os.environ.get('BATCH_EVALUATION_WORKERS', 8))
+
+def public_near_duplicates(duplicates, user_id):
+    """Near-duplicate flags safe to return to a user: other users' answers stay anonymous"""
+    return [
+        {
+            'source_type': d['source_type'],
+            'source_id': d['source_id'] if d['source_type'] != SOURCE_ANSWER or str(d['user_id']) == str(user_id) else None,
+            'own_answer': d['source_type'] == SOURCE_ANSWER and str(d['user_id']) == str(user_id),
+            'similarity': d['similarity']
+        }
+        for d in duplicates
+    ]
+
+def create_answer(user_id, question, answer_text, file_path=None, topic=None):
+    """Insert an answer, index its MinHash signature and commit; returns (answer, near_duplicates)"""
+    new_answer = Answer(
+        user_id=user_id,
+        question_id=question.id,
+        answer_text=answer_text,
+        file_path=file_path,
+        topic=topic or question.topic,
+        structure_features=json.dumps(extract_structure_features(answer_text))
+    )
+    
+    with span('db_insert'):
+        db.session.add(new_answer)
+        
+        # Fingerprint the answer and look for near-duplicates across the corpus
+        signature = near_duplicate_service.index_answer(new_answer)
+        record_answer_activity(new_answer)
+        bump_user_data_version(user_id)
+    with span('near_duplicates'):
+        near_duplicates = near_duplicate_service.find_near_duplicates(
+            signature, exclude=(SOURCE_ANSWER, new_answer.id)
+        )
+    with span('db_commit'):
+        db.session.commit()
+    
+    return new_answer, near_duplicates
+
+def apply_evaluation(answer, evaluation_result):
+    """Copy evaluation scores and extracted terms onto an answer (caller commits)"""
+    previous_score = answer.overall_score
+    answer.structure_score = evaluation_result['structure_score']
+    answer.content_score = evaluation_result['content_score']
+    answer.sociological_depth_score = evaluation_result['sociological_depth_score']
+    answer.overall_score = evaluation_result['overall_score']
+    answer.feedback = evaluation_result['feedback']
+    answer.keywords_used = evaluation_result['keywords_used']
+    answer.thinkers_mentioned = evaluation_result['thinkers_mentioned']
+    answer.theories_referenced = evaluation_result['theories_referenced']
+    answer.evaluated_at = datetime.utcnow()
+    index_answer(answer)
+    record_answer_score(answer, previous_score)
+    bump_user_data_version(answer.user_id)
+
+def parse_question_id(value):
+    """Question id as an int, accepting numeric strings like /submit does; None when unusable"""
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def format_sse(event, data):
+    """One server-sent event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 @answers_bp.route('/submit', methods=['POST'])
 @jwt_required()
@@ -34,45 +116,34 @@ def submit_answer():
         return jsonify({'error': 'Question not found'}), 404
     
     try:
-        # Create new answer
-        new_answer = Answer(
-            user_id=user_id,
-            question_id=question_id,
-            answer_text=answer_text,
-            file_path=file_path,
-            topic=topic or question.topic
-        )
-        
-        db.session.add(new_answer)
-        db.session.commit()
+        new_answer, near_duplicates = create_answer(user_id, question, answer_text, file_path, topic)
         
         # Evaluate the answer (placeholder for now)
-        evaluation_result = evaluate_answer(answer_text, question)
+        with span('evaluation'):
+            evaluation_result = evaluate_answer(
+                answer_text, question, near_duplicates=near_duplicates, user_id=user_id
+            )
         
         # Update answer with evaluation results
-        new_answer.structure_score = evaluation_result['structure_score']
-        new_answer.content_score = evaluation_result['content_score']
-        new_answer.sociological_depth_score = evaluation_result['sociological_depth_score']
-        new_answer.overall_score = evaluation_result['overall_score']
-        new_answer.feedback = evaluation_result['feedback']
-        new_answer.keywords_used = json.dumps(evaluation_result['keywords_used'])
-        new_answer.thinkers_mentioned = json.dumps(evaluation_result['thinkers_mentioned'])
-        new_answer.theories_referenced = json.dumps(evaluation_result['theories_referenced'])
-        new_answer.evaluated_at = datetime.utcnow()
+        apply_evaluation(new_answer, evaluation_result)
         
-        db.session.commit()
+        with span('db_commit_scores'):
+            db.session.commit()
         
         # Trigger topper analysis
         try:
-            similarity_service = SimilarityAnalysisService()
-            analysis_result = similarity_service.analyze_user_answer(new_answer.id)
+            with span('similarity_init'):
+                similarity_service = SimilarityAnalysisService()
+            with span('similarity_analysis'):
+                analysis_result = similarity_service.analyze_user_answer(new_answer.id)
             
             # Add analysis info to response
             response_data = {
                 'message': 'Answer submitted and evaluated successfully',
                 'answer': new_answer.to_dict(),
                 'evaluation': evaluation_result,
-                'topper_analysis': analysis_result if 'error' not in analysis_result else None
+                'topper_analysis': analysis_result if 'error' not in analysis_result else None,
+                'near_duplicates': public_near_duplicates(near_duplicates, user_id)
             }
         except Exception as analysis_error:
             print(f"Topper analysis failed: {analysis_error}")
@@ -80,7 +151,8 @@ def submit_answer():
                 'message': 'Answer submitted and evaluated successfully',
                 'answer': new_answer.to_dict(),
                 'evaluation': evaluation_result,
-                'topper_analysis': None
+                'topper_analysis': None,
+                'near_duplicates': public_near_duplicates(near_duplicates, user_id)
             }
         
         return jsonify(response_data), 201
@@ -89,6 +161,332 @@ def submit_answer():
         db.session.rollback()
         return jsonify({'error': 'Failed to submit answer'}), 500
 
+@answers_bp.route('/submit/stream', methods=['POST'])
+@jwt_required()
+def submit_answer_stream():
+    """Submit an answer and stream its evaluation as server-sent events.
+
+    Events: answer (id and near-duplicates), local (instant local scores), tier,
+    token / field (LLM output as it arrives, when escalated), result (saved
+    evaluation), topper_analysis, then done. Failures send an error event.
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data or not all(k in data for k in ['question_id', 'answer_text']):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    answer_text = data['answer_text']
+    question = Question.query.get(data['question_id'])
+    if not question:
+        return jsonify({'error': 'Question not found'}), 404
+    
+    try:
+        new_answer, near_duplicates = create_answer(
+            user_id, question, answer_text, data.get('file_path'), data.get('topic')
+        )
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to submit answer'}), 500
+    
+    def events():
+        evaluation = stream_evaluate_answer(
+            answer_text, question, near_duplicates=near_duplicates, user_id=user_id
+        )
+        evaluation_result = None
+        try:
+            yield format_sse('answer', {
+                'answer_id': new_answer.id,
+                'near_duplicates': public_near_duplicates(near_duplicates, user_id)
+            })
+            for event, payload in evaluation:
+                if event == 'result':
+                    evaluation_result = payload
+                else:
+                    yield format_sse(event, payload)
+            
+            apply_evaluation(new_answer, evaluation_result)
+            db.session.commit()
+        except GeneratorExit:
+            # The client went away mid-stream: finish the evaluation unstreamed and still save it
+            if evaluation_result is None:
+                _save_streamed_evaluation(new_answer, evaluation)
+            raise
+        except Exception as e:
+            db.session.rollback()
+            print(f"Streamed evaluation failed: {e}")
+            yield format_sse('error', {'error': 'Failed to evaluate answer', 'answer_id': new_answer.id})
+            return
+        
+        yield format_sse('result', {'answer': new_answer.to_dict(), 'evaluation': evaluation_result})
+        
+        try:
+            analysis_result = SimilarityAnalysisService().analyze_user_answer(new_answer.id)
+            yield format_sse('topper_analysis', analysis_result if 'error' not in analysis_result else None)
+        except Exception as analysis_error:
+            print(f"Topper analysis failed: {analysis_error}")
+            yield format_sse('topper_analysis', None)
+        yield format_sse('done', {})
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+def _save_streamed_evaluation(answer, evaluation):
+    """Drain a stream_evaluate_answer generator and persist its result"""
+    try:
+        for event, payload in evaluation:
+            if event == 'result':
+                apply_evaluation(answer, payload)
+                db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Streamed evaluation failed after disconnect: {e}")
+
+def _save_job_evaluation(app, answer_id, evaluation_result):
+    """Persist a background evaluation and run topper analysis; the job's result"""
+    with app.app_context():
+        answer = db.session.get(Answer, answer_id)
+        apply_evaluation(answer, evaluation_result)
+        db.session.commit()
+        
+        try:
+            analysis_result = SimilarityAnalysisService().analyze_user_answer(answer_id)
+            analysis_result = analysis_result if 'error' not in analysis_result else None
+        except Exception as analysis_error:
+            print(f"Topper analysis failed: {analysis_error}")
+            analysis_result = None
+        
+        return {
+            'answer': answer.to_dict(),
+            'evaluation': evaluation_result,
+            'topper_analysis': analysis_result
+        }
+
+async def _evaluation_job(app, answer_id, answer_text, question_text, tier, local_result):
+    evaluation_result = await finish_evaluation_async(answer_text, question_text, tier, local_result)
+    return await get_llm_worker().run_blocking(_save_job_evaluation, app, answer_id, evaluation_result)
+
+@answers_bp.route('/submit/async', methods=['POST'])
+@jwt_required()
+def submit_answer_async():
+    """Submit an answer and evaluate it in the background.
+
+    Answers the local tiers settle are evaluated inline and returned with 201,
+    like /submit. Answers escalated to the LLM return 202 with the local scores
+    and a job id; poll GET /api/jobs/<job_id> for the final evaluation.
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data or not all(k in data for k in ['question_id', 'answer_text']):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    answer_text = data['answer_text']
+    question = Question.query.get(data['question_id'])
+    if not question:
+        return jsonify({'error': 'Question not found'}), 404
+    
+    try:
+        new_answer, near_duplicates = create_answer(
+            user_id, question, answer_text, data.get('file_path'), data.get('topic')
+        )
+        with span('evaluation'):
+            tier, local_result, evaluation_result = begin_evaluation(
+                answer_text, question, near_duplicates=near_duplicates, user_id=user_id
+            )
+        
+        if evaluation_result is not None:
+            apply_evaluation(new_answer, evaluation_result)
+            with span('db_commit_scores'):
+                db.session.commit()
+            return jsonify({
+                'message': 'Answer submitted and evaluated successfully',
+                'answer': new_answer.to_dict(),
+                'evaluation': evaluation_result,
+                'near_duplicates': public_near_duplicates(near_duplicates, user_id)
+            }), 201
+        
+        job_id = get_llm_worker().submit(
+            _evaluation_job(
+                current_app._get_current_object(), new_answer.id, answer_text,
+                question.question_text, tier, local_result
+            ),
+            owner_id=user_id,
+            kind='evaluation',
+            answer_id=new_answer.id
+        )
+        return jsonify({
+            'message': 'Answer submitted; evaluation in progress',
+            'job_id': job_id,
+            'status_url': f'/api/jobs/{job_id}',
+            'answer': new_answer.to_dict(),
+            'tier': tier,
+            'local_evaluation': local_result,
+            'near_duplicates': public_near_duplicates(near_duplicates, user_id)
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Async answer submission failed: {e}")
+        return jsonify({'error': 'Failed to submit answer'}), 500
+
+@answers_bp.route('/submit/batch', methods=['POST'])
+@jwt_required()
+def submit_answer_batch():
+    """Submit many answers (e.g. a mock test) in one request.
+
+    Answers are inserted together, evaluated concurrently (LLM calls share the
+    process-wide limiter) and analysed against topper answers grouped by question.
+    The manifest has one entry per submitted item, in order; a failure on one item
+    does not affect the others.
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    items = data.get('answers')
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'answers must be a non-empty list'}), 400
+    if len(items) > BATCH_MAX_ANSWERS:
+        return jsonify({'error': f'At most {BATCH_MAX_ANSWERS} answers per batch'}), 400
+    
+    requested_ids = {parse_question_id(item.get('question_id')) for item in items if isinstance(item, dict)}
+    requested_ids.discard(None)
+    questions = {q.id: q for q in Question.query.filter(Question.id.in_(requested_ids)).all()}
+    
+    manifest = []
+    accepted = []
+    for index, item in enumerate(items):
+        entry = {'index': index, 'client_ref': item.get('client_ref') if isinstance(item, dict) else None}
+        manifest.append(entry)
+        if not isinstance(item, dict) or not all(k in item for k in ['question_id', 'answer_text']):
+            entry.update(status='rejected', error='Missing required fields')
+            continue
+        if not isinstance(item['answer_text'], str) or not item['answer_text'].strip():
+            entry.update(status='rejected', error='answer_text must be a non-empty string')
+            continue
+        question_id = parse_question_id(item['question_id'])
+        if question_id is None:
+            entry.update(status='rejected', error='Invalid question_id')
+            continue
+        question = questions.get(question_id)
+        if question is None:
+            entry.update(status='rejected', error='Question not found')
+            continue
+        accepted.append((entry, question, item))
+    
+    if not accepted:
+        return jsonify({'error': 'No valid answers in batch', 'results': manifest}), 400
+    
+    try:
+        with span('db_insert'):
+            new_answers = []
+            for entry, question, item in accepted:
+                new_answer = Answer(
+                    user_id=user_id,
+                    question_id=question.id,
+                    answer_text=item['answer_text'],
+                    file_path=item.get('file_path'),
+                    topic=item.get('topic') or question.topic,
+                    structure_features=json.dumps(extract_structure_features(item['answer_text']))
+                )
+                db.session.add(new_answer)
+                new_answers.append(new_answer)
+            db.session.flush()
+            signatures = [near_duplicate_service.index_answer(answer) for answer in new_answers]
+            for answer in new_answers:
+                record_answer_activity(answer)
+            bump_user_data_version(user_id)
+        with span('near_duplicates'):
+            near_duplicates = [
+                near_duplicate_service.find_near_duplicates(signature, exclude=(SOURCE_ANSWER, answer.id))
+                for answer, signature in zip(new_answers, signatures)
+            ]
+        # Plain values for the worker threads, which use their own sessions
+        jobs = [(answer.id, answer.question_id, answer.answer_text) for answer in new_answers]
+        with span('db_commit'):
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Batch insert failed: {e}")
+        return jsonify({'error': 'Failed to submit answers'}), 500
+    
+    app = current_app._get_current_object()
+    
+    def evaluate(position):
+        answer_id, question_id, answer_text = jobs[position]
+        with app.app_context():
+            return evaluate_answer(
+                answer_text, db.session.get(Question, question_id),
+                near_duplicates=near_duplicates[position], user_id=user_id
+            )
+    
+    with span('evaluation'):
+        with ThreadPoolExecutor(max_workers=min(BATCH_EVALUATION_WORKERS, len(jobs))) as pool:
+            futures = [pool.submit(evaluate, position) for position in range(len(jobs))]
+        evaluations = []
+        for (answer_id, _, _), future in zip(jobs, futures):
+            try:
+                evaluations.append(future.result())
+            except Exception as e:
+                print(f"Batch evaluation failed for answer {answer_id}: {e}")
+                evaluations.append(None)
+    
+    # One query reloads the rows expired by the insert commit; apply_evaluation reads them
+    reloaded = {answer.id: answer for answer in Answer.query.filter(Answer.id.in_([job[0] for job in jobs]))}
+    
+    evaluated = []
+    for (entry, _, _), (answer_id, _, _), evaluation, duplicates in zip(
+        accepted, jobs, evaluations, near_duplicates
+    ):
+        entry.update(answer_id=answer_id, near_duplicates=public_near_duplicates(duplicates, user_id))
+        if evaluation is None:
+            entry.update(status='evaluation_failed', error='Failed to evaluate answer')
+            continue
+        apply_evaluation(reloaded[answer_id], evaluation)
+        entry.update(status='evaluated', evaluation=evaluation)
+        evaluated.append(answer_id)
+    
+    try:
+        with span('db_commit_scores'):
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Saving batch evaluations failed: {e}")
+        for entry in manifest:
+            if entry.get('status') == 'evaluated':
+                entry.update(status='evaluation_failed', error='Failed to save evaluation')
+                entry.pop('evaluation', None)
+        evaluated = []
+    
+    analyses = {}
+    if evaluated:
+        try:
+            with span('similarity_analysis'):
+                # One query reloads the rows expired by the commit
+                analyses = SimilarityAnalysisService().analyze_answers(
+                    Answer.query.filter(Answer.id.in_(evaluated)).all()
+                )
+        except Exception as analysis_error:
+            db.session.rollback()
+            print(f"Batch topper analysis failed: {analysis_error}")
+    for entry in manifest:
+        if entry.get('status') == 'evaluated':
+            entry['topper_analysis'] = analyses.get(entry['answer_id'])
+    
+    statuses = [entry['status'] for entry in manifest]
+    return jsonify({
+        'message': 'Batch processed',
+        'summary': {
+            'submitted': len(items),
+            'evaluated': statuses.count('evaluated'),
+            'evaluation_failed': statuses.count('evaluation_failed'),
+            'rejected': statuses.count('rejected')
+        },
+        'results': manifest
+    }), 201
+
 @answers_bp.route('/history', methods=['GET'])
 @jwt_required()
 def get_answer_history():
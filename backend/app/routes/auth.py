@@ -1,14 +1,23 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-from extensions import db, bcrypt
+from extensions import db
 from app.models.user import User
+from app.services.password_hashing import (
+    DEFAULT_LOG_ROUNDS, PasswordHasherBusy, login_throttle, needs_rehash, password_hasher
+)
 import re
 
 auth_bp = Blueprint('auth', __name__)
 
+def log_rounds():
+    return current_app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_LOG_ROUNDS)
+
+def busy_response():
+    return jsonify({'error': 'Server is busy, please try again shortly'}), 503, {'Retry-After': '1'}
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -37,8 +46,11 @@ def register():
     if User.query.filter_by(email=email).first():
         return jsonify({'error': 'Email already registered'}), 409
     
-    # Create new user
-    password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+    # Create new user; hashing runs on the bounded password hashing pool
+    try:
+        password_hash = password_hasher.hash(password, log_rounds())
+    except PasswordHasherBusy:
+        return busy_response()
     new_user = User(username=username, email=email, password_hash=password_hash)
     
     try:
@@ -72,14 +84,38 @@ def login():
     username = data['username'].strip()
     password = data['password']
     
+    # Addresses with too many recent failures are turned away before any hashing
+    address = request.remote_addr or ''
+    retry_after = login_throttle.retry_after(address)
+    if retry_after:
+        return jsonify({'error': 'Too many failed login attempts, please try again later'}), 429, {
+            'Retry-After': str(retry_after)
+        }
+    
     # Find user by username or email
     user = User.query.filter(
         (User.username == username) | (User.email == username)
     ).first()
     
-    if not user or not bcrypt.check_password_hash(user.password_hash, password):
+    try:
+        valid = user is not None and password_hasher.check(user.password_hash, password)
+    except PasswordHasherBusy:
+        return busy_response()
+    
+    if not valid:
+        login_throttle.record_failure(address)
         return jsonify({'error': 'Invalid credentials'}), 401
     
+    # Upgrade hashes made with another work factor while the password is at hand
+    rounds = log_rounds()
+    if needs_rehash(user.password_hash, rounds):
+        try:
+            user.password_hash = password_hasher.hash(password, rounds)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Password rehash failed for user {user.id}: {e}")
+    
     # Generate token
     access_token = create_access_token(identity=user.id)
     
@@ -9,7 +9,13 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from extensions import db
 from app.models.answer import Answer
 from app.models.question import Question
-from app.services.evaluation_service import evaluate_uploaded_file, get_ai_suggestions
+from app.services.evaluation_service import (
+    evaluate_uploaded_file, get_ai_suggestions, get_ai_suggestions_async, llm_configured
+)
+from app.services.llm_worker import get_llm_worker
+from app.services.activity_service import record_answer_activity
+from app.services.response_cache import bump_user_data_version
+from app.services.concept_index import index_answer
 
 file_upload_bp = Blueprint('file_upload', __name__)
 
@@ -81,13 +87,16 @@ def upload_answer():
                 sociological_depth_score=evaluation_result.get('sociological_depth_score'),
                 overall_score=evaluation_result.get('overall_score'),
                 feedback=evaluation_result.get('feedback'),
-                keywords_used=str(evaluation_result.get('keywords_used', [])),
-                thinkers_mentioned=str(evaluation_result.get('thinkers_mentioned', [])),
-                theories_referenced=str(evaluation_result.get('theories_referenced', [])),
+                keywords_used=evaluation_result.get('keywords_used', []),
+                thinkers_mentioned=evaluation_result.get('thinkers_mentioned', []),
+                theories_referenced=evaluation_result.get('theories_referenced', []),
                 evaluated_at=datetime.utcnow()
             )
             
             db.session.add(new_answer)
+            index_answer(new_answer)
+            record_answer_activity(new_answer)
+            bump_user_data_version(user_id)
             db.session.commit()
             
             return jsonify({
@@ -131,6 +140,34 @@ def get_suggestions():
     except Exception as e:
         return jsonify({'error': f'Failed to get suggestions: {str(e)}'}), 500
 
+@file_upload_bp.route('/get-suggestions/async', methods=['POST'])
+@jwt_required()
+def get_suggestions_async():
+    """Queue AI suggestions for an answer; poll GET /api/jobs/<job_id> for them"""
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data or not all(k in data for k in ['answer_text', 'question_id']):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    question = Question.query.get(data['question_id'])
+    if not question:
+        return jsonify({'error': 'Question not found'}), 404
+    if not llm_configured():
+        return jsonify({'error': 'AI suggestions require ChatGPT API'}), 503
+    
+    try:
+        job_id = get_llm_worker().submit(
+            get_ai_suggestions_async(data['answer_text'], question.question_text),
+            owner_id=user_id,
+            kind='suggestions',
+            question_id=question.id
+        )
+        return jsonify({'job_id': job_id, 'status_url': f'/api/jobs/{job_id}'}), 202
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to queue suggestions: {str(e)}'}), 500
+
 @file_upload_bp.route('/download/<int:answer_id>', methods=['GET'])
 @jwt_required()
 def download_answer_file(answer_id):
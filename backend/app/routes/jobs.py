@@ -0,0 +1,22 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.llm_worker import get_llm_worker, JOB_COMPLETED, JOB_FAILED
+
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """Status of a background LLM job; the result is included once it completes"""
+    user_id = get_jwt_identity()
+    
+    job = get_llm_worker().get(job_id)
+    if not job or job['owner_id'] != str(user_id):
+        return jsonify({'error': 'Job not found'}), 404
+    
+    response = {k: v for k, v in job.items() if k not in ('owner_id', 'result', 'error')}
+    if job['status'] == JOB_COMPLETED:
+        response['result'] = job['result']
+    elif job['status'] == JOB_FAILED:
+        response['error'] = 'Job failed'
+    return jsonify(response), 200
@@ -0,0 +1,14 @@
+from flask import Blueprint, Response, request, jsonify
+import os
+from app.services.instrumentation import render_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('', methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition of request, stage, outbound and DB metrics"""
+    token = os.environ.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
@@ -1,66 +1,51 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models.answer import Answer
+from app.models.activity import UserStreak
+from app.services.activity_service import activity_timeline, streak_summary, TIMELINE_GRANULARITIES
+from app.services.progress_service import user_aggregates, rounded, LEVEL_ALL, LEVEL_TOPIC
+from app.services.concept_index import user_concept_coverage, ENTITY_TYPES
+from app.services.response_cache import cached_response
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from extensions import db
-from sqlalchemy import func
-from datetime import datetime, timedelta
-import json
 
 progress_bp = Blueprint('progress', __name__)
 
+MAX_TIMELINE_DAYS = 366
+MAX_CONCEPTS = 500
+
 @progress_bp.route('/summary', methods=['GET'])
 @jwt_required()
+@cached_response()
 def get_progress_summary():
     """Get overall progress summary"""
     user_id = get_jwt_identity()
     
     try:
-        # Total answers submitted
-        total_answers = Answer.query.filter_by(user_id=user_id).count()
-        
-        # Average scores
-        avg_scores = db.session.query(
-            func.avg(Answer.structure_score).label('avg_structure'),
-            func.avg(Answer.content_score).label('avg_content'),
-            func.avg(Answer.sociological_depth_score).label('avg_depth'),
-            func.avg(Answer.overall_score).label('avg_overall')
-        ).filter_by(user_id=user_id).first()
-        
-        # Topics practiced
-        topics = db.session.query(Answer.topic).filter_by(user_id=user_id).distinct().count()
-        
-        # Recent activity (last 7 days)
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_answers = Answer.query.filter(
-            Answer.user_id == user_id,
-            Answer.submitted_at >= week_ago
-        ).count()
+        # Totals, averages, recent activity and per-topic averages in one statement
+        aggregates = user_aggregates(user_id, levels=(LEVEL_ALL, LEVEL_TOPIC))
+        totals = aggregates[LEVEL_ALL]
         
         # Best performing topic
-        topic_performance = db.session.query(
-            Answer.topic,
-            func.avg(Answer.overall_score).label('avg_score')
-        ).filter_by(user_id=user_id).group_by(Answer.topic).order_by(
-            func.avg(Answer.overall_score).desc()
-        ).first()
+        scored_topics = [(name, row['avg_overall']) for name, row in aggregates[LEVEL_TOPIC].items()
+                         if row['avg_overall'] is not None]
+        best_topic = max(scored_topics, key=lambda item: item[1]) if scored_topics else None
         
         return jsonify({
             'summary': {
-                'total_answers': total_answers,
-                'topics_practiced': topics,
-                'recent_answers': recent_answers,
+                'total_answers': totals['answers_count'],
+                'topics_practiced': len(aggregates[LEVEL_TOPIC]),
+                'recent_answers': totals['recent_count'],
                 'average_scores': {
-                    'structure': round(avg_scores.avg_structure, 2) if avg_scores.avg_structure else 0,
-                    'content': round(avg_scores.avg_content, 2) if avg_scores.avg_content else 0,
-                    'sociological_depth': round(avg_scores.avg_depth, 2) if avg_scores.avg_depth else 0,
-                    'overall': round(avg_scores.avg_overall, 2) if avg_scores.avg_overall else 0
+                    'structure': rounded(totals['avg_structure']),
+                    'content': rounded(totals['avg_content']),
+                    'sociological_depth': rounded(totals['avg_depth']),
+                    'overall': rounded(totals['avg_overall'])
                 },
                 'best_topic': {
-                    'name': topic_performance.topic if topic_performance else None,
-                    'score': round(topic_performance.avg_score, 2) if topic_performance else 0
+                    'name': best_topic[0] if best_topic else None,
+                    'score': rounded(best_topic[1]) if best_topic else 0
                 }
             }
         }), 200
@@ -70,40 +55,20 @@ def get_progress_summary():
 
 @progress_bp.route('/timeline', methods=['GET'])
 @jwt_required()
+@cached_response()
 def get_progress_timeline():
-    """Get progress timeline data"""
+    """Get progress timeline data, per day, week or month over the last `days` days"""
     user_id = get_jwt_identity()
     
+    # Get query parameters
+    days = min(max(request.args.get('days', 30, type=int), 1), MAX_TIMELINE_DAYS)
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in TIMELINE_GRANULARITIES:
+        return jsonify({'error': f"granularity must be one of {', '.join(TIMELINE_GRANULARITIES)}"}), 400
+    
     try:
-        # Get query parameters
-        days = request.args.get('days', 30, type=int)
-        start_date = datetime.utcnow() - timedelta(days=days)
-        
-        # Get answers grouped by date
-        timeline_data = db.session.query(
-            func.date(Answer.submitted_at).label('date'),
-            func.count(Answer.id).label('answers_count'),
-            func.avg(Answer.overall_score).label('avg_score')
-        ).filter(
-            Answer.user_id == user_id,
-            Answer.submitted_at >= start_date
-        ).group_by(func.date(Answer.submitted_at)).order_by(
-            func.date(Answer.submitted_at)
-        ).all()
-        
-        timeline = []
-        for data in timeline_data:
-            # Handle both string and datetime objects
-            date_str = data.date.isoformat() if hasattr(data.date, 'isoformat') else str(data.date)
-            timeline.append({
-                'date': date_str,
-                'answers_count': data.answers_count,
-                'average_score': round(data.avg_score, 2) if data.avg_score else 0
-            })
-        
-        return jsonify({
-            'timeline': timeline
-        }), 200
+        # Daily buckets are maintained on write; weeks and months are grouped in SQL
+        return jsonify(activity_timeline(user_id, days, granularity)), 200
         
     except Exception as e:
         print(f"Timeline API Error: {str(e)}")
@@ -111,30 +76,24 @@ def get_progress_timeline():
 
 @progress_bp.route('/topics', methods=['GET'])
 @jwt_required()
+@cached_response()
 def get_topic_progress():
     """Get progress by topic"""
     user_id = get_jwt_identity()
     
     try:
-        topic_progress = db.session.query(
-            Answer.topic,
-            func.count(Answer.id).label('answers_count'),
-            func.avg(Answer.overall_score).label('avg_score'),
-            func.avg(Answer.structure_score).label('avg_structure'),
-            func.avg(Answer.content_score).label('avg_content'),
-            func.avg(Answer.sociological_depth_score).label('avg_depth')
-        ).filter_by(user_id=user_id).group_by(Answer.topic).all()
+        topic_progress = user_aggregates(user_id, levels=(LEVEL_TOPIC,))[LEVEL_TOPIC]
         
         topics = []
-        for data in topic_progress:
+        for topic, data in sorted(topic_progress.items(), key=lambda item: (item[0] is not None, item[0] or '')):
             topics.append({
-                'topic': data.topic,
-                'answers_count': data.answers_count,
+                'topic': topic,
+                'answers_count': data['answers_count'],
                 'average_scores': {
-                    'overall': round(data.avg_score, 2) if data.avg_score else 0,
-                    'structure': round(data.avg_structure, 2) if data.avg_structure else 0,
-                    'content': round(data.avg_content, 2) if data.avg_content else 0,
-                    'sociological_depth': round(data.avg_depth, 2) if data.avg_depth else 0
+                    'overall': rounded(data['avg_overall']),
+                    'structure': rounded(data['avg_structure']),
+                    'content': rounded(data['avg_content']),
+                    'sociological_depth': rounded(data['avg_depth'])
                 }
             })
         
@@ -147,37 +106,35 @@ def get_topic_progress():
 
 @progress_bp.route('/streak', methods=['GET'])
 @jwt_required()
+@cached_response()
 def get_streak():
-    """Get current practice streak"""
+    """Get current practice streak, longest streak and last active day"""
     user_id = get_jwt_identity()
     
     try:
-        # Get all answer dates
-        answer_dates = db.session.query(
-            func.date(Answer.submitted_at).label('date')
-        ).filter_by(user_id=user_id).distinct().order_by(
-            func.date(Answer.submitted_at).desc()
-        ).all()
-        
-        if not answer_dates:
-            return jsonify({'streak': 0}), 200
+        # Maintained on write by activity_service, so this is one primary-key read
+        streak = db.session.get(UserStreak, int(user_id))
+        return jsonify(streak_summary(streak)), 200
         
-        # Calculate streak
-        streak = 0
-        current_date = datetime.utcnow().date()
-        
-        for i, data in enumerate(answer_dates):
-            answer_date = data.date
-            expected_date = current_date - timedelta(days=i)
-            
-            if answer_date == expected_date:
-                streak += 1
-            else:
-                break
-        
-        return jsonify({
-            'streak': streak
-        }), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to calculate streak'}), 500
+
+@progress_bp.route('/concepts', methods=['GET'])
+@jwt_required()
+@cached_response()
+def get_concept_coverage():
+    """Get the keywords, thinkers and theories used across the user's answers, most used first"""
+    user_id = get_jwt_identity()
+    
+    entity_type = request.args.get('type')
+    if entity_type is not None and entity_type not in ENTITY_TYPES:
+        return jsonify({'error': f"type must be one of {', '.join(ENTITY_TYPES)}"}), 400
+    limit = min(max(request.args.get('limit', 50, type=int), 1), MAX_CONCEPTS)
+    
+    try:
+        # Grouped over the concept mention index rather than decoding every answer's features
+        return jsonify(user_concept_coverage(user_id, entity_type, limit)), 200
         
     except Exception as e:
-        return jsonify({'error': 'Failed to calculate streak'}), 500 
\ No newline at end of file
+        print(f"Concept coverage API Error: {str(e)}")
+        return jsonify({'error': 'Failed to retrieve concept coverage'}), 500
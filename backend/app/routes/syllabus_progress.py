@@ -1,28 +1,34 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.answer import Answer
-from app.models.syllabus import SyllabusTopic, SyllabusSubtopic
 from app.models.question import Question
+from app.services.progress_service import user_aggregates, LEVEL_SYLLABUS_TOPIC, LEVEL_SYLLABUS_SUBTOPIC
+from app.services.recommendation_service import recommend_for_user
+from app.services.response_cache import cached_response
+from app.services.syllabus_tree import get_syllabus_tree
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from extensions import db
 from sqlalchemy import func, and_
-from datetime import datetime, timedelta
-import json
 
 syllabus_progress_bp = Blueprint('syllabus_progress', __name__)
 
 @syllabus_progress_bp.route('/syllabus-overview', methods=['GET'])
 @jwt_required()
+@cached_response(syllabus=True)
 def get_syllabus_overview():
     """Get overall syllabus progress overview with proper hierarchy"""
     user_id = get_jwt_identity()
     
     try:
-        # Get all topics grouped by paper
-        paper1_topics = SyllabusTopic.query.filter_by(paper='PAPER1').order_by(SyllabusTopic.order_index).all()
-        paper2_topics = SyllabusTopic.query.filter_by(paper='PAPER2').order_by(SyllabusTopic.order_index).all()
+        # Topics grouped by paper, from the cached syllabus tree
+        tree = get_syllabus_tree()
+        paper1_topics = tree.paper('PAPER1')
+        paper2_topics = tree.paper('PAPER2')
+        
+        # Answer counts and averages for every syllabus topic in one statement
+        topic_aggregates = user_aggregates(user_id, levels=(LEVEL_SYLLABUS_TOPIC,))[LEVEL_SYLLABUS_TOPIC]
         
         syllabus_overview = []
         total_questions_answered = 0
@@ -31,25 +37,10 @@ def get_syllabus_overview():
         # Process Paper 1 topics
         paper1_data = []
         for topic in paper1_topics:
-            # Get questions answered for this topic
-            answered_questions = db.session.query(func.count(Answer.id)).join(
-                Question, Answer.question_id == Question.id
-            ).filter(
-                and_(
-                    Answer.user_id == user_id,
-                    Question.syllabus_topic_id == topic.id
-                )
-            ).scalar()
-            
-            # Get average score for this topic
-            avg_score = db.session.query(func.avg(Answer.overall_score)).join(
-                Question, Answer.question_id == Question.id
-            ).filter(
-                and_(
-                    Answer.user_id == user_id,
-                    Question.syllabus_topic_id == topic.id
-                )
-            ).scalar()
+            # Questions answered and average score for this topic
+            topic_stats = topic_aggregates.get(topic.id, {})
+            answered_questions = topic_stats.get('answers_count', 0)
+            avg_score = topic_stats.get('avg_overall')
             
             # Calculate progress percentage (assuming 10 questions per subtopic as target)
             total_subtopics = len(topic.subtopics)
@@ -78,25 +69,10 @@ def get_syllabus_overview():
         # Process Paper 2 topics
         paper2_data = []
         for topic in paper2_topics:
-            # Get questions answered for this topic
-            answered_questions = db.session.query(func.count(Answer.id)).join(
-                Question, Answer.question_id == Question.id
-            ).filter(
-                and_(
-                    Answer.user_id == user_id,
-                    Question.syllabus_topic_id == topic.id
-                )
-            ).scalar()
-            
-            # Get average score for this topic
-            avg_score = db.session.query(func.avg(Answer.overall_score)).join(
-                Question, Answer.question_id == Question.id
-            ).filter(
-                and_(
-                    Answer.user_id == user_id,
-                    Question.syllabus_topic_id == topic.id
-                )
-            ).scalar()
+            # Questions answered and average score for this topic
+            topic_stats = topic_aggregates.get(topic.id, {})
+            answered_questions = topic_stats.get('answers_count', 0)
+            avg_score = topic_stats.get('avg_overall')
             
             # Calculate progress percentage (assuming 10 questions per subtopic as target)
             total_subtopics = len(topic.subtopics)
@@ -146,46 +122,49 @@ def get_syllabus_overview():
 
 @syllabus_progress_bp.route('/topic/<int:topic_id>/subtopics', methods=['GET'])
 @jwt_required()
+@cached_response(syllabus=True)
 def get_topic_subtopics_progress(topic_id):
     """Get detailed progress for a specific topic and its subtopics"""
     user_id = get_jwt_identity()
     
     try:
-        topic = SyllabusTopic.query.get_or_404(topic_id)
-        subtopics = SyllabusSubtopic.query.filter_by(topic_id=topic_id).order_by(SyllabusSubtopic.order_index).all()
+        topic = get_syllabus_tree().topics_by_id.get(topic_id)
+        if topic is None:
+            return jsonify({'error': 'Topic not found'}), 404
+        
+        # Answer counts and averages for every subtopic in one statement
+        subtopic_aggregates = user_aggregates(user_id, levels=(LEVEL_SYLLABUS_SUBTOPIC,))[LEVEL_SYLLABUS_SUBTOPIC]
+        
+        # Three most recent answers per subtopic of this topic in one statement
+        ranked = db.session.query(
+            Answer.id,
+            Answer.overall_score,
+            Answer.submitted_at,
+            Question.question_text,
+            Question.syllabus_subtopic_id,
+            func.row_number().over(
+                partition_by=Question.syllabus_subtopic_id,
+                order_by=(Answer.submitted_at.desc(), Answer.id.desc())
+            ).label('rank')
+        ).join(
+            Question, Answer.question_id == Question.id
+        ).filter(
+            and_(
+                Answer.user_id == user_id,
+                Question.syllabus_subtopic_id.in_([subtopic.id for subtopic in topic.subtopics])
+            )
+        ).subquery()
+        recent_by_subtopic = {}
+        for row in db.session.query(ranked).filter(ranked.c.rank <= 3).order_by(ranked.c.rank).all():
+            recent_by_subtopic.setdefault(row.syllabus_subtopic_id, []).append(row)
         
         subtopics_progress = []
         
-        for subtopic in subtopics:
-            # Get questions answered for this subtopic
-            answered_questions = db.session.query(func.count(Answer.id)).join(
-                Question, Answer.question_id == Question.id
-            ).filter(
-                and_(
-                    Answer.user_id == user_id,
-                    Question.syllabus_subtopic_id == subtopic.id
-                )
-            ).scalar()
-            
-            # Get average score for this subtopic
-            avg_score = db.session.query(func.avg(Answer.overall_score)).join(
-                Question, Answer.question_id == Question.id
-            ).filter(
-                and_(
-                    Answer.user_id == user_id,
-                    Question.syllabus_subtopic_id == subtopic.id
-                )
-            ).scalar()
-            
-            # Get recent answers for this subtopic
-            recent_answers = db.session.query(Answer).join(
-                Question, Answer.question_id == Question.id
-            ).filter(
-                and_(
-                    Answer.user_id == user_id,
-                    Question.syllabus_subtopic_id == subtopic.id
-                )
-            ).order_by(Answer.submitted_at.desc()).limit(3).all()
+        for subtopic in topic.subtopics:
+            subtopic_stats = subtopic_aggregates.get(subtopic.id, {})
+            answered_questions = subtopic_stats.get('answers_count', 0)
+            avg_score = subtopic_stats.get('avg_overall')
+            recent_answers = recent_by_subtopic.get(subtopic.id, [])
             
             # Calculate progress percentage
             target_questions = 10  # Target 10 questions per subtopic
@@ -207,7 +186,7 @@ def get_topic_subtopics_progress(topic_id):
                         'id': answer.id,
                         'score': answer.overall_score,
                         'submitted_at': answer.submitted_at.isoformat(),
-                        'question_text': answer.question.question_text[:100] + '...' if len(answer.question.question_text) > 100 else answer.question.question_text
+                        'question_text': answer.question_text[:100] + '...' if len(answer.question_text) > 100 else answer.question_text
                     } for answer in recent_answers
                 ]
             }
@@ -224,13 +203,14 @@ def get_topic_subtopics_progress(topic_id):
 
 @syllabus_progress_bp.route('/strength-analysis', methods=['GET'])
 @jwt_required()
+@cached_response(syllabus=True)
 def get_strength_analysis():
     """Get strength analysis across all topics"""
     user_id = get_jwt_identity()
     
     try:
         # Get all topics with their strength levels
-        topics = SyllabusTopic.query.order_by(SyllabusTopic.order_index).all()
+        topics = get_syllabus_tree().topics
         
         strength_analysis = {
             'strong_topics': [],
@@ -239,16 +219,11 @@ def get_strength_analysis():
             'not_started_topics': []
         }
         
+        # Average score for every topic in one statement
+        topic_aggregates = user_aggregates(user_id, levels=(LEVEL_SYLLABUS_TOPIC,))[LEVEL_SYLLABUS_TOPIC]
+        
         for topic in topics:
-            # Get average score for this topic
-            avg_score = db.session.query(func.avg(Answer.overall_score)).join(
-                Question, Answer.question_id == Question.id
-            ).filter(
-                and_(
-                    Answer.user_id == user_id,
-                    Question.syllabus_topic_id == topic.id
-                )
-            ).scalar()
+            avg_score = topic_aggregates.get(topic.id, {}).get('avg_overall')
             
             topic_data = {
                 'id': topic.id,
@@ -273,90 +248,15 @@ def get_strength_analysis():
 
 @syllabus_progress_bp.route('/recommendations', methods=['GET'])
 @jwt_required()
+@cached_response(syllabus=True)
 def get_recommendations():
     """Get personalized recommendations based on syllabus progress"""
     user_id = get_jwt_identity()
     
     try:
-        recommendations = []
-        
-        # Get weak topics (score < 6.0)
-        weak_topics = db.session.query(
-            SyllabusTopic.name,
-            func.avg(Answer.overall_score).label('avg_score')
-        ).join(
-            Question, SyllabusTopic.id == Question.syllabus_topic_id
-        ).join(
-            Answer, Question.id == Answer.question_id
-        ).filter(
-            Answer.user_id == user_id
-        ).group_by(
-            SyllabusTopic.id, SyllabusTopic.name
-        ).having(
-            func.avg(Answer.overall_score) < 6.0
-        ).order_by(
-            func.avg(Answer.overall_score)
-        ).limit(3).all()
-        
-        for topic in weak_topics:
-            recommendations.append({
-                'type': 'focus_area',
-                'title': f'Focus on {topic.name}',
-                'description': f'Your average score in {topic.name} is {topic.avg_score:.1f}. Consider practicing more questions in this area.',
-                'priority': 'high'
-            })
-        
-        # Get topics with few questions answered
-        low_practice_topics = db.session.query(
-            SyllabusTopic.name,
-            func.count(Answer.id).label('questions_count')
-        ).join(
-            Question, SyllabusTopic.id == Question.syllabus_topic_id
-        ).join(
-            Answer, Question.id == Answer.question_id
-        ).filter(
-            Answer.user_id == user_id
-        ).group_by(
-            SyllabusTopic.id, SyllabusTopic.name
-        ).having(
-            func.count(Answer.id) < 5
-        ).order_by(
-            func.count(Answer.id)
-        ).limit(3).all()
-        
-        for topic in low_practice_topics:
-            recommendations.append({
-                'type': 'practice_more',
-                'title': f'Practice More in {topic.name}',
-                'description': f'You have only answered {topic.questions_count} questions in {topic.name}. Try to practice more questions.',
-                'priority': 'medium'
-            })
-        
-        # Get strong topics for confidence building
-        strong_topics = db.session.query(
-            SyllabusTopic.name,
-            func.avg(Answer.overall_score).label('avg_score')
-        ).join(
-            Question, SyllabusTopic.id == Question.syllabus_topic_id
-        ).join(
-            Answer, Question.id == Answer.question_id
-        ).filter(
-            Answer.user_id == user_id
-        ).group_by(
-            SyllabusTopic.id, SyllabusTopic.name
-        ).having(
-            func.avg(Answer.overall_score) >= 8.0
-        ).order_by(
-            func.avg(Answer.overall_score).desc()
-        ).limit(2).all()
-        
-        for topic in strong_topics:
-            recommendations.append({
-                'type': 'strength',
-                'title': f'Strong Performance in {topic.name}',
-                'description': f'Excellent work! Your average score in {topic.name} is {topic.avg_score:.1f}. Keep up the good work!',
-                'priority': 'low'
-            })
+        # One grouped query of the user's answers per topic and subtopic, joined onto the
+        # cached syllabus tree in Python; every rule runs over the result in memory
+        recommendations = recommend_for_user(user_id)
         
         return jsonify({
             'recommendations': recommendations
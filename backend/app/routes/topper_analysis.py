@@ -1,13 +1,49 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.similarity_service import SimilarityAnalysisService
+from app.services.topper_index import get_topper_index
+from app.services.concept_index import question_concept_comparison, ENTITY_TYPES
+from app.services.response_cache import cached_response
 from app.models.topper_answer import TopperAnswer, AnswerSimilarity
 from app.models.answer import Answer
+from app.models.question import Question
 from extensions import db
-import json
+import time
 
 topper_analysis_bp = Blueprint('topper_analysis', __name__, url_prefix='/api/topper-analysis')
 similarity_service = SimilarityAnalysisService()
+topper_index = get_topper_index()
+
+def find_related_topper_answers(answer_text, k=5, exclude_question_id=None):
+    """Closest topper answers across all questions, resolved to response dicts"""
+    matches = topper_index.search(answer_text, k=k, exclude_question_id=exclude_question_id)
+    if not matches:
+        return []
+    
+    topper_answers = {
+        t.id: t for t in TopperAnswer.query.filter(
+            TopperAnswer.id.in_([m['topper_answer_id'] for m in matches])
+        ).all()
+    }
+    questions = {
+        q.id: q for q in Question.query.filter(
+            Question.id.in_([m['question_id'] for m in matches])
+        ).all()
+    }
+    
+    related = []
+    for match in matches:
+        topper_answer = topper_answers.get(match['topper_answer_id'])
+        if not topper_answer:
+            # Deleted since the index was built
+            continue
+        question = questions.get(match['question_id'])
+        related.append({
+            'similarity': match['similarity'],
+            'question': question.to_dict() if question else None,
+            'topper_answer': topper_answer.to_dict()
+        })
+    return related
 
 @topper_analysis_bp.route('/analyze/<int:answer_id>', methods=['GET'])
 @jwt_required()
@@ -37,7 +73,7 @@ def analyze_answer(answer_id):
                 'topper_answer': topper_answer.to_dict() if topper_answer else None,
                 'feedback': {
                     'text': existing_analysis.feedback_text,
-                    'suggestions': json.loads(existing_analysis.improvement_suggestions) if existing_analysis.improvement_suggestions else []
+                    'suggestions': existing_analysis.improvement_suggestions or []
                 }
             }), 200
         
@@ -45,6 +81,9 @@ def analyze_answer(answer_id):
         analysis_result = similarity_service.analyze_user_answer(answer_id)
         
         if 'error' in analysis_result:
+            if not TopperAnswer.query.filter_by(question_id=user_answer.question_id).first():
+                # Point the user at topper answers to related questions instead
+                analysis_result['related_topper_answers'] = find_related_topper_answers(user_answer.answer_text)
             return jsonify(analysis_result), 400
         
         return jsonify(analysis_result), 200
@@ -53,6 +92,100 @@ def analyze_answer(answer_id):
         print(f"Error in analyze_answer: {e}")
         return jsonify({'error': 'Failed to analyze answer'}), 500
 
+@topper_analysis_bp.route('/analyze/<int:answer_id>/matches', methods=['GET'])
+@jwt_required()
+def get_ranked_matches(answer_id):
+    """Get the ranked topper matches for an analyzed answer, paginated"""
+    try:
+        user_id = get_jwt_identity()
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 5, type=int), 1), 50)
+        
+        user_answer = Answer.query.filter_by(id=answer_id, user_id=user_id).first()
+        if not user_answer:
+            return jsonify({'error': 'Answer not found or access denied'}), 404
+        
+        # Re-analysis adds rows; the latest one holds the current matches
+        analysis = AnswerSimilarity.query.filter_by(user_answer_id=answer_id).order_by(
+            AnswerSimilarity.created_at.desc(), AnswerSimilarity.id.desc()
+        ).first()
+        if not analysis:
+            return jsonify({'error': 'Answer has not been analyzed yet'}), 404
+        
+        matches = similarity_service.unpack_ranked_matches(analysis.ranked_matches)
+        if not matches:
+            # Analyses stored before ranking was introduced only have the best match
+            matches = [{
+                'topper_answer_id': analysis.topper_answer_id,
+                'similarity_scores': {
+                    'overall_similarity': analysis.overall_similarity,
+                    'content_similarity': analysis.content_similarity,
+                    'keyword_similarity': analysis.keyword_similarity,
+                    'structure_similarity': analysis.structure_similarity,
+                    'theory_similarity': analysis.theory_similarity
+                }
+            }]
+        
+        total = len(matches)
+        start = (page - 1) * per_page
+        page_matches = matches[start:start + per_page]
+        
+        topper_answers = {
+            t.id: t for t in TopperAnswer.query.filter(
+                TopperAnswer.id.in_([m['topper_answer_id'] for m in page_matches])
+            ).all()
+        } if page_matches else {}
+        
+        return jsonify({
+            'matches': [
+                {
+                    'rank': start + position + 1,
+                    'similarity_scores': match['similarity_scores'],
+                    'topper_answer': topper_answers[match['topper_answer_id']].to_dict()
+                        if match['topper_answer_id'] in topper_answers else None
+                }
+                for position, match in enumerate(page_matches)
+            ],
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': (total + per_page - 1) // per_page
+        }), 200
+        
+    except Exception as e:
+        print(f"Error in get_ranked_matches: {e}")
+        return jsonify({'error': 'Failed to retrieve ranked matches'}), 500
+
+@topper_analysis_bp.route('/related/<int:answer_id>', methods=['GET'])
+@jwt_required()
+def get_related_topper_answers(answer_id):
+    """Get the closest topper answers to related questions using the ANN index"""
+    try:
+        user_id = get_jwt_identity()
+        k = min(max(request.args.get('k', 5, type=int), 1), 50)
+        include_same_question = request.args.get('include_same_question', 'false').lower() == 'true'
+        
+        user_answer = Answer.query.filter_by(id=answer_id, user_id=user_id).first()
+        if not user_answer:
+            return jsonify({'error': 'Answer not found or access denied'}), 404
+        
+        started = time.perf_counter()
+        related = find_related_topper_answers(
+            user_answer.answer_text,
+            k=k,
+            exclude_question_id=None if include_same_question else user_answer.question_id
+        )
+        
+        return jsonify({
+            'related_topper_answers': related,
+            'index_size': len(topper_index),
+            'search_ms': round((time.perf_counter() - started) * 1000, 2)
+        }), 200
+        
+    except Exception as e:
+        print(f"Error in get_related_topper_answers: {e}")
+        return jsonify({'error': 'Failed to retrieve related topper answers'}), 500
+
 @topper_analysis_bp.route('/add-topper-answer', methods=['POST'])
 @jwt_required()
 def add_topper_answer():
@@ -98,8 +231,29 @@ def get_topper_answers(question_id):
         print(f"Error in get_topper_answers: {e}")
         return jsonify({'error': 'Failed to retrieve topper answers'}), 500
 
+@topper_analysis_bp.route('/concept-comparison/<int:question_id>', methods=['GET'])
+@jwt_required()
+def get_concept_comparison(question_id):
+    """Compare the concepts in the user's answers to a question with those toppers used"""
+    try:
+        user_id = get_jwt_identity()
+        
+        entity_type = request.args.get('type')
+        if entity_type is not None and entity_type not in ENTITY_TYPES:
+            return jsonify({'error': f"type must be one of {', '.join(ENTITY_TYPES)}"}), 400
+        
+        if not db.session.get(Question, question_id):
+            return jsonify({'error': 'Question not found'}), 404
+        
+        return jsonify(question_concept_comparison(user_id, question_id, entity_type)), 200
+        
+    except Exception as e:
+        print(f"Error in get_concept_comparison: {e}")
+        return jsonify({'error': 'Failed to compare concepts'}), 500
+
 @topper_analysis_bp.route('/user-analysis-history', methods=['GET'])
 @jwt_required()
+@cached_response()
 def get_user_analysis_history():
     """Get analysis history for the current user"""
     try:
@@ -130,7 +284,7 @@ def get_user_analysis_history():
                 },
                 'feedback': {
                     'text': analysis.feedback_text,
-                    'suggestions': json.loads(analysis.improvement_suggestions) if analysis.improvement_suggestions else []
+                    'suggestions': analysis.improvement_suggestions or []
                 },
                 'analyzed_at': analysis.created_at.isoformat()
             })
@@ -145,6 +299,7 @@ def get_user_analysis_history():
 
 @topper_analysis_bp.route('/similarity-stats', methods=['GET'])
 @jwt_required()
+@cached_response()
 def get_similarity_stats():
     """Get similarity statistics for the current user"""
     try:
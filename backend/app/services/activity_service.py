@@ -0,0 +1,304 @@
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from flask import has_request_context, request
+from sqlalchemy import bindparam, func
+from sqlalchemy.dialects import postgresql, sqlite
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+from app.models.activity import DailyActivity, UserStreak
+from app.models.answer import Answer
+from app.services.response_cache import bump_user_data_versions
+
+DEFAULT_TIMEZONE = os.environ.get('DEFAULT_TIMEZONE', 'UTC')
+TIMEZONE_HEADER = 'X-Timezone'
+REBUILD_CHUNK = 1000
+TIMELINE_GRANULARITIES = ('day', 'week', 'month')
+
+def _zone(name: Optional[str]) -> Optional[ZoneInfo]:
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+def request_timezone() -> Optional[str]:
+    """The client's IANA timezone from the X-Timezone header, when present and valid"""
+    if not has_request_context():
+        return None
+    name = request.headers.get(TIMEZONE_HEADER)
+    return name if _zone(name) else None
+
+def local_day(moment: datetime, timezone: str) -> date:
+    """The calendar day a naive UTC timestamp falls on in the given timezone"""
+    zone = _zone(timezone) or dt_timezone.utc
+    return moment.replace(tzinfo=dt_timezone.utc).astimezone(zone).date()
+
+def advance_streak(streak, day: date):
+    """
+    Fold one active day into streak state (a UserStreak or any object with the same fields).
+    Days on or before last_active_day change nothing; rebuild_activity handles backdated history.
+    """
+    last = streak.last_active_day
+    if last is not None and day <= last:
+        return
+    if last is not None and day - last == timedelta(days=1):
+        streak.current_streak += 1
+    else:
+        streak.current_streak = 1
+    streak.last_active_day = day
+    streak.longest_streak = max(streak.longest_streak or 0, streak.current_streak)
+
+def record_answer_activity(answer, timezone: Optional[str] = None):
+    """
+    Advance the author's streak for a newly written answer; the caller commits.
+    The day boundary follows timezone, else the request's X-Timezone header, else
+    the zone stored for the user.
+    """
+    timezone = timezone or request_timezone()
+    user_id = int(answer.user_id)
+
+    insert = _upsert_insert(UserStreak)
+    if insert is not None:
+        # Create the row if missing without racing a concurrent first answer, then
+        # lock it so concurrent answers advance the streak one after the other
+        db.session.execute(insert.values(
+            user_id=user_id, timezone=timezone or DEFAULT_TIMEZONE, current_streak=0, longest_streak=0
+        ).on_conflict_do_nothing(index_elements=['user_id']))
+    streak = db.session.get(UserStreak, user_id, with_for_update=True)
+    if streak is None:
+        streak = UserStreak(
+            user_id=user_id, timezone=timezone or DEFAULT_TIMEZONE, current_streak=0, longest_streak=0
+        )
+        db.session.add(streak)
+    elif timezone and timezone != streak.timezone:
+        streak.timezone = timezone
+
+    day = local_day(answer.submitted_at or datetime.utcnow(), streak.timezone)
+    advance_streak(streak, day)
+    # Later scores go to the same bucket even if the user's zone changes meanwhile
+    answer.activity_day = day
+    
+    scored = answer.overall_score is not None
+    _add_to_day(user_id, day, answers=1, scored=int(scored), score=answer.overall_score if scored else 0.0)
+
+def record_answer_score(answer, previous_score: Optional[float] = None):
+    """
+    Fold an answer's new overall score into the bucket its answer was counted
+    in, replacing previous_score when it is being re-evaluated; the caller commits.
+    """
+    if answer.overall_score is None and previous_score is None:
+        return
+    user_id = int(answer.user_id)
+    day = answer.activity_day
+    if day is None:
+        # Answers written before activity_day existed and not yet rebuilt
+        streak = db.session.get(UserStreak, user_id)
+        day = local_day(answer.submitted_at or datetime.utcnow(), streak.timezone if streak else DEFAULT_TIMEZONE)
+    _add_to_day(
+        user_id,
+        day,
+        scored=(answer.overall_score is not None) - (previous_score is not None),
+        score=(answer.overall_score or 0.0) - (previous_score or 0.0)
+    )
+
+def _period_starts(day: date):
+    return day - timedelta(days=day.weekday()), day.replace(day=1)
+
+def _upsert_insert(model):
+    """INSERT with ON CONFLICT support on PostgreSQL and SQLite; None on other databases"""
+    dialect = db.session.get_bind(mapper=model.__mapper__).dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(model.__table__)
+    if dialect == 'sqlite':
+        return sqlite.insert(model.__table__)
+    return None
+
+def _add_to_day(user_id: int, day: date, answers: int = 0, scored: int = 0, score: float = 0.0):
+    # Increments run in SQL, and a day's first row is an upsert, so concurrent
+    # writers for the same day neither lose updates nor collide on the key
+    table = DailyActivity.__table__
+    insert = _upsert_insert(DailyActivity)
+    if insert is not None:
+        week_start, month_start = _period_starts(day)
+        insert = insert.values(
+            user_id=user_id, day=day, week_start=week_start, month_start=month_start,
+            answers_count=answers, scored_count=scored, score_sum=score
+        )
+        db.session.execute(insert.on_conflict_do_update(
+            index_elements=['user_id', 'day'],
+            set_={
+                'answers_count': table.c.answers_count + insert.excluded.answers_count,
+                'scored_count': table.c.scored_count + insert.excluded.scored_count,
+                'score_sum': table.c.score_sum + insert.excluded.score_sum
+            }
+        ))
+        return
+
+    # Elsewhere: update, else insert (two first writes of a day can still collide)
+    updated = db.session.execute(
+        table.update()
+        .where(table.c.user_id == user_id, table.c.day == day)
+        .values(
+            answers_count=table.c.answers_count + answers,
+            scored_count=table.c.scored_count + scored,
+            score_sum=table.c.score_sum + score
+        )
+    ).rowcount
+    if not updated:
+        week_start, month_start = _period_starts(day)
+        db.session.execute(table.insert().values(
+            user_id=user_id, day=day, week_start=week_start, month_start=month_start,
+            answers_count=answers, scored_count=scored, score_sum=score
+        ))
+
+def streak_summary(streak: Optional[UserStreak], now: Optional[datetime] = None) -> Dict:
+    """
+    Streak as shown to the user. A streak stays alive through the day after the
+    last active day, so it only drops to 0 once a whole local day is missed.
+    """
+    if streak is None or streak.last_active_day is None:
+        return {
+            'streak': 0,
+            'longest_streak': 0,
+            'last_active_day': None,
+            'active_today': False,
+            'timezone': streak.timezone if streak else DEFAULT_TIMEZONE
+        }
+
+    today = local_day(now or datetime.utcnow(), streak.timezone)
+    alive = (today - streak.last_active_day).days <= 1
+    return {
+        'streak': streak.current_streak if alive else 0,
+        'longest_streak': streak.longest_streak,
+        'last_active_day': streak.last_active_day.isoformat(),
+        'active_today': streak.last_active_day == today,
+        'timezone': streak.timezone
+    }
+
+def activity_timeline(user_id: int, days: int, granularity: str = 'day') -> Dict:
+    """
+    Answers and average score per day, week or month over the last `days` local
+    days (today included), read from the daily buckets and grouped in SQL.
+    """
+    streak = db.session.get(UserStreak, int(user_id))
+    timezone = streak.timezone if streak else DEFAULT_TIMEZONE
+    start = local_day(datetime.utcnow(), timezone) - timedelta(days=days - 1)
+    
+    period = {
+        'day': DailyActivity.day,
+        'week': DailyActivity.week_start,
+        'month': DailyActivity.month_start
+    }[granularity]
+    rows = db.session.query(
+        period.label('period'),
+        func.sum(DailyActivity.answers_count).label('answers_count'),
+        func.sum(DailyActivity.scored_count).label('scored_count'),
+        func.sum(DailyActivity.score_sum).label('score_sum')
+    ).filter(
+        DailyActivity.user_id == int(user_id),
+        DailyActivity.day >= start
+    ).group_by(period).order_by(period).all()
+    
+    timeline = []
+    for row in rows:
+        if not row.answers_count:
+            continue
+        timeline.append({
+            'date': row.period.isoformat() if hasattr(row.period, 'isoformat') else str(row.period),
+            'answers_count': row.answers_count,
+            'average_score': round(row.score_sum / row.scored_count, 2) if row.scored_count else 0
+        })
+    return {'timeline': timeline, 'start_date': start.isoformat(), 'granularity': granularity, 'timezone': timezone}
+
+def rebuild_activity(user_ids: Optional[Iterable[int]] = None) -> Dict:
+    """
+    Recompute streaks and daily buckets from the answers table, for all users or
+    the given ones. Used to backfill existing users and to repair state after
+    backdated imports. Stored timezones are kept, and each answer's
+    activity_day is updated to the bucket it now falls in.
+    Returns counts of streak and daily bucket rows written.
+    """
+    user_ids = list(user_ids) if user_ids is not None else None
+
+    streaks = UserStreak.query
+    buckets = DailyActivity.query
+    answers = db.session.query(
+        Answer.id, Answer.user_id, Answer.submitted_at, Answer.overall_score, Answer.activity_day
+    ).filter(
+        Answer.submitted_at.isnot(None)
+    )
+    if user_ids is not None:
+        streaks = streaks.filter(UserStreak.user_id.in_(user_ids))
+        buckets = buckets.filter(DailyActivity.user_id.in_(user_ids))
+        answers = answers.filter(Answer.user_id.in_(user_ids))
+
+    zones = dict(streaks.with_entities(UserStreak.user_id, UserStreak.timezone).all())
+    streaks.delete(synchronize_session=False)
+    buckets.delete(synchronize_session=False)
+
+    # One ordered pass over (user, time): each user's days arrive in order, so
+    # finished buckets are written in chunks and memory stays flat
+    states = []
+    days: List[Dict] = []
+    days_written = 0
+    moved: List[Dict] = []
+    state = bucket = None
+    rows = answers.order_by(Answer.user_id, Answer.submitted_at).yield_per(10000)
+    for answer_id, user_id, submitted_at, overall_score, activity_day in rows:
+        if state is None or state.user_id != user_id:
+            state = SimpleNamespace(
+                user_id=user_id, timezone=zones.get(user_id, DEFAULT_TIMEZONE),
+                current_streak=0, longest_streak=0, last_active_day=None
+            )
+            states.append(state)
+        day = local_day(submitted_at, state.timezone)
+        advance_streak(state, day)
+        if activity_day != day:
+            moved.append({'answer_id': answer_id, 'activity_day': day})
+            if len(moved) >= REBUILD_CHUNK:
+                _set_activity_days(moved)
+                moved = []
+
+        if bucket is None or bucket['user_id'] != user_id or bucket['day'] != day:
+            if len(days) >= REBUILD_CHUNK:
+                db.session.execute(DailyActivity.__table__.insert(), days)
+                days_written += len(days)
+                days = []
+            week_start, month_start = _period_starts(day)
+            bucket = {
+                'user_id': user_id, 'day': day, 'week_start': week_start, 'month_start': month_start,
+                'answers_count': 0, 'scored_count': 0, 'score_sum': 0.0
+            }
+            days.append(bucket)
+        bucket['answers_count'] += 1
+        if overall_score is not None:
+            bucket['scored_count'] += 1
+            bucket['score_sum'] += overall_score
+
+    if days:
+        db.session.execute(DailyActivity.__table__.insert(), days)
+        days_written += len(days)
+    if moved:
+        _set_activity_days(moved)
+    now = datetime.utcnow()
+    rows = [dict(vars(s), updated_at=now) for s in states]
+    for start in range(0, len(rows), REBUILD_CHUNK):
+        db.session.execute(UserStreak.__table__.insert(), rows[start:start + REBUILD_CHUNK])
+    # Cached progress responses were computed from the old buckets
+    bump_user_data_versions(user_ids if user_ids is not None else [s.user_id for s in states])
+    db.session.commit()
+    return {'streaks': len(rows), 'days': days_written}
+
+def _set_activity_days(rows: List[Dict]):
+    table = Answer.__table__
+    db.session.execute(
+        table.update().where(table.c.id == bindparam('answer_id')).values(activity_day=bindparam('activity_day')),
+        rows
+    )
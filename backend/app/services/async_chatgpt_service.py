@@ -0,0 +1,81 @@
+from typing import Dict, Optional
+from openai import AsyncOpenAI
+from app.services.chatgpt_service import ChatGPTService, _client_config, parse_json_object
+from app.services.instrumentation import span
+from app.services.llm_limiter import async_llm_limiter
+
+_async_clients = {}
+
+def _shared_async_client() -> AsyncOpenAI:
+    """One AsyncOpenAI client per configuration.
+
+    Only the LLM worker's event loop uses these clients, so no lock is needed and
+    their connection pools stay bound to that loop.
+    """
+    config = _client_config()
+    client = _async_clients.get(config)
+    if client is None:
+        api_key, base_url, timeout, max_retries = config
+        client = _async_clients[config] = AsyncOpenAI(
+            api_key=api_key, base_url=base_url, timeout=timeout, max_retries=max_retries
+        )
+    return client
+
+class AsyncChatGPTService(ChatGPTService):
+    """ChatGPTService whose evaluation and suggestion calls are coroutines.
+
+    Prompts, parsing and fallback scoring are shared with ChatGPTService. Use it
+    only from the LLM worker's event loop (see llm_worker); the synchronous
+    streaming and file methods are not available on the async client.
+    """
+    def __init__(self, model: Optional[str] = None):
+        super().__init__(model=model)
+        self.client = _shared_async_client()
+
+    async def evaluate_answer(self, answer_text: str, question_text: str) -> Dict:
+        """
+        Evaluate an answer using ChatGPT API without holding a thread while waiting
+        """
+        self.last_usage = None
+        try:
+            async with async_llm_limiter.slot():
+                with span('openai.evaluate_async', kind='outbound', target='openai.chat'):
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=self._evaluation_messages(answer_text, question_text),
+                        temperature=0.3,
+                        max_tokens=2000
+                    )
+            self.last_usage = getattr(response, 'usage', None)
+
+            evaluation = parse_json_object(response.choices[0].message.content)
+            if evaluation is not None:
+                return evaluation
+            return self._fallback_evaluation(answer_text, question_text)
+
+        except Exception as e:
+            print(f"Error in async ChatGPT evaluation: {e}")
+            return self._fallback_evaluation(answer_text, question_text)
+
+    async def get_ai_suggestions(self, answer_text: str, question_text: str) -> Dict:
+        """
+        Get AI-powered suggestions for improving the answer
+        """
+        try:
+            async with async_llm_limiter.slot():
+                with span('openai.suggestions_async', kind='outbound', target='openai.chat'):
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=self._suggestion_messages(answer_text, question_text),
+                        temperature=0.3,
+                        max_tokens=1500
+                    )
+
+            suggestions = parse_json_object(response.choices[0].message.content)
+            if suggestions is not None:
+                return suggestions
+            return {"error": "Could not generate suggestions"}
+
+        except Exception as e:
+            print(f"Error getting async AI suggestions: {e}")
+            return {"error": "Failed to generate suggestions"}
@@ -1,67 +1,105 @@
 import os
 import json
 import re
-from typing import Dict, List, Optional
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from openai import OpenAI
 from dotenv import load_dotenv
+from app.services.instrumentation import span
+from app.services.streaming_json import IncrementalJSONParser
+from app.services.llm_limiter import llm_limiter
 
 load_dotenv()
 
+_clients = {}
+_clients_lock = threading.Lock()
+
+def _client_config() -> Tuple:
+    # OPENAI_BASE_URL points the client at a compatible server, e.g. benchmarks/fake_openai_server.py
+    return (
+        os.getenv('OPENAI_API_KEY'),
+        os.getenv('OPENAI_BASE_URL') or None,
+        float(os.getenv('OPENAI_TIMEOUT', 60)),
+        int(os.getenv('OPENAI_MAX_RETRIES', 2))
+    )
+
+def _shared_client() -> OpenAI:
+    """One OpenAI client per configuration; clients are thread-safe and reuse connections"""
+    config = _client_config()
+    with _clients_lock:
+        client = _clients.get(config)
+        if client is None:
+            api_key, base_url, timeout, max_retries = config
+            client = _clients[config] = OpenAI(
+                api_key=api_key, base_url=base_url, timeout=timeout, max_retries=max_retries
+            )
+        return client
+
+def parse_json_object(content: str) -> Optional[Dict]:
+    """The first {...} block of a completion, parsed; None when there is none"""
+    json_match = re.search(r'\{.*\}', content or '', re.DOTALL)
+    return json.loads(json_match.group()) if json_match else None
+
 class ChatGPTService:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        self.model = "gpt-4"  # or "gpt-3.5-turbo" for cost optimization
+    def __init__(self, model: Optional[str] = None):
+        self.client = _shared_client()
+        self.model = model or os.getenv('OPENAI_MODEL', 'gpt-4')  # or "gpt-3.5-turbo" for cost optimization
+        self.last_usage = None  # token usage of the last evaluate_answer API call
+    
+    def _evaluation_messages(self, answer_text: str, question_text: str) -> List[Dict]:
+        prompt = f"""
+        You are an expert UPSC Sociology examiner. Evaluate the following answer based on UPSC standards.
+
+        Question: {question_text}
+        
+        Answer: {answer_text}
+        
+        Please provide a comprehensive evaluation in the following JSON format:
+        {{
+            "structure_score": <score out of 10>,
+            "content_score": <score out of 10>,
+            "sociological_depth_score": <score out of 10>,
+            "overall_score": <average of all scores>,
+            "feedback": "<detailed feedback with specific suggestions>",
+            "keywords_used": ["keyword1", "keyword2", ...],
+            "thinkers_mentioned": ["thinker1", "thinker2", ...],
+            "theories_referenced": ["theory1", "theory2", ...],
+            "strengths": ["strength1", "strength2", ...],
+            "areas_for_improvement": ["area1", "area2", ...]
+        }}
+        
+        Evaluation criteria:
+        1. Structure (10 points): Introduction, body organization, conclusion, flow
+        2. Content (10 points): Completeness, accuracy, examples, relevance
+        3. Sociological depth (10 points): Theoretical understanding, concepts, analytical approach
+        
+        Be specific and constructive in your feedback. Focus on UPSC Sociology standards.
+        """
+        return [
+            {"role": "system", "content": "You are an expert UPSC Sociology examiner with deep knowledge of sociological theories, thinkers, and concepts."},
+            {"role": "user", "content": prompt}
+        ]
     
     def evaluate_answer(self, answer_text: str, question_text: str) -> Dict:
         """
         Evaluate an answer using ChatGPT API
         """
+        self.last_usage = None
         try:
-            prompt = f"""
-            You are an expert UPSC Sociology examiner. Evaluate the following answer based on UPSC standards.
-
-            Question: {question_text}
-            
-            Answer: {answer_text}
-            
-            Please provide a comprehensive evaluation in the following JSON format:
-            {{
-                "structure_score": <score out of 10>,
-                "content_score": <score out of 10>,
-                "sociological_depth_score": <score out of 10>,
-                "overall_score": <average of all scores>,
-                "feedback": "<detailed feedback with specific suggestions>",
-                "keywords_used": ["keyword1", "keyword2", ...],
-                "thinkers_mentioned": ["thinker1", "thinker2", ...],
-                "theories_referenced": ["theory1", "theory2", ...],
-                "strengths": ["strength1", "strength2", ...],
-                "areas_for_improvement": ["area1", "area2", ...]
-            }}
-            
-            Evaluation criteria:
-            1. Structure (10 points): Introduction, body organization, conclusion, flow
-            2. Content (10 points): Completeness, accuracy, examples, relevance
-            3. Sociological depth (10 points): Theoretical understanding, concepts, analytical approach
-            
-            Be specific and constructive in your feedback. Focus on UPSC Sociology standards.
-            """
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert UPSC Sociology examiner with deep knowledge of sociological theories, thinkers, and concepts."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
+            with llm_limiter.slot(), span('openai.evaluate', kind='outbound', target='openai.chat'):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._evaluation_messages(answer_text, question_text),
+                    temperature=0.3,
+                    max_tokens=2000
+                )
+            self.last_usage = getattr(response, 'usage', None)
             
             # Extract JSON from response
-            content = response.choices[0].message.content
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
+            evaluation = parse_json_object(response.choices[0].message.content)
             
-            if json_match:
-                evaluation = json.loads(json_match.group())
+            if evaluation is not None:
                 return evaluation
             else:
                 # Fallback to basic evaluation if JSON parsing fails
@@ -71,6 +109,50 @@ class ChatGPTService:
             print(f"Error in ChatGPT evaluation: {e}")
             return self._fallback_evaluation(answer_text, question_text)
     
+    def stream_evaluation(self, answer_text: str, question_text: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Evaluate an answer with a streamed completion.
+        Yields ('token', text) as text arrives, ('field', {'name', 'value'}) as each
+        top-level JSON field completes, and finally ('result', evaluation).
+        """
+        self.last_usage = None
+        messages = self._evaluation_messages(answer_text, question_text)
+        parser = IncrementalJSONParser()
+        completion_chunks = 0
+        try:
+            with llm_limiter.slot(), span('openai.evaluate_stream', kind='outbound', target='openai.chat'):
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.3,
+                    max_tokens=2000,
+                    stream=True
+                )
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content or ''
+                    if not text:
+                        continue
+                    completion_chunks += 1
+                    yield 'token', text
+                    for name, value in parser.feed(text):
+                        yield 'field', {'name': name, 'value': value}
+        except Exception as e:
+            print(f"Error in streamed ChatGPT evaluation: {e}")
+            yield 'result', self._fallback_evaluation(answer_text, question_text)
+            return
+        
+        # Streamed responses carry no usage block: estimate prompt tokens, count content chunks
+        prompt_words = sum(len(m['content'].split()) for m in messages)
+        self.last_usage = SimpleNamespace(prompt_tokens=int(prompt_words * 1.3), completion_tokens=completion_chunks)
+        
+        evaluation = parser.result()
+        if not all(key in evaluation for key in ('structure_score', 'content_score', 'sociological_depth_score')):
+            yield 'result', self._fallback_evaluation(answer_text, question_text)
+            return
+        yield 'result', evaluation
+    
     def extract_text_from_pdf(self, pdf_content: bytes) -> str:
         """
         Extract text content from PDF bytes
@@ -158,49 +240,52 @@ class ChatGPTService:
             "thinkers_mentioned": [],
             "theories_referenced": [],
             "strengths": [],
-            "areas_for_improvement": []
+            "areas_for_improvement": [],
+            "evaluation_source": "fallback"
         }
     
+    def _suggestion_messages(self, answer_text: str, question_text: str) -> List[Dict]:
+        prompt = f"""
+        As a UPSC Sociology mentor, provide specific suggestions to improve this answer:
+
+        Question: {question_text}
+        Answer: {answer_text}
+        
+        Provide suggestions in this JSON format:
+        {{
+            "structure_suggestions": ["suggestion1", "suggestion2"],
+            "content_suggestions": ["suggestion1", "suggestion2"],
+            "theoretical_suggestions": ["suggestion1", "suggestion2"],
+            "examples_to_add": ["example1", "example2"],
+            "thinkers_to_mention": ["thinker1", "thinker2"],
+            "concepts_to_include": ["concept1", "concept2"]
+        }}
+        """
+        return [
+            {"role": "system", "content": "You are a helpful UPSC Sociology mentor providing constructive feedback."},
+            {"role": "user", "content": prompt}
+        ]
+    
     def get_ai_suggestions(self, answer_text: str, question_text: str) -> Dict:
         """
         Get AI-powered suggestions for improving the answer
         """
         try:
-            prompt = f"""
-            As a UPSC Sociology mentor, provide specific suggestions to improve this answer:
-
-            Question: {question_text}
-            Answer: {answer_text}
-            
-            Provide suggestions in this JSON format:
-            {{
-                "structure_suggestions": ["suggestion1", "suggestion2"],
-                "content_suggestions": ["suggestion1", "suggestion2"],
-                "theoretical_suggestions": ["suggestion1", "suggestion2"],
-                "examples_to_add": ["example1", "example2"],
-                "thinkers_to_mention": ["thinker1", "thinker2"],
-                "concepts_to_include": ["concept1", "concept2"]
-            }}
-            """
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful UPSC Sociology mentor providing constructive feedback."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=1500
-            )
+            with llm_limiter.slot(), span('openai.suggestions', kind='outbound', target='openai.chat'):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._suggestion_messages(answer_text, question_text),
+                    temperature=0.3,
+                    max_tokens=1500
+                )
             
-            content = response.choices[0].message.content
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
+            suggestions = parse_json_object(response.choices[0].message.content)
             
-            if json_match:
-                return json.loads(json_match.group())
+            if suggestions is not None:
+                return suggestions
             else:
                 return {"error": "Could not generate suggestions"}
                 
         except Exception as e:
             print(f"Error getting AI suggestions: {e}")
-            return {"error": "Failed to generate suggestions"} 
\ No newline at end of file
+            return {"error": "Failed to generate suggestions"}
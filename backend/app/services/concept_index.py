@@ -0,0 +1,192 @@
+import os
+import sys
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+from app.models.answer import Answer
+from app.models.concept_mention import ConceptMention
+from app.models.topper_answer import TopperAnswer
+from app.services.minhash_service import SOURCE_ANSWER, SOURCE_TOPPER
+
+# Mention entity type -> the feature column it is extracted from
+ENTITY_COLUMNS = {
+    'keyword': 'keywords_used',
+    'thinker': 'thinkers_mentioned',
+    'theory': 'theories_referenced',
+}
+ENTITY_TYPES = tuple(ENTITY_COLUMNS)
+MAX_ENTITY_LENGTH = 200
+REBUILD_CHUNK = 5000
+
+def normalise_entity(value) -> str:
+    """Grouping key for an extracted term: lowercased with whitespace collapsed"""
+    return ' '.join(str(value).split()).lower()[:MAX_ENTITY_LENGTH]
+
+def mention_rows(source_type: str, source_id: int, user_id: Optional[int], question_id: int,
+                 features: Dict[str, Optional[list]]) -> List[Dict]:
+    """Index rows for one document; features maps feature column -> extracted list.
+
+    Each (entity type, entity) appears once per document, so counts over the
+    index are counts of documents.
+    """
+    seen = set()
+    rows = []
+    for entity_type, column in ENTITY_COLUMNS.items():
+        for value in features.get(column) or []:
+            entity = normalise_entity(value)
+            if not entity or (entity_type, entity) in seen:
+                continue
+            seen.add((entity_type, entity))
+            rows.append({
+                'entity_type': entity_type, 'entity': entity, 'source_type': source_type,
+                'source_id': source_id, 'user_id': user_id, 'question_id': question_id
+            })
+    return rows
+
+def _features(row) -> Dict[str, Optional[list]]:
+    return {column: getattr(row, column) for column in ENTITY_COLUMNS.values()}
+
+def _replace(row, source_type: str, user_id: Optional[int]):
+    if row.id is None:
+        db.session.flush()
+    ConceptMention.query.filter_by(source_type=source_type, source_id=row.id).delete(synchronize_session=False)
+    rows = mention_rows(source_type, row.id, user_id, row.question_id, _features(row))
+    if rows:
+        db.session.bulk_insert_mappings(ConceptMention, rows)
+
+def index_answer(answer: Answer):
+    """Replace an answer's mentions with its current extracted terms (caller commits)"""
+    _replace(answer, SOURCE_ANSWER, answer.user_id)
+
+def index_topper_answer(topper_answer: TopperAnswer):
+    """Replace a topper answer's mentions with its current extracted terms (caller commits)"""
+    _replace(topper_answer, SOURCE_TOPPER, None)
+
+def rebuild_concept_index(source_types: Iterable[str] = (SOURCE_ANSWER, SOURCE_TOPPER)) -> Dict[str, int]:
+    """
+    Recompute the mention index from the stored feature columns. Used to backfill
+    existing answers and to repair the index after bulk imports that bypass the
+    write path. Returns mention rows written per source type.
+    """
+    models = {SOURCE_ANSWER: Answer, SOURCE_TOPPER: TopperAnswer}
+    written = {}
+    for source_type in source_types:
+        model = models[source_type]
+        ConceptMention.query.filter_by(source_type=source_type).delete(synchronize_session=False)
+        user_column = model.user_id if source_type == SOURCE_ANSWER else db.null()
+        documents = db.session.query(
+            model.id, user_column, model.question_id,
+            *(getattr(model, column) for column in ENTITY_COLUMNS.values())
+        ).order_by(model.id)
+
+        rows: List[Dict] = []
+        written[source_type] = 0
+        for document in documents.yield_per(REBUILD_CHUNK):
+            rows.extend(mention_rows(
+                source_type, document[0], document[1], document[2],
+                dict(zip(ENTITY_COLUMNS.values(), document[3:]))
+            ))
+            if len(rows) >= REBUILD_CHUNK:
+                db.session.execute(ConceptMention.__table__.insert(), rows)
+                written[source_type] += len(rows)
+                rows = []
+        if rows:
+            db.session.execute(ConceptMention.__table__.insert(), rows)
+            written[source_type] += len(rows)
+    db.session.commit()
+    return written
+
+def user_concept_coverage(user_id, entity_type: str = None, limit: int = 50) -> Dict:
+    """
+    Terms a user has used, per entity type, with the number of answers and
+    questions each appears in. One GROUP BY over the (user, type, entity) index.
+    """
+    user_id = int(user_id)
+    total_answers = db.session.query(func.count(Answer.id)).filter(Answer.user_id == user_id).scalar() or 0
+
+    answers = func.count(ConceptMention.id).label('answers')
+    query = db.session.query(
+        ConceptMention.entity_type,
+        ConceptMention.entity,
+        answers,
+        func.count(func.distinct(ConceptMention.question_id)).label('questions')
+    ).filter(ConceptMention.user_id == user_id)
+    if entity_type is not None:
+        query = query.filter(ConceptMention.entity_type == entity_type)
+    rows = query.group_by(
+        ConceptMention.entity_type, ConceptMention.entity
+    ).order_by(answers.desc(), ConceptMention.entity).all()
+
+    concepts = {name: [] for name in ((entity_type,) if entity_type else ENTITY_TYPES)}
+    distinct = {name: 0 for name in concepts}
+    for row in rows:
+        distinct[row.entity_type] += 1
+        if len(concepts[row.entity_type]) < limit:
+            concepts[row.entity_type].append({
+                'entity': row.entity,
+                'answers': row.answers,
+                'questions': row.questions,
+                'share': round(row.answers / total_answers, 3) if total_answers else 0
+            })
+
+    return {
+        'total_answers': total_answers,
+        'distinct_concepts': distinct,
+        'concepts': concepts
+    }
+
+def question_concept_comparison(user_id, question_id: int, entity_type: str = None) -> Dict:
+    """
+    A user's terms for one question next to the toppers'. Two GROUP BYs, one per
+    index: topper mentions by question, the user's mentions by user.
+    """
+    user_id = int(user_id)
+    topper_total = db.session.query(func.count(TopperAnswer.id)).filter(
+        TopperAnswer.question_id == question_id
+    ).scalar() or 0
+    user_total = db.session.query(func.count(Answer.id)).filter(
+        Answer.user_id == user_id, Answer.question_id == question_id
+    ).scalar() or 0
+
+    def counts(*criteria):
+        query = db.session.query(
+            ConceptMention.entity_type, ConceptMention.entity, func.count(ConceptMention.id)
+        ).filter(*criteria)
+        if entity_type is not None:
+            query = query.filter(ConceptMention.entity_type == entity_type)
+        return {
+            (row[0], row[1]): row[2]
+            for row in query.group_by(ConceptMention.entity_type, ConceptMention.entity)
+        }
+
+    topper_counts = counts(ConceptMention.question_id == question_id, ConceptMention.source_type == SOURCE_TOPPER)
+    user_counts = counts(ConceptMention.user_id == user_id, ConceptMention.question_id == question_id)
+
+    concepts = []
+    for key in set(topper_counts) | set(user_counts):
+        topper_answers = topper_counts.get(key, 0)
+        user_answers = user_counts.get(key, 0)
+        concepts.append({
+            'entity_type': key[0],
+            'entity': key[1],
+            'topper_answers': topper_answers,
+            'topper_share': round(topper_answers / topper_total, 3) if topper_total else 0,
+            'user_answers': user_answers,
+            'user_share': round(user_answers / user_total, 3) if user_total else 0
+        })
+    concepts.sort(key=lambda c: (-c['topper_answers'], -c['user_answers'], c['entity_type'], c['entity']))
+
+    covered = sum(1 for key in topper_counts if key in user_counts)
+    return {
+        'question_id': question_id,
+        'topper_answers': topper_total,
+        'user_answers': user_total,
+        'topper_concepts': len(topper_counts),
+        'covered_concepts': covered,
+        'coverage': round(covered / len(topper_counts), 3) if topper_counts else None,
+        'missing': [c for c in concepts if c['topper_answers'] and not c['user_answers']],
+        'concepts': concepts
+    }
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+# Plain SQL so the standalone seed and migration scripts, which define their own
+# db and models, can bump versions without importing the app's models.
+CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS content_version (
+        name VARCHAR(50) PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0,
+        updated_at DATETIME
+    )
+'''
+
+SYLLABUS = 'syllabus'
+
+def bump_content_version(session, name: str) -> None:
+    """Increment the version of a kind of reference data inside the caller's transaction"""
+    session.execute(text(CREATE_TABLE))
+    params = {'name': name, 'now': datetime.utcnow()}
+    updated = session.execute(
+        text('UPDATE content_version SET version = version + 1, updated_at = :now WHERE name = :name'), params
+    ).rowcount
+    if not updated:
+        session.execute(
+            text('INSERT INTO content_version (name, version, updated_at) VALUES (:name, 1, :now)'), params
+        )
+
+def read_content_version(engine, name: str) -> int:
+    """Current version, 0 when it was never bumped or the table does not exist yet"""
+    try:
+        with engine.connect() as conn:
+            version = conn.execute(
+                text('SELECT version FROM content_version WHERE name = :name'), {'name': name}
+            ).scalar()
+    except Exception:
+        return 0
+    return version or 0
@@ -0,0 +1,153 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from app.models.answer import Answer
+from app.services.instrumentation import Counter, register_metric
+
+# Tiers, cheapest first
+TIER_SHORT = 'short'
+TIER_DUPLICATE = 'duplicate'
+TIER_LOCAL = 'local'
+TIER_LLM_CHEAP = 'llm_cheap'
+TIER_LLM = 'llm'
+
+# USD per 1K tokens (prompt, completion); override with LLM_PRICES='{"model": [prompt, completion]}'
+DEFAULT_PRICES = {
+    'gpt-4': (0.03, 0.06),
+    'gpt-4-turbo': (0.01, 0.03),
+    'gpt-4o': (0.005, 0.015),
+    'gpt-4o-mini': (0.00015, 0.0006),
+    'gpt-3.5-turbo': (0.0005, 0.0015),
+}
+
+evaluations_total = register_metric(Counter(
+    'sociowizard_evaluations_total', 'Answer evaluations by tier', ('tier',)
+))
+llm_tokens_total = register_metric(Counter(
+    'sociowizard_llm_tokens_total', 'LLM tokens used for evaluation', ('model', 'kind')
+))
+llm_cost_total = register_metric(Counter(
+    'sociowizard_llm_cost_usd_total', 'Estimated LLM spend in USD', ('model',)
+))
+possible_copies_total = register_metric(Counter(
+    'sociowizard_possible_copies_total', 'Answers near-duplicating a topper answer or another user\'s answer', ('source',)
+))
+
+class EvaluationPolicy:
+    """Decides which tier evaluates an answer.
+
+    Short answers and near-duplicates of the user's own evaluated answers never
+    reach the LLM; otherwise the local evaluator's confidence decides: confident scores stay local, moderately
+    uncertain ones go to the cheap model and the rest to the main model.
+
+    EVALUATION_POLICY=tiered (default) | llm (always the main model) | local (never the LLM)
+    """
+    def __init__(self):
+        self.mode = os.environ.get('EVALUATION_POLICY', 'tiered')
+        self.min_llm_words = int(os.environ.get('EVAL_MIN_LLM_WORDS', 80))
+        self.local_confidence = float(os.environ.get('EVAL_LOCAL_CONFIDENCE', 0.75))
+        self.cheap_confidence = float(os.environ.get('EVAL_CHEAP_CONFIDENCE', 0.5))
+        self.model = os.environ.get('OPENAI_MODEL', 'gpt-4')
+        self.cheap_model = os.environ.get('EVAL_CHEAP_MODEL', 'gpt-3.5-turbo')
+        self.prices = dict(DEFAULT_PRICES)
+        if os.environ.get('LLM_PRICES'):
+            self.prices.update({model: tuple(price) for model, price in json.loads(os.environ['LLM_PRICES']).items()})
+
+    def choose_tier(self, answer_text: str, local_result: Dict, reusable: Optional[Dict] = None,
+                    llm_available: bool = True) -> str:
+        """reusable is the user's own earlier evaluation from reuse_duplicate, if any"""
+        if self.mode == 'local' or not llm_available:
+            return TIER_LOCAL
+        if self.mode == 'llm':
+            return TIER_LLM
+        if len(answer_text.split()) < self.min_llm_words:
+            return TIER_SHORT
+        if reusable is not None:
+            return TIER_DUPLICATE
+
+        confidence = local_result.get('confidence', 0.0)
+        if confidence >= self.local_confidence:
+            return TIER_LOCAL
+        if self.cheap_model and confidence >= self.cheap_confidence:
+            return TIER_LLM_CHEAP
+        return TIER_LLM
+
+    def model_for(self, tier: str) -> str:
+        return self.cheap_model if tier == TIER_LLM_CHEAP else self.model
+
+    def reuse_duplicate(self, near_duplicates: Optional[List[Dict]], user_id) -> Optional[Dict]:
+        """Evaluation of the user's own most similar, already evaluated earlier answer"""
+        ids = [d['source_id'] for d in near_duplicates or [] if _own(d, user_id)]
+        if not ids:
+            return None
+        earlier = {a.id: a for a in Answer.query.filter(
+            Answer.id.in_(ids), Answer.evaluated_at.isnot(None)
+        ).all()}
+        for answer_id in ids:
+            answer = earlier.get(answer_id)
+            if answer is not None:
+                return {
+                    'structure_score': answer.structure_score,
+                    'content_score': answer.content_score,
+                    'sociological_depth_score': answer.sociological_depth_score,
+                    'overall_score': answer.overall_score,
+                    'feedback': answer.feedback,
+                    'keywords_used': answer.keywords_used or [],
+                    'thinkers_mentioned': answer.thinkers_mentioned or [],
+                    'theories_referenced': answer.theories_referenced or [],
+                    'strengths': [],
+                    'areas_for_improvement': [],
+                    'reused_from_answer_id': answer.id
+                }
+        return None
+
+    def possible_copying(self, near_duplicates: Optional[List[Dict]], user_id) -> bool:
+        """Whether the answer near-duplicates a topper answer or another user's answer; counted per source"""
+        sources = {d['source_type'] for d in near_duplicates or [] if not _own(d, user_id)}
+        for source in sources:
+            possible_copies_total.inc(source)
+        return bool(sources)
+
+    def record(self, tier: str):
+        evaluations_total.inc(tier)
+
+    def record_usage(self, model: str, usage) -> float:
+        """Count the tokens of one LLM call and return its estimated cost in USD"""
+        if usage is None:
+            return 0.0
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        llm_tokens_total.inc(model, 'prompt', value=prompt_tokens)
+        llm_tokens_total.inc(model, 'completion', value=completion_tokens)
+
+        prompt_price, completion_price = self.prices.get(model, self.prices.get(self.model, (0.0, 0.0)))
+        cost = (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+        llm_cost_total.inc(model, value=cost)
+        return round(cost, 6)
+
+def _own(duplicate: Dict, user_id) -> bool:
+    return duplicate['source_type'] == 'answer' and user_id is not None and str(duplicate['user_id']) == str(user_id)
+
+def evaluation_stats() -> Dict:
+    """Per-tier evaluation counts and LLM token/cost totals"""
+    tokens = {}
+    for (model, kind), value in llm_tokens_total.snapshot().items():
+        tokens.setdefault(model, {})[f'{kind}_tokens'] = int(value)
+    for (model,), value in llm_cost_total.snapshot().items():
+        tokens.setdefault(model, {})['cost_usd'] = round(value, 4)
+    return {
+        'tiers': {tier: int(value) for (tier,), value in evaluations_total.snapshot().items()},
+        'possible_copies': {source: int(value) for (source,), value in possible_copies_total.snapshot().items()},
+        'llm': tokens
+    }
+
+_policy = None
+
+def get_evaluation_policy() -> EvaluationPolicy:
+    global _policy
+    if _policy is None:
+        _policy = EvaluationPolicy()
+    return _policy
@@ -1,6 +1,4 @@
-import random
-import re
-from typing import Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import os
 from dotenv import load_dotenv
 
@@ -9,72 +7,165 @@ load_dotenv()
 # Import ChatGPT service
 try:
     from .chatgpt_service import ChatGPTService
+    from .async_chatgpt_service import AsyncChatGPTService
     chatgpt_available = True
 except ImportError:
     chatgpt_available = False
 
-def evaluate_answer(answer_text: str, question) -> Dict:
+from .evaluation_policy import get_evaluation_policy, TIER_DUPLICATE, TIER_LLM, TIER_LLM_CHEAP, TIER_LOCAL
+
+def evaluate_answer(answer_text: str, question, near_duplicates: List[Dict] = None, user_id=None) -> Dict:
     """
-    Evaluate an answer using AI/LLM
-    First tries ChatGPT API, falls back to basic evaluation if not available
+    Evaluate an answer through the tiered policy (see EvaluationPolicy).
+    The local evaluator always runs first; the LLM is called only for uncertain
+    answers, and its failures fall back to the local result.
     """
+    policy, local_result, tier, reusable = _plan_evaluation(answer_text, question, near_duplicates, user_id)
     
-    # Try ChatGPT API if available and configured
-    if chatgpt_available and os.getenv('OPENAI_API_KEY'):
+    result = local_result
+    if tier == TIER_DUPLICATE:
+        result = reusable
+    elif tier in (TIER_LLM, TIER_LLM_CHEAP):
+        model = policy.model_for(tier)
         try:
-            chatgpt_service = ChatGPTService()
-            question_text = question.question_text if question else "General Sociology Question"
-            return chatgpt_service.evaluate_answer(answer_text, question_text)
+            chatgpt_service = ChatGPTService(model=model)
+            llm_result = chatgpt_service.evaluate_answer(answer_text, _question_text(question))
+            result = _accept_llm_result(policy, model, chatgpt_service, llm_result)
         except Exception as e:
             print(f"ChatGPT evaluation failed, using fallback: {e}")
+            result = None
+        if result is None:
+            result, tier = local_result, TIER_LOCAL
     
-    # Fallback to basic evaluation
-    return _basic_evaluation(answer_text, question)
+    _finish(policy, tier, result, local_result)
+    return result
 
-def _basic_evaluation(answer_text: str, question) -> Dict:
+def stream_evaluate_answer(answer_text: str, question, near_duplicates: List[Dict] = None,
+                           user_id=None) -> Iterator[Tuple[str, Any]]:
     """
-    Basic evaluation logic (fallback when ChatGPT is not available)
+    Streaming variant of evaluate_answer.
+    Yields ('local', local_result) straight away, then ('tier', name), then the
+    LLM's ('token', text) and ('field', ...) events when the answer is escalated,
+    and finally ('result', evaluation).
     """
-    # Analyze answer length and structure
-    word_count = len(answer_text.split())
-    paragraphs = len([p for p in answer_text.split('\n\n') if p.strip()])
-    
-    # Simulate structure score based on answer organization
-    structure_score = min(10, max(1, random.uniform(6, 9) + (paragraphs * 0.5)))
-    
-    # Simulate content score based on length and keywords
-    content_score = min(10, max(1, random.uniform(5, 8) + (word_count / 100)))
-    
-    # Simulate sociological depth score
-    sociological_depth_score = min(10, max(1, random.uniform(4, 8)))
+    policy, local_result, tier, reusable = _plan_evaluation(answer_text, question, near_duplicates, user_id)
+    yield 'local', local_result
+    yield 'tier', tier
     
-    # Calculate overall score
-    overall_score = round((structure_score + content_score + sociological_depth_score) / 3, 2)
-    
-    # Extract keywords (placeholder)
-    keywords_used = extract_keywords(answer_text)
-    
-    # Extract thinkers mentioned (placeholder)
-    thinkers_mentioned = extract_thinkers(answer_text)
+    result = local_result
+    if tier == TIER_DUPLICATE:
+        result = reusable
+    elif tier in (TIER_LLM, TIER_LLM_CHEAP):
+        model = policy.model_for(tier)
+        try:
+            chatgpt_service = ChatGPTService(model=model)
+            llm_result = None
+            for event, data in chatgpt_service.stream_evaluation(answer_text, _question_text(question)):
+                if event == 'result':
+                    llm_result = data
+                else:
+                    yield event, data
+            result = _accept_llm_result(policy, model, chatgpt_service, llm_result)
+        except Exception as e:
+            print(f"Streamed ChatGPT evaluation failed, using fallback: {e}")
+            result = None
+        if result is None:
+            result, tier = local_result, TIER_LOCAL
     
-    # Extract theories referenced (placeholder)
-    theories_referenced = extract_theories(answer_text)
+    _finish(policy, tier, result, local_result)
+    yield 'result', result
+
+def begin_evaluation(answer_text: str, question, near_duplicates: List[Dict] = None,
+                     user_id=None) -> Tuple[str, Dict, Optional[Dict]]:
+    """
+    Synchronous first half of an evaluation for the background job path.
+    Returns (tier, local_result, result): result is the finished evaluation, or
+    None when the tier needs the LLM and finish_evaluation_async must complete it.
+    """
+    policy, local_result, tier, reusable = _plan_evaluation(answer_text, question, near_duplicates, user_id)
+    if tier in (TIER_LLM, TIER_LLM_CHEAP):
+        return tier, local_result, None
     
-    # Generate feedback (placeholder)
-    feedback = generate_feedback(structure_score, content_score, sociological_depth_score, answer_text)
+    result = local_result
+    if tier == TIER_DUPLICATE:
+        result = reusable
+    _finish(policy, tier, result, local_result)
+    return tier, local_result, result
+
+async def finish_evaluation_async(answer_text: str, question_text: str, tier: str, local_result: Dict) -> Dict:
+    """
+    LLM half of an evaluation started by begin_evaluation; runs on the LLM worker's loop.
+    Failures fall back to the local result, as in evaluate_answer.
+    """
+    policy = get_evaluation_policy()
+    model = policy.model_for(tier)
+    try:
+        chatgpt_service = AsyncChatGPTService(model=model)
+        llm_result = await chatgpt_service.evaluate_answer(answer_text, question_text)
+        result = _accept_llm_result(policy, model, chatgpt_service, llm_result)
+    except Exception as e:
+        print(f"Async ChatGPT evaluation failed, using fallback: {e}")
+        result = None
+    if result is None:
+        result, tier = local_result, TIER_LOCAL
     
-    return {
-        'structure_score': round(structure_score, 2),
-        'content_score': round(content_score, 2),
-        'sociological_depth_score': round(sociological_depth_score, 2),
-        'overall_score': overall_score,
-        'feedback': feedback,
-        'keywords_used': keywords_used,
-        'thinkers_mentioned': thinkers_mentioned,
-        'theories_referenced': theories_referenced,
-        'strengths': [],
-        'areas_for_improvement': []
-    }
+    _finish(policy, tier, result, local_result)
+    return result
+
+async def get_ai_suggestions_async(answer_text: str, question_text: str) -> Dict:
+    """
+    Coroutine variant of get_ai_suggestions for the LLM worker's loop
+    """
+    try:
+        return await AsyncChatGPTService().get_ai_suggestions(answer_text, question_text)
+    except Exception as e:
+        print(f"Async ChatGPT suggestions failed: {e}")
+        return {"error": "Failed to generate suggestions"}
+
+def llm_configured() -> bool:
+    """Whether the OpenAI client is importable and an API key is set"""
+    return chatgpt_available and bool(os.getenv('OPENAI_API_KEY'))
+
+def _question_text(question) -> str:
+    return question.question_text if question else "General Sociology Question"
+
+def _plan_evaluation(answer_text: str, question, near_duplicates: List[Dict], user_id):
+    """(policy, local_result, tier, reusable); reusable is the user's own earlier evaluation, if any.
+    Near-duplicates of toppers or other users are scored as usual and flagged as possible copying.
+    """
+    policy = get_evaluation_policy()
+    local_result = _basic_evaluation(answer_text, question)
+    local_result['possible_copying'] = policy.possible_copying(near_duplicates, user_id)
+    reusable = policy.reuse_duplicate(near_duplicates, user_id)
+    tier = policy.choose_tier(answer_text, local_result, reusable, llm_configured())
+    return policy, local_result, tier, reusable
+
+def _finish(policy, tier: str, result: Dict, local_result: Dict):
+    policy.record(tier)
+    result['evaluation_tier'] = tier
+    result['possible_copying'] = local_result['possible_copying']
+
+def _accept_llm_result(policy, model: str, chatgpt_service, llm_result: Dict) -> Dict:
+    """Record the call's cost; None when the service fell back to its own crude scoring"""
+    cost = policy.record_usage(model, chatgpt_service.last_usage)
+    if not llm_result or llm_result.get('evaluation_source') == 'fallback':
+        return None
+    return dict(llm_result, evaluation_source='llm', model=model, cost_usd=cost)
+
+def _basic_evaluation(answer_text: str, question) -> Dict:
+    """
+    Basic evaluation logic (fallback when ChatGPT is not available).
+    Deterministic: see LocalEvaluator for the scoring components.
+    """
+    from .local_evaluator import get_local_evaluator
+
+    return get_local_evaluator().evaluate(
+        answer_text,
+        question,
+        keywords=extract_keywords(answer_text),
+        thinkers=extract_thinkers(answer_text),
+        theories=extract_theories(answer_text)
+    )
 
 def evaluate_uploaded_file(file_content: bytes, file_type: str, question) -> Dict:
     """
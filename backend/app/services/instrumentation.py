@@ -0,0 +1,187 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Latency buckets in seconds, shared by every histogram
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.series: Dict[Tuple, Dict] = {}
+
+    def observe(self, value: float, *labels):
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            for labels, series in sorted(self.series.items()):
+                base = _format_labels(self.label_names, labels)
+                cumulative = 0
+                for bound, count in zip(self.buckets, series['buckets']):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{_format_labels(self.label_names + ("le",), labels + (str(bound),))} {cumulative}')
+                lines.append(f'{self.name}_bucket{_format_labels(self.label_names + ("le",), labels + ("+Inf",))} {series["count"]}')
+                lines.append(f'{self.name}_sum{base} {series["sum"]:.6f}')
+                lines.append(f'{self.name}_count{base} {series["count"]}')
+        return lines
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values"""
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.lock = threading.Lock()
+        self.series: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, value: float = 1.0):
+        with self.lock:
+            self.series[labels] = self.series.get(labels, 0.0) + value
+
+    def value(self, *labels) -> float:
+        with self.lock:
+            return self.series.get(labels, 0.0)
+
+    def snapshot(self) -> Dict[Tuple, float]:
+        with self.lock:
+            return dict(self.series)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self.lock:
+            for labels, value in sorted(self.series.items()):
+                lines.append(f'{self.name}{_format_labels(self.label_names, labels)} {value:g}')
+        return lines
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in values)
+    return '{' + ','.join(f'{n}="{v}"' for n, v in zip(names, escaped)) + '}'
+
+request_latency = Histogram(
+    'sociowizard_request_duration_seconds', 'HTTP request latency by route', ('method', 'route', 'status')
+)
+stage_latency = Histogram(
+    'sociowizard_stage_duration_seconds', 'Latency of named stages inside request handling', ('route', 'stage')
+)
+outbound_latency = Histogram(
+    'sociowizard_outbound_duration_seconds', 'Latency of outbound calls such as the OpenAI API', ('target', 'outcome')
+)
+db_statements = Histogram(
+    'sociowizard_db_statements_per_request', 'Database statements executed per request', ('route',), buckets=COUNT_BUCKETS
+)
+db_time = Histogram(
+    'sociowizard_db_duration_seconds_per_request', 'Time spent in database statements per request', ('route',)
+)
+
+METRICS = [request_latency, stage_latency, outbound_latency, db_statements, db_time]
+
+def register_metric(metric):
+    """Expose an additional Histogram or Counter on /metrics"""
+    METRICS.append(metric)
+    return metric
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+def _current_route() -> str:
+    if has_request_context() and request.url_rule is not None:
+        return request.url_rule.rule
+    return 'none'
+
+@contextmanager
+def span(name: str, kind: str = 'stage', target: str = None):
+    """Time a block of work.
+
+    Stage spans feed the per-route stage histogram; outbound spans feed the
+    outbound histogram under target. Both show up in the Server-Timing header when
+    recorded inside a request.
+    """
+    started = time.perf_counter()
+    outcome = 'ok'
+    try:
+        yield
+    except Exception:
+        outcome = 'error'
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        if kind == 'outbound':
+            outbound_latency.observe(elapsed, target or name, outcome)
+        else:
+            stage_latency.observe(elapsed, _current_route(), name)
+        if has_request_context() and hasattr(g, '_timing_spans'):
+            g._timing_spans.append((name, elapsed))
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('_query_started')
+    elapsed = time.perf_counter() - started.pop() if started else 0.0
+    if has_request_context() and hasattr(g, '_db_statement_count'):
+        g._db_statement_count += 1
+        g._db_time += elapsed
+
+def _server_timing_token(name: str) -> str:
+    return ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+
+def init_instrumentation(app):
+    """Install request timing hooks and SQL statement counting on the app"""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_request_timer():
+        g._request_started = time.perf_counter()
+        g._db_statement_count = 0
+        g._db_time = 0.0
+        g._timing_spans = []
+
+    @app.after_request
+    def record_request_timing(response):
+        started = getattr(g, '_request_started', None)
+        if started is None:
+            return response
+
+        elapsed = time.perf_counter() - started
+        route = _current_route()
+        request_latency.observe(elapsed, request.method, route, str(response.status_code))
+        db_statements.observe(g._db_statement_count, route)
+        db_time.observe(g._db_time, route)
+
+        timings = [
+            f'total;dur={elapsed * 1000:.1f}',
+            f'db;desc="{g._db_statement_count} queries";dur={g._db_time * 1000:.1f}'
+        ]
+        timings.extend(f'{_server_timing_token(name)};dur={duration * 1000:.1f}' for name, duration in g._timing_spans)
+        response.headers['Server-Timing'] = ', '.join(timings)
+        return response
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from app.services.instrumentation import Counter, Histogram, register_metric
+
+limiter_wait = register_metric(Histogram(
+    'sociowizard_llm_limiter_wait_seconds', 'Time LLM calls waited for a limiter slot', ()
+))
+limiter_timeouts = register_metric(Counter(
+    'sociowizard_llm_limiter_timeouts_total', 'LLM calls that gave up waiting for a limiter slot', ()
+))
+
+class LLMLimiterTimeout(Exception):
+    """Raised when no LLM slot became free within the acquire timeout"""
+
+class LLMLimiter:
+    """Process-wide cap on concurrent LLM calls, with an optional requests-per-minute budget.
+
+    Every OpenAI call goes through slot(), so single submits, streams and batch
+    evaluations share one budget instead of each opening as many connections as
+    they have threads.
+    """
+    def __init__(self, max_concurrency: int, rpm: int = 0, acquire_timeout: float = 120.0):
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm
+        self.acquire_timeout = acquire_timeout
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.lock = threading.Lock()
+        self.started = deque()
+
+    def reserve_rate(self) -> float:
+        """Take a requests-per-minute slot: 0 on success, else seconds until one frees"""
+        with self.lock:
+            now = time.monotonic()
+            while self.started and now - self.started[0] >= 60:
+                self.started.popleft()
+            if len(self.started) < self.rpm:
+                self.started.append(now)
+                return 0.0
+            return 60 - (now - self.started[0])
+
+    def _wait_for_rate(self, deadline: float):
+        while True:
+            wait = self.reserve_rate()
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                raise LLMLimiterTimeout('LLM requests-per-minute budget exhausted')
+            time.sleep(wait)
+
+    @contextmanager
+    def slot(self):
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+        if not self.semaphore.acquire(timeout=self.acquire_timeout):
+            limiter_timeouts.inc()
+            raise LLMLimiterTimeout('No LLM slot available')
+        try:
+            if self.rpm:
+                try:
+                    self._wait_for_rate(deadline)
+                except LLMLimiterTimeout:
+                    limiter_timeouts.inc()
+                    raise
+            limiter_wait.observe(time.monotonic() - started)
+            yield
+        finally:
+            self.semaphore.release()
+
+class AsyncLLMLimiter:
+    """Coroutine counterpart of LLMLimiter for calls made on the LLM worker's event loop.
+
+    Waiting coroutines hold no thread, so the concurrency cap can be far higher
+    than the thread limiter's; the requests-per-minute budget is taken from the
+    thread limiter so both paths stay under one provider quota.
+    """
+    def __init__(self, max_concurrency: int, rate_limiter: LLMLimiter, acquire_timeout: float = 120.0):
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+        self.acquire_timeout = acquire_timeout
+        self.semaphore = None  # created on the event loop that first uses it
+
+    async def _wait_for_rate(self, deadline: float):
+        while True:
+            wait = self.rate_limiter.reserve_rate()
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                raise LLMLimiterTimeout('LLM requests-per-minute budget exhausted')
+            await asyncio.sleep(wait)
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            limiter_timeouts.inc()
+            raise LLMLimiterTimeout('No LLM slot available')
+        try:
+            if self.rate_limiter.rpm:
+                try:
+                    await self._wait_for_rate(deadline)
+                except LLMLimiterTimeout:
+                    limiter_timeouts.inc()
+                    raise
+            limiter_wait.observe(time.monotonic() - started)
+            yield
+        finally:
+            self.semaphore.release()
+
+llm_limiter = LLMLimiter(
+    max_concurrency=int(os.environ.get('LLM_MAX_CONCURRENCY', 8)),
+    rpm=int(os.environ.get('LLM_RPM', 0)),
+    acquire_timeout=float(os.environ.get('LLM_ACQUIRE_TIMEOUT', 120))
+)
+async_llm_limiter = AsyncLLMLimiter(
+    max_concurrency=int(os.environ.get('LLM_ASYNC_MAX_CONCURRENCY', 200)),
+    rate_limiter=llm_limiter,
+    acquire_timeout=float(os.environ.get('LLM_ACQUIRE_TIMEOUT', 120))
+)
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import func
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+from app.models.llm_job import LLMJob
+from app.services.instrumentation import Counter, register_metric
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+JOB_UNFINISHED = (JOB_PENDING, JOB_RUNNING)
+
+# How often each process deletes expired finished jobs and fails stale ones
+PRUNE_INTERVAL_SECONDS = 60
+# Unfinished jobs this long past their timeout were lost with the process running them
+STALE_GRACE_SECONDS = 60
+
+jobs_total = register_metric(Counter(
+    'sociowizard_llm_jobs_total', 'Background LLM jobs by kind and final status', ('kind', 'status')
+))
+
+class LLMWorker:
+    """Runs LLM coroutines on an asyncio event loop owned by one daemon thread.
+
+    Flask handlers stay synchronous: they hand a coroutine to submit(), return the
+    job id, and clients poll get(). Hundreds of jobs can await the API at once on
+    that single thread. Blocking work a job needs, such as saving results, goes
+    through run_blocking() so it never stalls the loop.
+
+    Job state lives in the llm_job table, so a poll is answered by whichever
+    server process receives it. A job is cancelled after job_timeout seconds, and
+    one still unfinished well past that (its process died) is marked failed.
+    Finished jobs are deleted job_ttl seconds after they finish.
+    """
+    def __init__(self, blocking_workers: int = 4, job_ttl: float = 3600, job_timeout: float = 600):
+        self.blocking_workers = blocking_workers
+        self.job_ttl = job_ttl
+        self.job_timeout = job_timeout
+        self.lock = threading.Lock()
+        self.pruned_at = 0.0
+        self.loop = None
+        self.thread = None
+        self.executor = None
+        self.pid = None
+
+    def _ensure_started(self):
+        # Started lazily, and again in a forked server worker: threads do not survive fork
+        with self.lock:
+            if self.loop is not None and self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.pruned_at = 0.0  # Sweep on the first submit after (re)starting
+            self.loop = asyncio.new_event_loop()
+            self.executor = ThreadPoolExecutor(max_workers=self.blocking_workers, thread_name_prefix='llm-worker-io')
+            self.thread = threading.Thread(target=self._run_loop, args=(self.loop,), name='llm-worker', daemon=True)
+            self.thread.start()
+
+    def _run_loop(self, loop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def submit(self, coroutine, owner_id, kind: str, **info) -> str:
+        """Record a pending job and schedule its coroutine; info is echoed back by get()"""
+        self._ensure_started()
+        # Captured here: the loop and its threads run outside any app context
+        engine = db.engine
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with engine.begin() as conn:
+            self._prune(conn, now)
+            conn.execute(LLMJob.__table__.insert().values(
+                id=job_id, kind=kind, owner_id=int(owner_id), status=JOB_PENDING,
+                info=json.dumps(info), created_at=now
+            ))
+        asyncio.run_coroutine_threadsafe(self._run(engine, job_id, kind, coroutine), self.loop)
+        return job_id
+
+    async def _run(self, engine, job_id: str, kind: str, coroutine):
+        try:
+            await self.run_blocking(_update_job, engine, job_id, {'status': JOB_RUNNING})
+            result = await asyncio.wait_for(coroutine, self.job_timeout)
+            values = {'status': JOB_COMPLETED, 'result': json.dumps(result, default=_json_default)}
+        except asyncio.TimeoutError:
+            print(f"LLM job {job_id} timed out")
+            values = {'status': JOB_FAILED, 'error': 'Job timed out'}
+        except Exception as e:
+            print(f"LLM job {job_id} failed: {e}")
+            coroutine.close()  # Not awaited when marking the job running failed
+            values = {'status': JOB_FAILED, 'error': str(e)}
+        values['finished_at'] = time.time()
+        try:
+            await self.run_blocking(_update_job, engine, job_id, values)
+        except Exception as e:
+            print(f"Saving LLM job {job_id} failed: {e}")
+        jobs_total.inc(kind, values['status'])
+
+    async def run_blocking(self, fn: Callable, *args) -> Any:
+        """Await fn(*args) run on the worker's thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _stale_before(self, now: float) -> float:
+        return now - self.job_timeout - STALE_GRACE_SECONDS
+
+    def _prune(self, conn, now: float):
+        if now - self.pruned_at < PRUNE_INTERVAL_SECONDS:
+            return
+        self.pruned_at = now
+        table = LLMJob.__table__
+        conn.execute(table.update().where(
+            table.c.status.in_(JOB_UNFINISHED), table.c.created_at < self._stale_before(now)
+        ).values(**_stale_values(now)))
+        conn.execute(table.delete().where(table.c.finished_at < now - self.job_ttl))
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """The job as stored, or None when it is unknown or expired"""
+        table = LLMJob.__table__
+        now = time.time()
+        with db.engine.begin() as conn:
+            row = conn.execute(table.select().where(table.c.id == job_id)).first()
+            if row is not None and row.status in JOB_UNFINISHED and row.created_at < self._stale_before(now):
+                # Lost with its process; fail it now rather than at the next sweep
+                conn.execute(table.update().where(
+                    table.c.id == job_id, table.c.status.in_(JOB_UNFINISHED)
+                ).values(**_stale_values(now)))
+                row = conn.execute(table.select().where(table.c.id == job_id)).first()
+        if row is None:
+            return None
+        return {
+            'job_id': row.id,
+            'kind': row.kind,
+            'owner_id': str(row.owner_id),
+            'status': row.status,
+            'created_at': row.created_at,
+            'finished_at': row.finished_at,
+            'result': json.loads(row.result) if row.result else None,
+            'error': row.error,
+            **json.loads(row.info or '{}')
+        }
+
+    def stats(self) -> Dict:
+        counts = {JOB_PENDING: 0, JOB_RUNNING: 0, JOB_COMPLETED: 0, JOB_FAILED: 0}
+        table = LLMJob.__table__
+        with db.engine.connect() as conn:
+            for status, count in conn.execute(
+                db.select(table.c.status, func.count()).group_by(table.c.status)
+            ):
+                counts[status] = count
+        return {'jobs': counts, 'running': self.loop is not None and self.pid == os.getpid()}
+
+def _update_job(engine, job_id: str, values: Dict):
+    # Only unfinished jobs: one already failed as stale stays failed
+    table = LLMJob.__table__
+    with engine.begin() as conn:
+        conn.execute(table.update().where(
+            table.c.id == job_id, table.c.status.in_(JOB_UNFINISHED)
+        ).values(**values))
+
+def _stale_values(now: float) -> Dict:
+    return {'status': JOB_FAILED, 'error': 'Job was interrupted', 'finished_at': now}
+
+def _json_default(value):
+    # numpy scalars and arrays from similarity scoring, datetimes from models
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+_llm_worker = None
+
+def get_llm_worker() -> LLMWorker:
+    global _llm_worker
+    if _llm_worker is None:
+        _llm_worker = LLMWorker(
+            blocking_workers=int(os.environ.get('LLM_WORKER_IO_THREADS', 4)),
+            job_ttl=float(os.environ.get('LLM_JOB_TTL', 3600)),
+            job_timeout=float(os.environ.get('LLM_JOB_TIMEOUT', 600))
+        )
+    return _llm_worker
@@ -0,0 +1,232 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+from app.models.topper_answer import TopperAnswer
+from app.services.structure_features import extract_structure_features, load_structure_features
+from app.services.topper_index import TextEmbedder
+from app.services.evaluation_service import (
+    extract_keywords, extract_thinkers, extract_theories, generate_feedback
+)
+
+DEFAULT_TARGET_WORDS = 250
+TOPPER_CACHE_SIZE = 256
+
+# Cosine similarity (in TextEmbedder space) at which an answer counts as fully on-topic
+TOPPER_SIMILARITY_SCALE = 0.5
+
+# Component weights per dimension; topper-based components drop out when a question has no toppers
+WEIGHTS = {
+    'structure': {'introduction': 0.25, 'conclusion': 0.25, 'paragraphing': 0.3, 'sentence_length': 0.2},
+    'content': {'length': 0.35, 'keyword_coverage': 0.3, 'topper_similarity': 0.35},
+    'sociological_depth': {'thinkers': 0.35, 'theories': 0.35, 'topper_lexicon_overlap': 0.3},
+}
+
+COMPONENT_ADVICE = {
+    'introduction': 'Open with an introduction that defines the key concept or frames the question.',
+    'conclusion': 'End with a conclusion or way forward that ties the argument together.',
+    'paragraphing': 'Organise the answer into 3 to 8 focused paragraphs.',
+    'sentence_length': 'Keep sentences between 12 and 28 words for readability.',
+    'length': 'Develop the answer further; it is shorter than the topper answers for this question.',
+    'keyword_coverage': 'Use more sociological vocabulary relevant to the question.',
+    'topper_similarity': 'Cover the core themes that topper answers to this question address.',
+    'thinkers': 'Support arguments with relevant sociological thinkers.',
+    'theories': 'Anchor the analysis in one or two theoretical perspectives.',
+    'topper_lexicon_overlap': 'Bring in the concepts and thinkers that topper answers rely on.',
+}
+
+COMPONENT_STRENGTHS = {
+    'introduction': 'Clear introduction',
+    'conclusion': 'Well-rounded conclusion',
+    'paragraphing': 'Good paragraph organisation',
+    'sentence_length': 'Readable sentence construction',
+    'length': 'Adequate length and coverage',
+    'keyword_coverage': 'Strong use of sociological vocabulary',
+    'topper_similarity': 'Addresses the themes topper answers cover',
+    'thinkers': 'Good use of sociological thinkers',
+    'theories': 'Sound theoretical grounding',
+    'topper_lexicon_overlap': 'Uses the concepts topper answers rely on',
+}
+
+def _paragraphing(paragraphs: float) -> float:
+    if paragraphs >= 3 and paragraphs <= 8:
+        return 1.0
+    if paragraphs > 8:
+        return 0.8
+    return {0: 0.0, 1: 0.2, 2: 0.5}[int(paragraphs)]
+
+def _sentence_length(mean_length: float) -> float:
+    if 12 <= mean_length <= 28:
+        return 1.0
+    distance = 12 - mean_length if mean_length < 12 else mean_length - 28
+    return max(0.0, 1.0 - distance / 15.0)
+
+def _length(words: float, target: float) -> float:
+    if words > 2.5 * target:
+        return 0.8
+    return min(1.0, words / target)
+
+def _weighted(components: Dict[str, float], weights: Dict[str, float]) -> float:
+    """Score out of 10 from the components that are present, weights renormalised"""
+    present = {name: weight for name, weight in weights.items() if name in components}
+    total = sum(present.values())
+    value = sum(components[name] * weight for name, weight in present.items()) / total
+    return round(1 + 9 * value, 2)
+
+def _lexicon(text: str) -> set:
+    return {term.lower() for term in extract_keywords(text) + extract_thinkers(text) + extract_theories(text)}
+
+class LocalEvaluator:
+    """Deterministic answer scoring from lexicon coverage, structure and topper similarity.
+
+    Every score is a weighted sum of named components in [0, 1] that are returned in
+    the breakdown, so the same answer always gets the same, explainable result.
+    Topper answers for a question are embedded once and cached until the question's
+    topper set changes.
+    """
+    def __init__(self, embedder: Optional[TextEmbedder] = None):
+        self._embedder = embedder
+        self._lock = threading.Lock()
+        self._topper_cache: OrderedDict = OrderedDict()
+
+    @property
+    def embedder(self) -> TextEmbedder:
+        if self._embedder is None:
+            self._embedder = TextEmbedder()
+        return self._embedder
+
+    def _topper_reference(self, question_id: int) -> Optional[Dict]:
+        """Embeddings, target length and lexicon of a question's topper answers"""
+        stamp = db.session.query(
+            db.func.count(TopperAnswer.id), db.func.max(TopperAnswer.updated_at)
+        ).filter(TopperAnswer.question_id == question_id).one()
+        if not stamp[0]:
+            return None
+
+        with self._lock:
+            cached = self._topper_cache.get(question_id)
+            if cached is not None and cached['stamp'] == tuple(stamp):
+                self._topper_cache.move_to_end(question_id)
+                return cached
+
+        rows = db.session.query(
+            TopperAnswer.answer_text, TopperAnswer.structure_features
+        ).filter(TopperAnswer.question_id == question_id).all()
+        texts = [row.answer_text for row in rows]
+        word_counts = [load_structure_features(row.structure_features, row.answer_text)[2] for row in rows]
+        lexicon = set()
+        for text in texts:
+            lexicon |= _lexicon(text)
+
+        reference = {
+            'stamp': tuple(stamp),
+            'vectors': self.embedder.embed(texts),
+            'target_words': float(min(400, max(150, np.median(word_counts)))),
+            'lexicon': lexicon,
+            'count': len(texts)
+        }
+        with self._lock:
+            self._topper_cache[question_id] = reference
+            while len(self._topper_cache) > TOPPER_CACHE_SIZE:
+                self._topper_cache.popitem(last=False)
+        return reference
+
+    def evaluate(self, answer_text: str, question=None, keywords: List[str] = None,
+                 thinkers: List[str] = None, theories: List[str] = None) -> Dict:
+        """Score an answer; returns the evaluation dict plus 'confidence' and 'breakdown'"""
+        keywords = extract_keywords(answer_text) if keywords is None else keywords
+        thinkers = extract_thinkers(answer_text) if thinkers is None else thinkers
+        theories = extract_theories(answer_text) if theories is None else theories
+
+        paragraphs, _, words, mean_sentence_length, has_introduction, has_conclusion = \
+            extract_structure_features(answer_text)
+        reference = self._topper_reference(question.id) if question is not None and question.id else None
+        target_words = reference['target_words'] if reference else DEFAULT_TARGET_WORDS
+
+        structure = {
+            'introduction': has_introduction,
+            'conclusion': has_conclusion,
+            'paragraphing': _paragraphing(paragraphs),
+            'sentence_length': _sentence_length(mean_sentence_length),
+        }
+        content = {
+            'length': _length(words, target_words),
+            'keyword_coverage': min(1.0, len(keywords) / 5.0),
+        }
+        depth = {
+            'thinkers': min(1.0, len(thinkers) / 3.0),
+            'theories': min(1.0, len(theories) / 2.0),
+        }
+
+        if reference:
+            vector = self.embedder.embed([answer_text])[0]
+            best = float((reference['vectors'] @ vector).max())
+            content['topper_similarity'] = min(1.0, max(0.0, best) / TOPPER_SIMILARITY_SCALE)
+            if reference['lexicon']:
+                used = {term.lower() for term in keywords + thinkers + theories}
+                depth['topper_lexicon_overlap'] = len(used & reference['lexicon']) / len(reference['lexicon'])
+
+        structure_score = _weighted(structure, WEIGHTS['structure'])
+        content_score = _weighted(content, WEIGHTS['content'])
+        sociological_depth_score = _weighted(depth, WEIGHTS['sociological_depth'])
+        overall_score = round((structure_score + content_score + sociological_depth_score) / 3, 2)
+
+        components = {**structure, **content, **depth}
+        strengths = [COMPONENT_STRENGTHS[name] for name, value in components.items() if value >= 0.8]
+        areas = [COMPONENT_ADVICE[name] for name, value in sorted(components.items(), key=lambda c: c[1]) if value < 0.5]
+        if reference and depth.get('topper_lexicon_overlap', 1.0) < 0.5:
+            missing = sorted(reference['lexicon'] - {term.lower() for term in keywords + thinkers + theories})
+            if missing:
+                areas.append(f"Terms used in topper answers that are missing here: {', '.join(missing[:5])}.")
+
+        return {
+            'structure_score': structure_score,
+            'content_score': content_score,
+            'sociological_depth_score': sociological_depth_score,
+            'overall_score': overall_score,
+            'feedback': generate_feedback(structure_score, content_score, sociological_depth_score, answer_text),
+            'keywords_used': keywords,
+            'thinkers_mentioned': thinkers,
+            'theories_referenced': theories,
+            'strengths': strengths,
+            'areas_for_improvement': areas,
+            'confidence': self._confidence(components, words, reference),
+            'breakdown': {
+                'structure': {name: round(value, 3) for name, value in structure.items()},
+                'content': {name: round(value, 3) for name, value in content.items()},
+                'sociological_depth': {name: round(value, 3) for name, value in depth.items()},
+                'reference': {
+                    'topper_answers': reference['count'] if reference else 0,
+                    'target_words': target_words
+                }
+            },
+            'evaluation_source': 'local'
+        }
+
+    def _confidence(self, components: Dict[str, float], words: float, reference: Optional[Dict]) -> float:
+        """How far the local score can be trusted, in [0, 1].
+
+        Higher with topper answers to compare against, with enough text to judge and
+        when the components agree with each other.
+        """
+        coverage = 1.0 if reference else 0.5
+        length = min(1.0, words / 150.0)
+        agreement = 1.0 - min(1.0, 2 * float(np.std(list(components.values()))))
+        return round(0.4 * coverage + 0.3 * length + 0.3 * agreement, 2)
+
+_evaluator = None
+_evaluator_lock = threading.Lock()
+
+def get_local_evaluator() -> LocalEvaluator:
+    """Process-wide evaluator so topper embeddings are cached across requests"""
+    global _evaluator
+    with _evaluator_lock:
+        if _evaluator is None:
+            _evaluator = LocalEvaluator()
+        return _evaluator
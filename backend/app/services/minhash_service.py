@@ -0,0 +1,197 @@
+import hashlib
+import re
+import sys
+import os
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import tuple_
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+from app.models.minhash import LshBucket
+from app.models.answer import Answer
+from app.models.topper_answer import TopperAnswer
+
+# 16 bands of 8 rows: pairs above ~0.7 Jaccard almost always share a bucket
+NUM_PERMUTATIONS = 128
+NUM_BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // NUM_BANDS
+SHINGLE_SIZE = 5
+DUPLICATE_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERMUTATIONS, dtype=np.int64).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERMUTATIONS, dtype=np.int64).astype(np.uint64)
+
+SOURCE_ANSWER = 'answer'
+SOURCE_TOPPER = 'topper'
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """Word n-gram shingles of normalised text"""
+    tokens = re.findall(r'[a-z0-9]+', (text or '').lower())
+    if not tokens:
+        return []
+    if len(tokens) <= size:
+        return [' '.join(tokens)]
+    return [' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+def compute_signature(text: str) -> Optional[np.ndarray]:
+    """MinHash signature (uint32 per permutation), None for texts without words"""
+    shingle_list = shingles(text)
+    if not shingle_list:
+        return None
+
+    hashes = np.array(
+        [zlib.crc32(s.encode('utf-8')) for s in set(shingle_list)], dtype=np.uint64
+    )
+    # (a * x + b) mod p for every permutation and shingle; a, x < 2^32 so no overflow
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return (permuted.min(axis=1) & _MAX_HASH).astype(np.uint32)
+
+def signature_to_bytes(signature: Optional[np.ndarray]) -> Optional[bytes]:
+    return signature.astype('<u4').tobytes() if signature is not None else None
+
+def signature_from_bytes(data: Optional[bytes]) -> Optional[np.ndarray]:
+    return np.frombuffer(data, dtype='<u4') if data else None
+
+def band_hashes(signature: np.ndarray) -> List[Tuple[int, int]]:
+    """(band, bucket) keys for a signature"""
+    keys = []
+    for band in range(NUM_BANDS):
+        chunk = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].astype('<u4').tobytes()
+        bucket = int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), 'big', signed=True)
+        keys.append((band, bucket))
+    return keys
+
+def estimate_similarity(signature1: np.ndarray, signature2: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the underlying shingle sets"""
+    return float(np.mean(signature1 == signature2))
+
+class NearDuplicateService:
+    """Near-duplicate detection over answers and topper answers with MinHash + banded LSH"""
+
+    def __init__(self, threshold: float = None):
+        self.threshold = threshold or float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', DUPLICATE_THRESHOLD))
+
+    def index_answer(self, answer: Answer) -> Optional[np.ndarray]:
+        """Store the signature on the answer and add its LSH buckets (caller commits)"""
+        return self._index(answer, SOURCE_ANSWER, answer.user_id)
+
+    def index_topper_answer(self, topper_answer: TopperAnswer) -> Optional[np.ndarray]:
+        """Store the signature on the topper answer and add its LSH buckets (caller commits)"""
+        return self._index(topper_answer, SOURCE_TOPPER, None)
+
+    def _index(self, row, source_type: str, user_id: Optional[int]) -> Optional[np.ndarray]:
+        signature = compute_signature(row.answer_text)
+        row.minhash_signature = signature_to_bytes(signature)
+        if signature is None:
+            return None
+
+        if row.id is None:
+            db.session.flush()
+        LshBucket.query.filter_by(source_type=source_type, source_id=row.id).delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(LshBucket, [
+            {'band': band, 'bucket': bucket, 'source_type': source_type, 'source_id': row.id, 'user_id': user_id}
+            for band, bucket in band_hashes(signature)
+        ])
+        return signature
+
+    def find_near_duplicates(self, signature: Optional[np.ndarray], exclude: Tuple[str, int] = None,
+                             user_id: int = None, limit: int = 10) -> List[Dict]:
+        """Answers and topper answers whose estimated Jaccard similarity passes the threshold.
+
+        Only candidates sharing at least one LSH bucket are compared, so the cost
+        depends on the number of collisions rather than the corpus size. Pass user_id
+        to restrict answer candidates to one user's earlier submissions.
+        """
+        if signature is None:
+            return []
+
+        query = db.session.query(LshBucket.source_type, LshBucket.source_id).filter(
+            tuple_(LshBucket.band, LshBucket.bucket).in_(band_hashes(signature))
+        )
+        if user_id is not None:
+            query = query.filter(
+                (LshBucket.source_type == SOURCE_TOPPER) | (LshBucket.user_id == user_id)
+            )
+        candidates = set(query.distinct().all())
+        candidates.discard(exclude)
+        if not candidates:
+            return []
+
+        duplicates = []
+        for source_type, model in ((SOURCE_ANSWER, Answer), (SOURCE_TOPPER, TopperAnswer)):
+            ids = [source_id for kind, source_id in candidates if kind == source_type]
+            if not ids:
+                continue
+            columns = [model.id, model.minhash_signature]
+            if model is Answer:
+                columns.append(Answer.user_id)
+            for row in db.session.query(*columns).filter(model.id.in_(ids)).all():
+                other = signature_from_bytes(row.minhash_signature)
+                if other is None:
+                    continue
+                similarity = estimate_similarity(signature, other)
+                if similarity >= self.threshold:
+                    duplicates.append({
+                        'source_type': source_type,
+                        'source_id': row.id,
+                        'user_id': row.user_id if model is Answer else None,
+                        'similarity': round(similarity, 3)
+                    })
+
+        duplicates.sort(key=lambda d: d['similarity'], reverse=True)
+        return duplicates[:limit]
+
+    def cluster(self) -> List[List[Tuple[str, int]]]:
+        """Group every indexed document into near-duplicate clusters (batch mode)"""
+        colliding = db.session.query(LshBucket.band, LshBucket.bucket).group_by(
+            LshBucket.band, LshBucket.bucket
+        ).having(db.func.count(LshBucket.id) > 1).subquery()
+
+        members = db.session.query(
+            LshBucket.band, LshBucket.bucket, LshBucket.source_type, LshBucket.source_id
+        ).join(
+            colliding, (LshBucket.band == colliding.c.band) & (LshBucket.bucket == colliding.c.bucket)
+        ).order_by(LshBucket.band, LshBucket.bucket).all()
+
+        buckets = {}
+        for band, bucket, source_type, source_id in members:
+            buckets.setdefault((band, bucket), []).append((source_type, source_id))
+
+        signatures = {}
+        for source_type, model in ((SOURCE_ANSWER, Answer), (SOURCE_TOPPER, TopperAnswer)):
+            ids = sorted({source_id for _, _, kind, source_id in members if kind == source_type})
+            for start in range(0, len(ids), 500):
+                for row_id, data in db.session.query(model.id, model.minhash_signature).filter(
+                    model.id.in_(ids[start:start + 500])
+                ):
+                    signatures[(source_type, row_id)] = signature_from_bytes(data)
+
+        # Union-find over verified candidate pairs
+        parent = {}
+
+        def find(node):
+            parent.setdefault(node, node)
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for docs in buckets.values():
+            for i, first in enumerate(docs):
+                for second in docs[i + 1:]:
+                    if find(first) == find(second):
+                        continue
+                    sig1, sig2 = signatures.get(first), signatures.get(second)
+                    if sig1 is not None and sig2 is not None and estimate_similarity(sig1, sig2) >= self.threshold:
+                        parent[find(first)] = find(second)
+
+        clusters = {}
+        for node in parent:
+            clusters.setdefault(find(node), []).append(node)
+        return sorted((sorted(c) for c in clusters.values() if len(c) > 1), key=len, reverse=True)
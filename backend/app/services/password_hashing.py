@@ -0,0 +1,141 @@
+import math
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import bcrypt
+from app.services.instrumentation import Counter, Histogram, register_metric
+
+DEFAULT_LOG_ROUNDS = 12
+
+hash_seconds = register_metric(Histogram(
+    'sociowizard_password_hash_seconds', 'Password hashes and checks, including the wait for a hashing thread', ('operation',)
+))
+hash_rejections = register_metric(Counter(
+    'sociowizard_password_hash_rejected_total', 'Password operations refused before hashing', ('reason',)
+))
+
+class PasswordHasherBusy(Exception):
+    """Raised when no hashing slot became free within the acquire timeout"""
+
+class PasswordHasher:
+    """bcrypt on a small dedicated thread pool.
+
+    bcrypt releases the GIL, so at most `workers` hashes burn CPU at once however
+    many logins arrive together, and other requests keep their share of the
+    cores. Up to `queue_size` more callers wait for a thread; beyond that they get
+    PasswordHasherBusy after acquire_timeout seconds instead of piling up.
+    """
+    def __init__(self, workers: int, queue_size: int, acquire_timeout: float = 10.0):
+        self.workers = workers
+        self.acquire_timeout = acquire_timeout
+        self.semaphore = threading.BoundedSemaphore(workers + queue_size)
+        self.lock = threading.Lock()
+        self.executor = None
+        self.pid = None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # Created lazily, and again in a forked server worker: threads do not survive fork
+        with self.lock:
+            if self.executor is None or self.pid != os.getpid():
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+                self.pid = os.getpid()
+            return self.executor
+
+    def _run(self, operation: str, func, *args):
+        started = time.monotonic()
+        if not self.semaphore.acquire(timeout=self.acquire_timeout):
+            hash_rejections.inc('busy')
+            raise PasswordHasherBusy('No password hashing slot available')
+        try:
+            return self._executor().submit(func, *args).result()
+        finally:
+            self.semaphore.release()
+            hash_seconds.observe(time.monotonic() - started, operation)
+
+    def hash(self, password: str, rounds: int) -> str:
+        return self._run('hash', bcrypt.generate_password_hash, password, rounds).decode('utf-8')
+
+    def check(self, password_hash: str, password: str) -> bool:
+        """True when the password matches; malformed stored hashes never match"""
+        return self._run('check', _check, password_hash, password)
+
+def _check(password_hash: str, password: str) -> bool:
+    try:
+        return bcrypt.check_password_hash(password_hash, password)
+    except ValueError:
+        return False
+
+def hash_rounds(password_hash: str):
+    """Work factor recorded in a bcrypt hash ('$2b$12$...'), None if it is not one"""
+    parts = (password_hash or '').split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+def needs_rehash(password_hash: str, rounds: int) -> bool:
+    """Whether a verified hash was made with a different work factor than the configured one"""
+    stored = hash_rounds(password_hash)
+    return stored is not None and stored != rounds
+
+class LoginThrottle:
+    """Failed logins per client address over a sliding window, in this process's memory.
+
+    Only failures count, so a classroom behind one address can all sign in at
+    once while a guesser gets at most max_failures checks per window. The
+    least recently failing addresses are forgotten beyond max_addresses.
+    """
+    def __init__(self, max_failures: int, window_seconds: float, max_addresses: int = 10000):
+        self.max_failures = max_failures
+        self.window_seconds = window_seconds
+        self.max_addresses = max_addresses
+        self.lock = threading.Lock()
+        self.failures: 'OrderedDict[str, deque]' = OrderedDict()
+
+    def _recent(self, address: str, now: float) -> deque:
+        failures = self.failures.get(address)
+        if failures is None:
+            return deque()
+        while failures and now - failures[0] >= self.window_seconds:
+            failures.popleft()
+        if not failures:
+            del self.failures[address]
+        return failures
+
+    def retry_after(self, address: str) -> int:
+        """0 when the address may try to log in, else whole seconds until it may"""
+        if not self.max_failures:
+            return 0
+        with self.lock:
+            now = time.monotonic()
+            failures = self._recent(address, now)
+            if len(failures) < self.max_failures:
+                return 0
+            hash_rejections.inc('throttled')
+            return max(1, math.ceil(self.window_seconds - (now - failures[0])))
+
+    def record_failure(self, address: str):
+        if not self.max_failures:
+            return
+        with self.lock:
+            now = time.monotonic()
+            failures = self._recent(address, now)
+            failures.append(now)
+            self.failures[address] = failures
+            self.failures.move_to_end(address)
+            while len(self.failures) > self.max_addresses:
+                self.failures.popitem(last=False)
+
+password_hasher = PasswordHasher(
+    workers=int(os.environ.get('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2))),
+    queue_size=int(os.environ.get('PASSWORD_HASH_QUEUE', 64)),
+    acquire_timeout=float(os.environ.get('PASSWORD_HASH_ACQUIRE_TIMEOUT', 10))
+)
+login_throttle = LoginThrottle(
+    max_failures=int(os.environ.get('LOGIN_MAX_FAILURES', 10)),
+    window_seconds=float(os.environ.get('LOGIN_FAILURE_WINDOW_SECONDS', 300))
+)
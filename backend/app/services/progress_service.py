@@ -0,0 +1,97 @@
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterable
+
+from sqlalchemy import String, case, cast, func, literal, select, union_all
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+from app.models.answer import Answer
+from app.models.question import Question
+
+LEVEL_ALL = 'all'
+LEVEL_TOPIC = 'topic'
+LEVEL_SYLLABUS_TOPIC = 'syllabus_topic'
+LEVEL_SYLLABUS_SUBTOPIC = 'syllabus_subtopic'
+LEVELS = (LEVEL_ALL, LEVEL_TOPIC, LEVEL_SYLLABUS_TOPIC, LEVEL_SYLLABUS_SUBTOPIC)
+
+def user_aggregates(user_id, levels: Iterable[str] = LEVELS, recent_days: int = 7) -> Dict:
+    """
+    Answer counts and score averages for one user, in a single statement.
+
+    A CTE selects the user's answers once; each requested level is a conditional
+    aggregation over it (overall, per Answer.topic, per syllabus topic and
+    subtopic of the question), combined with UNION ALL. Returns {'all': row}
+    plus {'topic': {topic: row}}, {'syllabus_topic': {topic_id: row}} and
+    {'syllabus_subtopic': {subtopic_id: row}} for the requested levels. Each row has answers_count, scored_count, recent_count
+    (answers in the last recent_days days) and avg_overall, avg_structure,
+    avg_content, avg_depth (None when nothing is scored).
+    """
+    levels = [level for level in LEVELS if level in levels]
+    recent_since = datetime.utcnow() - timedelta(days=recent_days)
+
+    user_answers = db.session.query(
+        Answer.topic,
+        Answer.overall_score,
+        Answer.structure_score,
+        Answer.content_score,
+        Answer.sociological_depth_score,
+        Answer.submitted_at,
+        Question.syllabus_topic_id,
+        Question.syllabus_subtopic_id
+    ).outerjoin(
+        Question, Answer.question_id == Question.id
+    ).filter(
+        Answer.user_id == user_id
+    ).cte('user_answers')
+
+    def aggregate(level, key):
+        return select(
+            literal(level).label('level'),
+            key.label('key'),
+            func.count().label('answers_count'),
+            func.count(user_answers.c.overall_score).label('scored_count'),
+            func.sum(case((user_answers.c.submitted_at >= recent_since, 1), else_=0)).label('recent_count'),
+            func.avg(user_answers.c.overall_score).label('avg_overall'),
+            func.avg(user_answers.c.structure_score).label('avg_structure'),
+            func.avg(user_answers.c.content_score).label('avg_content'),
+            func.avg(user_answers.c.sociological_depth_score).label('avg_depth')
+        )
+
+    # Keys are cast to text so every branch of the union has the same column types
+    branches = {
+        LEVEL_ALL: aggregate(LEVEL_ALL, cast(literal(None), String)),
+        LEVEL_TOPIC: aggregate(LEVEL_TOPIC, cast(user_answers.c.topic, String)).group_by(user_answers.c.topic),
+        LEVEL_SYLLABUS_TOPIC: aggregate(
+            LEVEL_SYLLABUS_TOPIC, cast(user_answers.c.syllabus_topic_id, String)
+        ).group_by(user_answers.c.syllabus_topic_id),
+        LEVEL_SYLLABUS_SUBTOPIC: aggregate(
+            LEVEL_SYLLABUS_SUBTOPIC, cast(user_answers.c.syllabus_subtopic_id, String)
+        ).group_by(user_answers.c.syllabus_subtopic_id)
+    }
+    rows = db.session.execute(union_all(*(branches[level] for level in levels))).all()
+
+    result = {level: {} for level in levels if level != LEVEL_ALL}
+    for row in rows:
+        values = {
+            'answers_count': row.answers_count,
+            'scored_count': row.scored_count,
+            'recent_count': int(row.recent_count or 0),
+            'avg_overall': row.avg_overall,
+            'avg_structure': row.avg_structure,
+            'avg_content': row.avg_content,
+            'avg_depth': row.avg_depth
+        }
+        if row.level == LEVEL_ALL:
+            result[LEVEL_ALL] = values
+        elif row.level in (LEVEL_SYLLABUS_TOPIC, LEVEL_SYLLABUS_SUBTOPIC):
+            if row.key is not None:
+                result[row.level][int(row.key)] = values
+        else:
+            result[LEVEL_TOPIC][row.key] = values
+    return result
+
+def rounded(value, digits: int = 2):
+    """Round an average for display; 0 when there is none"""
+    return round(value, digits) if value else 0
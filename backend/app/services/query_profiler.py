@@ -0,0 +1,128 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter as ShapeCounter
+from contextlib import contextmanager
+from typing import List
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+from app.services.instrumentation import Counter, register_metric
+
+logger = logging.getLogger('sociowizard.queries')
+
+slow_queries = register_metric(Counter(
+    'sociowizard_slow_queries_total', 'SQL statements slower than SLOW_QUERY_MS', ('route',)
+))
+repeated_queries = register_metric(Counter(
+    'sociowizard_repeated_query_shapes_total', 'Statement shapes repeated within one request (likely N+1)', ('route',)
+))
+
+# Collectors are per thread, so statements from concurrent requests are not counted
+_local = threading.local()
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+def statement_shape(statement: str) -> str:
+    """Normalise a SQL statement so queries that differ only in parameters compare equal"""
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = re.sub(r'%\(\w+\)s|:\w+|%s', '?', shape)
+    shape = _PLACEHOLDER_LIST.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+class QueryCollector:
+    """Records every statement executed while it is active"""
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def shapes(self) -> ShapeCounter:
+        return ShapeCounter(statement_shape(s) for s in self.statements)
+
+def _collectors() -> List['QueryCollector']:
+    collectors = getattr(_local, 'collectors', None)
+    if collectors is None:
+        collectors = _local.collectors = []
+    return collectors
+
+@contextmanager
+def collect_queries():
+    """Collect statements executed in the block on the current thread"""
+    collector = QueryCollector()
+    _collectors().append(collector)
+    try:
+        yield collector
+    finally:
+        _collectors().remove(collector)
+
+@contextmanager
+def assert_max_queries(max_count: int):
+    """Test helper: fail if the block executes more than max_count statements.
+
+        with assert_max_queries(3):
+            client.get('/api/progress/summary', headers=auth_headers)
+    """
+    with collect_queries() as collector:
+        yield collector
+    if collector.count > max_count:
+        repeated = [f"  {count}x {shape}" for shape, count in collector.shapes().most_common() if count > 1]
+        details = '\n'.join(repeated) if repeated else '\n'.join(f"  {s}" for s in collector.statements)
+        raise AssertionError(f"Expected at most {max_count} queries, executed {collector.count}:\n{details}")
+
+def _route() -> str:
+    if has_request_context():
+        return request.url_rule.rule if request.url_rule is not None else request.path
+    return 'none'
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_profiler_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('_profiler_started')
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000 if started else 0.0
+
+    for collector in getattr(_local, 'collectors', ()):
+        collector.statements.append(statement)
+
+    threshold_ms = float(os.environ.get('SLOW_QUERY_MS', 200))
+    if elapsed_ms >= threshold_ms:
+        route = _route()
+        slow_queries.inc(route)
+        logger.warning("Slow query (%.1f ms) on %s: %s", elapsed_ms, route, _WHITESPACE.sub(' ', statement)[:500])
+
+    if has_request_context():
+        shapes = g.setdefault('_query_shapes', ShapeCounter())
+        shapes[statement_shape(statement)] += 1
+
+def _report_repeated_shapes(exc=None):
+    shapes = g.pop('_query_shapes', None)
+    if not shapes:
+        return
+    threshold = int(os.environ.get('REPEATED_QUERY_THRESHOLD', 5))
+    route = _route()
+    for shape, count in shapes.items():
+        if count >= threshold:
+            repeated_queries.inc(route)
+            logger.warning("Repeated query shape (%d times, possible N+1) on %s: %s", count, route, shape[:500])
+
+def init_query_profiler(app):
+    """Attach the slow-query log and repeated-shape detection to the app's engine"""
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    app.teardown_request(_report_repeated_shapes)
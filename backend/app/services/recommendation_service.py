@@ -0,0 +1,163 @@
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+from app.models.answer import Answer
+from app.models.question import Question
+from app.services.syllabus_tree import get_syllabus_tree
+
+WEAK_SCORE = 6.0
+STRONG_SCORE = 8.0
+LOW_PRACTICE_COUNT = 5
+STALE_DAYS = int(os.environ.get('RECOMMEND_STALE_DAYS', 21))
+MIN_START_WEIGHTAGE = float(os.environ.get('RECOMMEND_MIN_WEIGHTAGE', 0.8))
+
+def syllabus_statistics(user_id) -> Dict[int, Dict]:
+    """
+    Per-topic and per-subtopic statistics for one user.
+
+    The user's answers are aggregated once per (topic, subtopic) of their
+    questions and joined onto the cached syllabus tree in Python, so
+    never-attempted subtopics come back with zero counts. Returns
+    {topic_id: topic} where each topic has name, weightage, the rolled-up
+    answers_count, scored_count, avg_score and last_practiced, and a
+    'subtopics' list with the same fields.
+    """
+    rows = db.session.query(
+        Question.syllabus_topic_id,
+        Question.syllabus_subtopic_id,
+        func.count(Answer.id).label('answers_count'),
+        func.count(Answer.overall_score).label('scored_count'),
+        func.sum(Answer.overall_score).label('score_sum'),
+        func.max(Answer.submitted_at).label('last_practiced')
+    ).join(
+        Question, Answer.question_id == Question.id
+    ).filter(
+        Answer.user_id == user_id,
+        Question.syllabus_topic_id.isnot(None)
+    ).group_by(
+        Question.syllabus_topic_id, Question.syllabus_subtopic_id
+    ).all()
+    stats = {(row.syllabus_topic_id, row.syllabus_subtopic_id): row for row in rows}
+
+    topics: Dict[int, Dict] = {}
+    for node in get_syllabus_tree().topics:
+        topic = topics[node.id] = {
+            'id': node.id, 'name': node.name, 'weightage': node.weightage,
+            'order_index': node.order_index, 'answers_count': 0, 'scored_count': 0, 'score_sum': 0.0,
+            'last_practiced': None, 'subtopics': []
+        }
+        # Answers to questions tagged with a topic but no subtopic count towards the topic only
+        _add_stats(topic, stats.get((node.id, None)))
+        for subtopic in node.subtopics:
+            row = stats.get((node.id, subtopic.id))
+            _add_stats(topic, row)
+            topic['subtopics'].append({
+                'id': subtopic.id, 'name': subtopic.name, 'weightage': subtopic.weightage,
+                'answers_count': row.answers_count if row else 0,
+                'avg_score': row.score_sum / row.scored_count if row and row.scored_count else None,
+                'last_practiced': row.last_practiced if row else None
+            })
+
+    for topic in topics.values():
+        topic['avg_score'] = topic['score_sum'] / topic['scored_count'] if topic['scored_count'] else None
+    return topics
+
+def _add_stats(topic: Dict, row) -> None:
+    if row is None:
+        return
+    topic['answers_count'] += row.answers_count
+    topic['scored_count'] += row.scored_count or 0
+    topic['score_sum'] += row.score_sum or 0.0
+    topic['last_practiced'] = _latest(topic['last_practiced'], row.last_practiced)
+
+def _latest(first: Optional[datetime], second: Optional[datetime]) -> Optional[datetime]:
+    if first is None or second is None:
+        return first or second
+    return max(first, second)
+
+def build_recommendations(topics: Dict[int, Dict], now: Optional[datetime] = None) -> List[Dict]:
+    """Focus, practice-more, revisit, start and strength items derived from syllabus_statistics"""
+    now = now or datetime.utcnow()
+    attempted = [t for t in topics.values() if t['answers_count']]
+    scored = [t for t in attempted if t['avg_score'] is not None]
+    recommendations = []
+
+    # Weak topics: lowest averages first, heavier topics first on ties
+    for topic in sorted((t for t in scored if t['avg_score'] < WEAK_SCORE),
+                        key=lambda t: (t['avg_score'], -t['weightage']))[:3]:
+        recommendations.append({
+            'type': 'focus_area',
+            'title': f"Focus on {topic['name']}",
+            'description': f"Your average score in {topic['name']} is {topic['avg_score']:.1f}. Consider practicing more questions in this area.",
+            'priority': 'high',
+            'topic_id': topic['id']
+        })
+
+    # Topics with few questions answered
+    for topic in sorted((t for t in attempted if t['answers_count'] < LOW_PRACTICE_COUNT),
+                        key=lambda t: (t['answers_count'], -t['weightage']))[:3]:
+        recommendations.append({
+            'type': 'practice_more',
+            'title': f"Practice More in {topic['name']}",
+            'description': f"You have only answered {topic['answers_count']} questions in {topic['name']}. Try to practice more questions.",
+            'priority': 'medium',
+            'topic_id': topic['id']
+        })
+
+    # Topics not practiced recently and not yet strong
+    listed = {r['topic_id'] for r in recommendations}
+    stale = [
+        t for t in attempted
+        if t['id'] not in listed and t['last_practiced'] and (now - t['last_practiced']).days >= STALE_DAYS
+        and (t['avg_score'] is None or t['avg_score'] < STRONG_SCORE)
+    ]
+    for topic in sorted(stale, key=lambda t: (-t['weightage'], t['last_practiced']))[:2]:
+        days = (now - topic['last_practiced']).days
+        recommendations.append({
+            'type': 'practice_more',
+            'title': f"Revisit {topic['name']}",
+            'description': f"You last practiced {topic['name']} {days} days ago. A few questions now will keep it fresh.",
+            'priority': 'medium',
+            'topic_id': topic['id']
+        })
+
+    # Never-attempted subtopics that carry the most weight
+    unstarted = [
+        (topic, subtopic)
+        for topic in topics.values() for subtopic in topic['subtopics']
+        if not subtopic['answers_count'] and subtopic['weightage'] >= MIN_START_WEIGHTAGE
+    ]
+    for topic, subtopic in sorted(unstarted, key=lambda pair: (
+        -pair[1]['weightage'] * pair[0]['weightage'], pair[0]['order_index'] or 0
+    ))[:3]:
+        recommendations.append({
+            'type': 'not_started',
+            'title': f"Start {subtopic['name']}",
+            'description': f"You haven't attempted {subtopic['name']} in {topic['name']} yet. It carries high weightage in the syllabus.",
+            'priority': 'medium',
+            'topic_id': topic['id'],
+            'subtopic_id': subtopic['id']
+        })
+
+    # Strong topics for confidence building
+    for topic in sorted((t for t in scored if t['avg_score'] >= STRONG_SCORE),
+                        key=lambda t: -t['avg_score'])[:2]:
+        recommendations.append({
+            'type': 'strength',
+            'title': f"Strong Performance in {topic['name']}",
+            'description': f"Excellent work! Your average score in {topic['name']} is {topic['avg_score']:.1f}. Keep up the good work!",
+            'priority': 'low',
+            'topic_id': topic['id']
+        })
+
+    return recommendations
+
+def recommend_for_user(user_id, now: Optional[datetime] = None) -> List[Dict]:
+    """Personalised recommendations from one pass over the user's syllabus statistics"""
+    return build_recommendations(syllabus_statistics(user_id), now)
@@ -0,0 +1,229 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import Response, current_app, request
+from flask_jwt_extended import get_jwt_identity
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+from app.models.content_version import UserDataVersion
+from app.services.instrumentation import Counter, register_metric
+
+# Responses also depend on the clock (today's streak, the last 7 days, staleness),
+# so validators roll over every FRESHNESS_SECONDS. 900 keeps every UTC offset's
+# local midnight on a boundary.
+FRESHNESS_SECONDS = int(os.environ.get('RESPONSE_CACHE_FRESHNESS_SECONDS', 900))
+CACHE_CONTROL = 'private, no-cache'
+
+responses_total = register_metric(Counter(
+    'sociowizard_response_cache_total', 'Cacheable responses by endpoint and outcome', ('endpoint', 'result')
+))
+
+class MemoryResponseCache:
+    """Per-process LRU of response bodies"""
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries: 'OrderedDict[str, Tuple[bytes, str]]' = OrderedDict()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, body: bytes, mimetype: str):
+        with self.lock:
+            self.entries[key] = (body, mimetype)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {'backend': 'memory', 'entries': len(self.entries), 'max_entries': self.max_entries}
+
+class SqliteResponseCache:
+    """Response bodies in a local SQLite file, shared by every server process on the host.
+
+    Oldest entries are evicted first; stale versions are never read again, so
+    they simply age out.
+    """
+    EVICT_EVERY = 100
+
+    def __init__(self, path: str, max_entries: int = 50000):
+        self.path = path
+        self.max_entries = max_entries
+        self.local = threading.local()
+        self.writes = 0
+        with self._connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    mimetype TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_response_cache_stored_at ON response_cache (stored_at)')
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, reopened in forked server workers
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn, self.local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        row = self._connection().execute(
+            'SELECT body, mimetype FROM response_cache WHERE key = ?', (key,)
+        ).fetchone()
+        return (bytes(row[0]), row[1]) if row else None
+
+    def set(self, key: str, body: bytes, mimetype: str):
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO response_cache (key, body, mimetype, stored_at) VALUES (?, ?, ?, ?)',
+            (key, body, mimetype, time.time())
+        )
+        self.writes += 1
+        if self.writes % self.EVICT_EVERY == 0:
+            conn.execute(
+                'DELETE FROM response_cache WHERE key IN '
+                '(SELECT key FROM response_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+    def stats(self) -> Dict:
+        entries = self._connection().execute('SELECT COUNT(*) FROM response_cache').fetchone()[0]
+        return {'backend': 'sqlite', 'path': self.path, 'entries': entries, 'max_entries': self.max_entries}
+
+_response_cache = None
+_response_cache_ready = False
+
+def get_response_cache():
+    """The configured backend (RESPONSE_CACHE_BACKEND: memory, sqlite or off), or None when off"""
+    global _response_cache, _response_cache_ready
+    if not _response_cache_ready:
+        backend = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory').lower()
+        if backend == 'sqlite':
+            _response_cache = SqliteResponseCache(
+                os.environ.get('RESPONSE_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'sociowizard_response_cache.sqlite3')),
+                max_entries=int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 50000))
+            )
+        elif backend == 'memory':
+            _response_cache = MemoryResponseCache(max_entries=int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 5000)))
+        _response_cache_ready = True
+    return _response_cache
+
+def user_data_version(user_id) -> int:
+    """Current version of a user's answer data, 0 before their first write"""
+    return db.session.query(UserDataVersion.version).filter(
+        UserDataVersion.user_id == int(user_id)
+    ).scalar() or 0
+
+def bump_user_data_version(user_id):
+    """Invalidate a user's cached responses; runs in the caller's transaction, which commits"""
+    table = UserDataVersion.__table__
+    now = datetime.utcnow()
+    updated = db.session.execute(
+        table.update().where(table.c.user_id == int(user_id)).values(version=table.c.version + 1, updated_at=now)
+    ).rowcount
+    if not updated:
+        db.session.execute(table.insert().values(user_id=int(user_id), version=1, updated_at=now))
+
+def bump_user_data_versions(user_ids: Optional[Iterable] = None):
+    """Bump several users at once, or every user with a version row when user_ids is None"""
+    table = UserDataVersion.__table__
+    now = datetime.utcnow()
+    if user_ids is None:
+        db.session.execute(table.update().values(version=table.c.version + 1, updated_at=now))
+        return
+    user_ids = {int(user_id) for user_id in user_ids}
+    if not user_ids:
+        return
+    db.session.execute(
+        table.update().where(table.c.user_id.in_(user_ids)).values(version=table.c.version + 1, updated_at=now)
+    )
+    existing = {row[0] for row in db.session.execute(
+        table.select().with_only_columns(table.c.user_id).where(table.c.user_id.in_(user_ids))
+    )}
+    missing = [{'user_id': user_id, 'version': 1, 'updated_at': now} for user_id in user_ids - existing]
+    if missing:
+        db.session.execute(table.insert(), missing)
+
+def _cache_key(user_id, version: int, syllabus_version: int) -> str:
+    parts = [
+        request.path,
+        '&'.join(f'{name}={value}' for name, value in sorted(request.args.items(multi=True))),
+        str(user_id), str(version), str(syllabus_version), str(int(time.time() // FRESHNESS_SECONDS))
+    ]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+def _validated(response: Response, etag: str, outcome: str) -> Response:
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    response.vary.add('Authorization')
+    responses_total.inc(request.endpoint or '', outcome)
+    return response
+
+def cached_response(syllabus: bool = False):
+    """Cache a per-user GET endpoint; apply below @jwt_required().
+
+    The key covers the path, query parameters, the user's data version, the
+    syllabus version when syllabus is set, and the current freshness window.
+    Its hash is a weak ETag: a matching If-None-Match gets a 304 before the
+    view runs, and a stored body is served without recomputing. Only 200
+    responses are stored.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            user_id = get_jwt_identity()
+            # Versions are read before the view, so a stored body is never older than its key
+            version = user_data_version(user_id)
+            syllabus_version = 0
+            if syllabus:
+                from app.services.syllabus_tree import get_syllabus_tree
+                syllabus_version = get_syllabus_tree().version
+            key = _cache_key(user_id, version, syllabus_version)
+            etag = key[:32]
+
+            if request.if_none_match.contains_weak(etag):
+                return _validated(Response(status=304), etag, 'not_modified')
+
+            cache = get_response_cache()
+            entry = None
+            if cache is not None:
+                try:
+                    entry = cache.get(key)
+                except Exception as e:
+                    print(f"Response cache read failed: {e}")
+            if entry is not None:
+                body, mimetype = entry
+                return _validated(Response(body, status=200, mimetype=mimetype), etag, 'hit')
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            if cache is not None:
+                try:
+                    cache.set(key, response.get_data(), response.mimetype)
+                except Exception as e:
+                    print(f"Response cache write failed: {e}")
+            return _validated(response, etag, 'miss')
+        return wrapper
+    return decorator
@@ -0,0 +1,109 @@
+import gzip
+import os
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+from app.services.instrumentation import Counter, register_metric, span
+
+# Optional accelerators; without them responses use the stdlib encoder and gzip
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 4))
+BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/plain', 'text/html', 'text/csv')
+
+compression_bytes = register_metric(Counter(
+    'sociowizard_response_compression_bytes_total',
+    'Bytes of compressed responses before and after encoding', ('encoding', 'stage')
+))
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson.
+
+    Output matches the default provider: sorted keys, compact separators, and
+    indentation in debug. Dates and datetimes are passed to the default
+    provider's fallback, so they stay HTTP dates whether or not orjson is
+    installed. UUIDs and numpy values are encoded natively.
+    """
+    def encode(self, obj, indent: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.encode(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        # Bytes go straight into the response, skipping a decode and re-encode
+        return self._app.response_class(self.encode(obj, indent) + b'\n', mimetype=self.mimetype)
+
+def fast_json_available() -> bool:
+    return orjson is not None
+
+def negotiate_encoding(accept_encodings) -> str:
+    """'br' or 'gzip' when the client accepts it, else None"""
+    if brotli is not None and accept_encodings.quality('br') > 0:
+        return 'br'
+    if accept_encodings.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+def compress_response(response):
+    """Compress buffered text responses above COMPRESS_MIN_BYTES with the client's preferred encoding"""
+    if (response.direct_passthrough or response.is_streamed or response.status_code != 200
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    with span('compress'):
+        compressed = compress(data, encoding)
+    if len(compressed) >= len(data):
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    # A strong validator must change with the bytes; weak ones stay valid across encodings
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        response.headers['ETag'] = f'W/{etag}'
+    compression_bytes.inc(encoding, 'raw', value=len(data))
+    compression_bytes.inc(encoding, 'wire', value=len(compressed))
+    return response
+
+def init_response_encoding(app):
+    """Install the fast JSON provider (unless JSON_PROVIDER=stdlib) and response compression (unless RESPONSE_COMPRESSION=off)"""
+    if fast_json_available() and os.environ.get('JSON_PROVIDER', 'fast') != 'stdlib':
+        app.json = FastJSONProvider(app)
+    if os.environ.get('RESPONSE_COMPRESSION', 'on') != 'off':
+        app.after_request(compress_response)
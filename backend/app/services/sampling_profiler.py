@@ -0,0 +1,175 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from flask import g, request
+
+MAX_PROFILE_SECONDS = 60
+MIN_INTERVAL = 0.001
+
+# Frames where a thread is parked waiting rather than doing work
+IDLE_FUNCTIONS = {
+    ('threading.py', 'wait'), ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'), ('socketserver.py', 'serve_forever'),
+    ('queue.py', 'get'), ('thread.py', '_worker'),
+}
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FUNCTIONS
+
+class SamplingProfiler:
+    """Statistical profiler that samples thread stacks from a timer thread.
+
+    Stacks are aggregated in collapsed form ("root;child;leaf count"), the input
+    format of flamegraph.pl and speedscope.
+    """
+    def __init__(self, interval: float = 0.005, thread_ids: Optional[Iterable[int]] = None,
+                 include_idle: bool = False):
+        self.interval = max(interval, MIN_INTERVAL)
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.include_idle = include_idle
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample_once(self):
+        own_id = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            if self.thread_ids is not None and thread_id not in self.thread_ids:
+                continue
+            if not self.include_idle and _is_idle(frame):
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(labels))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample_once()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def collapsed(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+_whole_process_lock = threading.Lock()
+
+def profile_process(seconds: float, interval: float = 0.005, include_idle: bool = False) -> Optional[SamplingProfiler]:
+    """Sample every thread of the live process for a bounded time.
+
+    Returns None when another whole-process profile is already running.
+    """
+    if not _whole_process_lock.acquire(blocking=False):
+        return None
+    try:
+        profiler = SamplingProfiler(interval=interval, include_idle=include_idle).start()
+        time.sleep(min(max(seconds, 0.1), MAX_PROFILE_SECONDS))
+        return profiler.stop()
+    finally:
+        _whole_process_lock.release()
+
+class RequestProfiler:
+    """Profiles the next N requests handled by one blueprint.
+
+    Each matching request gets its own sampler restricted to the handling thread;
+    the results are merged into one set of collapsed stacks. Every arm() starts a
+    new generation, and requests still running from an earlier one are dropped
+    when they finish.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.blueprint = None
+        self.remaining = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.interval = 0.002
+        self.stacks = Counter()
+        self.samples = 0
+        self.armed_at = None
+        self.generation = 0
+
+    def arm(self, blueprint: str, count: int, interval: float = 0.002):
+        with self.lock:
+            self.blueprint = blueprint
+            self.remaining = count
+            self.in_flight = 0
+            self.completed = 0
+            self.interval = interval
+            self.stacks = Counter()
+            self.samples = 0
+            self.armed_at = time.time()
+            self.generation += 1
+
+    def status(self) -> Dict:
+        with self.lock:
+            return {
+                'blueprint': self.blueprint,
+                'remaining': self.remaining,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'samples': self.samples,
+                'finished': self.blueprint is not None and self.remaining == 0 and self.in_flight == 0,
+                'armed_at': self.armed_at
+            }
+
+    def collapsed(self) -> str:
+        with self.lock:
+            return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def before_request(self):
+        if self.blueprint is None or request.blueprint != self.blueprint:
+            return
+        with self.lock:
+            if request.blueprint != self.blueprint or self.remaining <= 0:
+                return
+            self.remaining -= 1
+            self.in_flight += 1
+            interval = self.interval
+            g._request_profiler_generation = self.generation
+        g._request_profiler = SamplingProfiler(
+            interval=interval, thread_ids=[threading.get_ident()], include_idle=True
+        ).start()
+
+    def teardown_request(self, exc=None):
+        profiler = g.pop('_request_profiler', None)
+        if profiler is None:
+            return
+        profiler.stop()
+        generation = g.pop('_request_profiler_generation', None)
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.stacks.update(profiler.stacks)
+            self.samples += profiler.samples
+            self.in_flight -= 1
+            self.completed += 1
+
+request_profiler = RequestProfiler()
+
+def init_request_profiler(app):
+    """Install the hooks that let admins profile the next N requests to a blueprint"""
+    app.before_request(request_profiler.before_request)
+    app.teardown_request(request_profiler.teardown_request)
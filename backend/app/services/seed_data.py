@@ -5,8 +5,9 @@ from extensions import db
 from app.models.question import Question
 from app.models.user import User
 from app.models.answer import Answer
+from app.services.activity_service import rebuild_activity
+from app.services.concept_index import index_answer
 from datetime import datetime, timedelta
-import random
 
 def seed_sample_data():
     """Seed the database with sample data"""
@@ -149,9 +150,9 @@ def seed_sample_data():
             'sociological_depth_score': 8.2,
             'overall_score': 8.2,
             'feedback': 'Excellent structure with clear introduction and comprehensive coverage. Good use of sociological concepts like intersectionality.',
-            'keywords_used': '["stratification", "caste", "class", "hierarchy", "modernization"]',
-            'thinkers_mentioned': '["Weber", "Marx"]',
-            'theories_referenced': '["conflict theory"]',
+            'keywords_used': ["stratification", "caste", "class", "hierarchy", "modernization"],
+            'thinkers_mentioned': ["Weber", "Marx"],
+            'theories_referenced': ["conflict theory"],
             'topic': 'Caste',
             'submitted_at': datetime.utcnow() - timedelta(days=5)
         },
@@ -163,9 +164,9 @@ def seed_sample_data():
             'sociological_depth_score': 7.8,
             'overall_score': 7.8,
             'feedback': 'Good content with relevant examples. Could improve structure with better transitions between paragraphs.',
-            'keywords_used': '["education", "mobility", "caste", "class", "reservation"]',
-            'thinkers_mentioned': '["Durkheim"]',
-            'theories_referenced': '["structural functionalism"]',
+            'keywords_used': ["education", "mobility", "caste", "class", "reservation"],
+            'thinkers_mentioned': ["Durkheim"],
+            'theories_referenced': ["structural functionalism"],
             'topic': 'Education',
             'submitted_at': datetime.utcnow() - timedelta(days=3)
         }
@@ -177,7 +178,11 @@ def seed_sample_data():
             **a_data
         )
         db.session.add(answer)
+        index_answer(answer)
     
     db.session.commit()
     
+    # Sample answers are backdated, so derive streak and daily activity from history
+    rebuild_activity([sample_user.id])
+    
     print("Sample data seeded successfully!") 
\ No newline at end of file
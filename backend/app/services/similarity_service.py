@@ -1,6 +1,6 @@
 import json
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
@@ -17,9 +17,20 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from extensions import db
 from app.models.topper_answer import TopperAnswer, AnswerSimilarity
 from app.models.answer import Answer
+from app.services.topper_index import get_topper_index
+from app.services.minhash_service import NearDuplicateService
+from app.services.concept_index import index_topper_answer
+from app.services.instrumentation import span
+from app.services.response_cache import bump_user_data_version, bump_user_data_versions
+from app.services.structure_features import (
+    extract_structure_features, load_structure_features, structure_feature_matrix
+)
 
 class SimilarityAnalysisService:
-    def __init__(self):
+    SCORE_KEYS = ('overall_similarity', 'content_similarity', 'keyword_similarity',
+                  'structure_similarity', 'theory_similarity')
+    
+    def __init__(self, top_k: int = None):
         # Download required NLTK data
         try:
             nltk.data.find('tokenizers/punkt')
@@ -38,6 +49,8 @@ class SimilarityAnalysisService:
         
         self.stop_words = set(stopwords.words('english'))
         self.lemmatizer = WordNetLemmatizer()
+        # Number of ranked topper matches kept per analysis
+        self.top_k = top_k or int(os.environ.get('TOPPER_TOP_K', 5))
         self.tfidf_vectorizer = TfidfVectorizer(
             max_features=1000,
             stop_words='english',
@@ -151,17 +164,8 @@ class SimilarityAnalysisService:
         if not text1 or not text2:
             return 0.0
         
-        # Count paragraphs
-        paragraphs1 = len([p for p in text1.split('\n\n') if p.strip()])
-        paragraphs2 = len([p for p in text2.split('\n\n') if p.strip()])
-        
-        # Count sentences
-        sentences1 = len(re.split(r'[.!?]+', text1))
-        sentences2 = len(re.split(r'[.!?]+', text2))
-        
-        # Calculate word count
-        words1 = len(text1.split())
-        words2 = len(text2.split())
+        paragraphs1, sentences1, words1 = extract_structure_features(text1)[:3]
+        paragraphs2, sentences2, words2 = extract_structure_features(text2)[:3]
         
         # Normalize differences
         para_diff = 1 - abs(paragraphs1 - paragraphs2) / max(paragraphs1 + paragraphs2, 1)
@@ -194,6 +198,189 @@ class SimilarityAnalysisService:
         
         return round(overall, 3)
     
+    def content_similarity_matrix(self, user_texts: List[str], topper_texts: List[str]) -> np.ndarray:
+        """TF-IDF cosine similarity of every user text against every topper text.
+        
+        The vectorizer is fitted once over the whole group instead of once per pair.
+        """
+        scores = np.zeros((len(user_texts), len(topper_texts)))
+        if not user_texts or not topper_texts:
+            return scores
+        
+        with span('preprocess'):
+            processed_users = [self.preprocess_text(text) for text in user_texts]
+            processed_toppers = [self.preprocess_text(text) for text in topper_texts]
+        
+        try:
+            with span('tfidf'):
+                vectorizer = TfidfVectorizer(max_features=1000, stop_words='english', ngram_range=(1, 2))
+                tfidf_matrix = vectorizer.fit_transform(processed_toppers + processed_users)
+        except ValueError:
+            # Empty vocabulary, nothing to compare
+            return scores
+        
+        topper_vectors = tfidf_matrix[:len(processed_toppers)]
+        user_vectors = tfidf_matrix[len(processed_toppers):]
+        scores = cosine_similarity(user_vectors, topper_vectors)
+        
+        # Match calculate_content_similarity: empty texts never score
+        scores[[i for i, text in enumerate(processed_users) if not text], :] = 0.0
+        scores[:, [j for j, text in enumerate(processed_toppers) if not text]] = 0.0
+        
+        return scores
+    
+    def jaccard_similarity_matrix(self, sets1: List[List[str]], sets2: List[List[str]]) -> np.ndarray:
+        """Pairwise Jaccard similarity between two lists of term sets"""
+        vocabulary = {term: i for i, term in enumerate(sorted({t for terms in sets1 + sets2 for t in terms}))}
+        if not vocabulary:
+            return np.zeros((len(sets1), len(sets2)))
+        
+        def to_matrix(sets):
+            matrix = np.zeros((len(sets), len(vocabulary)))
+            for row, terms in enumerate(sets):
+                matrix[row, [vocabulary[t] for t in set(terms)]] = 1.0
+            return matrix
+        
+        matrix1 = to_matrix(sets1)
+        matrix2 = to_matrix(sets2)
+        
+        intersection = matrix1 @ matrix2.T
+        union = matrix1.sum(axis=1)[:, None] + matrix2.sum(axis=1)[None, :] - intersection
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(union > 0, intersection / union, 0.0)
+        
+        # Match calculate_keyword_similarity: an empty side scores zero
+        scores[matrix1.sum(axis=1) == 0, :] = 0.0
+        scores[:, matrix2.sum(axis=1) == 0] = 0.0
+        
+        return scores
+    
+    def structure_similarity_matrix(self, user_features: np.ndarray, topper_features: np.ndarray) -> np.ndarray:
+        """Vectorized calculate_structure_similarity over precomputed structure feature rows"""
+        user_counts = structure_feature_matrix(user_features)[:, :3]
+        topper_counts = structure_feature_matrix(topper_features)[:, :3]
+        
+        left = user_counts[:, None, :]
+        right = topper_counts[None, :, :]
+        diffs = 1 - np.abs(left - right) / np.maximum(left + right, 1)
+        
+        scores = diffs @ np.array([0.3, 0.4, 0.3])
+        
+        # Empty texts (no sentences at all) never score
+        scores[user_counts[:, 1] == 0, :] = 0.0
+        scores[:, topper_counts[:, 1] == 0] = 0.0
+        
+        return np.clip(scores, 0.0, 1.0)
+    
+    def score_matrix(self, user_texts: List[str], topper_texts: List[str],
+                     topper_keywords: List[List[str]], topper_theories: List[List[str]],
+                     user_features: List[List[float]] = None,
+                     topper_features: List[List[float]] = None) -> Dict[str, np.ndarray]:
+        """Score every user answer against every topper answer of a question in one pass.
+        
+        Returns one (users x toppers) matrix per similarity dimension, computed with the
+        same formulas and weights as the pairwise calculate_* methods. Stored structure
+        features are used when given, otherwise they are computed from the texts.
+        """
+        user_keywords = [self.extract_keywords(text) for text in user_texts]
+        user_theories = [self.extract_theories(text) for text in user_texts]
+        
+        content = self.content_similarity_matrix(user_texts, topper_texts)
+        keyword = self.jaccard_similarity_matrix(user_keywords, topper_keywords)
+        structure = self.structure_similarity_matrix(
+            user_features or [extract_structure_features(text) for text in user_texts],
+            topper_features or [extract_structure_features(text) for text in topper_texts]
+        )
+        theory = self.jaccard_similarity_matrix(user_theories, topper_theories)
+        
+        overall = np.round(content * 0.4 + keyword * 0.25 + structure * 0.2 + theory * 0.15, 3)
+        
+        return {
+            'overall_similarity': overall,
+            'content_similarity': content,
+            'keyword_similarity': keyword,
+            'structure_similarity': structure,
+            'theory_similarity': theory,
+            'user_keywords': user_keywords,
+            'user_theories': user_theories
+        }
+    
+    def top_k_matches(self, matrices: Dict[str, np.ndarray], row: int, k: int) -> List[Tuple[int, Dict[str, float]]]:
+        """Ranked (topper column, scores) pairs for one user row of a score matrix.
+        
+        Uses a partial sort so only the k best columns are ordered.
+        """
+        overall = matrices['overall_similarity'][row]
+        k = max(1, min(k, overall.shape[0]))
+        
+        if k < overall.shape[0]:
+            candidates = np.argpartition(-overall, k - 1)[:k]
+        else:
+            candidates = np.arange(overall.shape[0])
+        # Stable sort keeps the lowest column first on ties, like the old best-match loop
+        ranked = candidates[np.lexsort((candidates, -overall[candidates]))]
+        
+        return [
+            (int(col), {key: float(matrices[key][row, col]) for key in self.SCORE_KEYS})
+            for col in ranked
+        ]
+    
+    def pack_ranked_matches(self, topper_ids: List[int], matches: List[Tuple[int, Dict[str, float]]]) -> str:
+        """Compact JSON storage for ranked matches: [topper_id, overall, content, keyword, structure, theory]"""
+        return json.dumps(
+            [[topper_ids[col]] + [round(scores[key], 3) for key in self.SCORE_KEYS] for col, scores in matches],
+            separators=(',', ':')
+        )
+    
+    def unpack_ranked_matches(self, packed: str) -> List[Dict]:
+        """Inverse of pack_ranked_matches"""
+        if not packed:
+            return []
+        return [
+            {'topper_answer_id': row[0], 'similarity_scores': dict(zip(self.SCORE_KEYS, row[1:]))}
+            for row in json.loads(packed)
+        ]
+    
+    def best_match_records(self, user_answer_ids: List[int], user_texts: List[str],
+                           topper_answers: List[Dict], user_features: List[List[float]] = None) -> List[Dict]:
+        """Build AnswerSimilarity rows for the best topper match of each user answer.
+        
+        topper_answers are plain dicts with id, answer_text, keywords, theories and
+        structure_features so the method can run in a worker process without a
+        database session.
+        """
+        if not user_answer_ids or not topper_answers:
+            return []
+        
+        matrices = self.score_matrix(
+            user_texts,
+            [t['answer_text'] for t in topper_answers],
+            [t['keywords'] for t in topper_answers],
+            [t['theories'] for t in topper_answers],
+            user_features=user_features,
+            topper_features=[t['structure_features'] for t in topper_answers]
+        )
+        topper_ids = [t['id'] for t in topper_answers]
+        
+        records = []
+        for row, answer_id in enumerate(user_answer_ids):
+            matches = self.top_k_matches(matrices, row, self.top_k)
+            col, scores = matches[0]
+            feedback_text, suggestions = self.generate_feedback(
+                user_texts[row], topper_answers[col]['answer_text'], scores
+            )
+            records.append({
+                'user_answer_id': answer_id,
+                'topper_answer_id': topper_ids[col],
+                **scores,
+                'feedback_text': feedback_text,
+                'improvement_suggestions': suggestions,
+                'ranked_matches': self.pack_ranked_matches(topper_ids, matches)
+            })
+        
+        return records
+    
     def generate_feedback(self, user_answer: str, topper_answer: str, 
                          similarity_scores: Dict[str, float]) -> Tuple[str, List[str]]:
         """Generate personalized feedback based on similarity analysis"""
@@ -243,82 +430,65 @@ class SimilarityAnalysisService:
                 return {'error': 'User answer not found'}
             
             # Get topper answers for the same question
-            topper_answers = TopperAnswer.query.filter_by(question_id=user_answer.question_id).all()
+            topper_answers = TopperAnswer.query.filter_by(question_id=user_answer.question_id).order_by(TopperAnswer.id).all()
             
             if not topper_answers:
                 return {'error': 'No topper answers available for comparison'}
             
-            best_match = None
-            best_similarity = 0.0
+            # Score against every topper answer in one pass and keep the top k
+            matrices = self.score_matrix(
+                [user_answer.answer_text],
+                [t.answer_text for t in topper_answers],
+                [t.keywords_used or [] for t in topper_answers],
+                [t.theories_referenced or [] for t in topper_answers],
+                user_features=[load_structure_features(user_answer.structure_features, user_answer.answer_text)],
+                topper_features=[load_structure_features(t.structure_features, t.answer_text) for t in topper_answers]
+            )
+            matches = self.top_k_matches(matrices, 0, self.top_k)
+            user_keywords = matrices['user_keywords'][0]
+            user_theories = matrices['user_theories'][0]
             
-            for topper_answer in topper_answers:
-                # Calculate similarity scores
-                content_sim = self.calculate_content_similarity(
-                    user_answer.answer_text, topper_answer.answer_text
-                )
-                
-                user_keywords = self.extract_keywords(user_answer.answer_text)
-                topper_keywords = json.loads(topper_answer.keywords_used) if topper_answer.keywords_used else []
-                keyword_sim = self.calculate_keyword_similarity(user_keywords, topper_keywords)
-                
-                structure_sim = self.calculate_structure_similarity(
-                    user_answer.answer_text, topper_answer.answer_text
-                )
-                
-                user_theories = self.extract_theories(user_answer.answer_text)
-                topper_theories = json.loads(topper_answer.theories_referenced) if topper_answer.theories_referenced else []
-                theory_sim = self.calculate_theory_similarity(user_theories, topper_theories)
-                
-                overall_sim = self.calculate_overall_similarity(
-                    content_sim, keyword_sim, structure_sim, theory_sim
-                )
-                
-                # Update best match
-                if overall_sim > best_similarity:
-                    best_similarity = overall_sim
-                    best_match = {
-                        'topper_answer': topper_answer,
-                        'similarity_scores': {
-                            'overall_similarity': overall_sim,
-                            'content_similarity': content_sim,
-                            'keyword_similarity': keyword_sim,
-                            'structure_similarity': structure_sim,
-                            'theory_similarity': theory_sim
-                        }
-                    }
+            best_col, best_scores = matches[0]
+            best_topper = topper_answers[best_col]
             
             # Generate feedback
             feedback_text, suggestions = self.generate_feedback(
                 user_answer.answer_text,
-                best_match['topper_answer'].answer_text,
-                best_match['similarity_scores']
+                best_topper.answer_text,
+                best_scores
             )
             
             # Save similarity analysis
             similarity_record = AnswerSimilarity(
                 user_answer_id=user_answer_id,
-                topper_answer_id=best_match['topper_answer'].id,
-                overall_similarity=best_match['similarity_scores']['overall_similarity'],
-                content_similarity=best_match['similarity_scores']['content_similarity'],
-                structure_similarity=best_match['similarity_scores']['structure_similarity'],
-                keyword_similarity=best_match['similarity_scores']['keyword_similarity'],
-                theory_similarity=best_match['similarity_scores']['theory_similarity'],
+                topper_answer_id=best_topper.id,
+                overall_similarity=best_scores['overall_similarity'],
+                content_similarity=best_scores['content_similarity'],
+                structure_similarity=best_scores['structure_similarity'],
+                keyword_similarity=best_scores['keyword_similarity'],
+                theory_similarity=best_scores['theory_similarity'],
                 feedback_text=feedback_text,
-                improvement_suggestions=json.dumps(suggestions)
+                improvement_suggestions=suggestions,
+                ranked_matches=self.pack_ranked_matches([t.id for t in topper_answers], matches)
             )
             
             db.session.add(similarity_record)
+            bump_user_data_version(user_answer.user_id)
             db.session.commit()
             
             return {
-                'similarity_analysis': {
-                    'overall_similarity': best_match['similarity_scores']['overall_similarity'],
-                    'content_similarity': best_match['similarity_scores']['content_similarity'],
-                    'keyword_similarity': best_match['similarity_scores']['keyword_similarity'],
-                    'structure_similarity': best_match['similarity_scores']['structure_similarity'],
-                    'theory_similarity': best_match['similarity_scores']['theory_similarity']
-                },
-                'topper_answer': best_match['topper_answer'].to_dict(),
+                'similarity_analysis': best_scores,
+                'topper_answer': best_topper.to_dict(),
+                'top_matches': [
+                    {
+                        'rank': position + 1,
+                        'topper_answer_id': topper_answers[col].id,
+                        'topper_name': topper_answers[col].topper_name,
+                        'year': topper_answers[col].year,
+                        'similarity_scores': scores
+                    }
+                    for position, (col, scores) in enumerate(matches)
+                ],
                 'feedback': {
                     'text': feedback_text,
                     'suggestions': suggestions
@@ -331,6 +501,58 @@ class SimilarityAnalysisService:
             print(f"Error in analyze_user_answer: {e}")
             return {'error': 'Failed to analyze answer'}
     
+    def analyze_answers(self, answers: List[Answer]) -> Dict[int, Optional[Dict]]:
+        """Analyze many user answers, scoring each question's answers against its toppers in one pass.
+
+        Saves one AnswerSimilarity row per answer and returns the best match scores by
+        answer id (None when the question has no topper answers).
+        """
+        question_ids = {answer.question_id for answer in answers}
+        toppers_by_question = {}
+        for topper in TopperAnswer.query.filter(TopperAnswer.question_id.in_(question_ids)).order_by(TopperAnswer.id):
+            toppers_by_question.setdefault(topper.question_id, []).append({
+                'id': topper.id,
+                'answer_text': topper.answer_text,
+                'keywords': topper.keywords_used or [],
+                'theories': topper.theories_referenced or [],
+                'structure_features': load_structure_features(topper.structure_features, topper.answer_text)
+            })
+
+        answers_by_question = {}
+        for answer in answers:
+            answers_by_question.setdefault(answer.question_id, []).append(answer)
+
+        results = {answer.id: None for answer in answers}
+        records = []
+        for question_id, group in answers_by_question.items():
+            topper_answers = toppers_by_question.get(question_id)
+            if not topper_answers:
+                continue
+            records.extend(self.best_match_records(
+                [answer.id for answer in group],
+                [answer.answer_text for answer in group],
+                topper_answers,
+                user_features=[load_structure_features(a.structure_features, a.answer_text) for a in group]
+            ))
+
+        for record in records:
+            results[record['user_answer_id']] = {
+                'topper_answer_id': record['topper_answer_id'],
+                'similarity_analysis': {key: record[key] for key in self.SCORE_KEYS},
+                'feedback': {
+                    'text': record['feedback_text'],
+                    'suggestions': record['improvement_suggestions']
+                },
+                'top_matches': self.unpack_ranked_matches(record['ranked_matches'])
+            }
+
+        if records:
+            db.session.bulk_insert_mappings(AnswerSimilarity, records)
+            analyzed = {record['user_answer_id'] for record in records}
+            bump_user_data_versions({answer.user_id for answer in answers if answer.id in analyzed})
+            db.session.commit()
+        return results
+
     def add_topper_answer(self, question_id: int, topper_name: str, year: int,
                          answer_text: str, rank: int = None, marks: float = None) -> Dict:
         """Add a new topper answer to the database"""
@@ -339,7 +561,8 @@ class SimilarityAnalysisService:
             keywords = self.extract_keywords(answer_text)
             thinkers = self.extract_thinkers(answer_text)
             theories = self.extract_theories(answer_text)
-            word_count = len(answer_text.split())
+            structure_features = extract_structure_features(answer_text)
+            word_count = int(structure_features[2])
             
             # Create topper answer
             topper_answer = TopperAnswer(
@@ -349,15 +572,24 @@ class SimilarityAnalysisService:
                 rank=rank,
                 marks_obtained=marks,
                 answer_text=answer_text,
-                keywords_used=json.dumps(keywords),
-                thinkers_mentioned=json.dumps(thinkers),
-                theories_referenced=json.dumps(theories),
-                word_count=word_count
+                keywords_used=keywords,
+                thinkers_mentioned=thinkers,
+                theories_referenced=theories,
+                word_count=word_count,
+                structure_features=json.dumps(structure_features)
             )
             
             db.session.add(topper_answer)
+            NearDuplicateService().index_topper_answer(topper_answer)
+            index_topper_answer(topper_answer)
             db.session.commit()
             
+            # Keep the cross-question nearest-neighbour index in sync
+            try:
+                get_topper_index().add(topper_answer.id, question_id, answer_text)
+            except Exception as e:
+                print(f"Error updating topper answer index: {e}")
+            
             return {
                 'success': True,
                 'topper_answer_id': topper_answer.id,
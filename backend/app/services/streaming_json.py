@@ -0,0 +1,73 @@
+import json
+from typing import Any, List, Tuple
+
+class IncrementalJSONParser:
+    """Extracts top-level fields from a JSON object as its text arrives in chunks.
+
+    Text before the opening brace (e.g. a markdown fence) is ignored. Each call to
+    feed() returns the (key, value) pairs whose values completed within that chunk,
+    so a score can be published as soon as its number is closed by a comma.
+    """
+    def __init__(self):
+        self.buffer = []
+        self.started = False
+        self.finished = False
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.member_start = None
+        self.fields = {}
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        completed = []
+        for char in chunk:
+            if self.finished:
+                break
+            self.buffer.append(char)
+            index = len(self.buffer) - 1
+
+            if not self.started:
+                if char == '{':
+                    self.started = True
+                    self.depth = 1
+                    self.member_start = index + 1
+                continue
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+
+            if char == '"':
+                self.in_string = True
+            elif char in '{[':
+                self.depth += 1
+            elif char in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    self._complete_member(index, completed)
+                    self.finished = True
+            elif char == ',' and self.depth == 1:
+                self._complete_member(index, completed)
+                self.member_start = index + 1
+        return completed
+
+    def _complete_member(self, end: int, completed: List[Tuple[str, Any]]):
+        member = ''.join(self.buffer[self.member_start:end]).strip()
+        if not member:
+            return
+        try:
+            parsed = json.loads('{' + member + '}')
+        except ValueError:
+            return
+        for key, value in parsed.items():
+            self.fields[key] = value
+            completed.append((key, value))
+
+    def result(self):
+        """Every field parsed so far"""
+        return dict(self.fields)
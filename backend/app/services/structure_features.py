@@ -0,0 +1,63 @@
+import json
+import re
+from typing import List, Optional
+
+import numpy as np
+
+# Order of the values in a structure feature vector
+FEATURE_NAMES = [
+    'paragraphs',
+    'sentences',
+    'words',
+    'mean_sentence_length',
+    'has_introduction',
+    'has_conclusion'
+]
+
+INTRODUCTION_MARKERS = [
+    'introduction', 'refers to', 'is defined as', 'can be defined', 'defined as',
+    'the concept of', 'the term', 'according to'
+]
+
+CONCLUSION_MARKERS = [
+    'in conclusion', 'to conclude', 'thus', 'therefore', 'hence', 'in sum',
+    'to sum up', 'overall', 'in the final analysis', 'way forward'
+]
+
+def extract_structure_features(text: str) -> List[float]:
+    """Compute the structure feature vector for a text (see FEATURE_NAMES)"""
+    if not text:
+        return [0.0] * len(FEATURE_NAMES)
+
+    paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
+    # Same sentence split as the original structure similarity, trailing piece included
+    sentence_parts = re.split(r'[.!?]+', text)
+    words = len(text.split())
+    non_empty_sentences = len([s for s in sentence_parts if s.strip()])
+    mean_sentence_length = words / non_empty_sentences if non_empty_sentences else 0.0
+
+    first = paragraphs[0].lower() if paragraphs else ''
+    last = paragraphs[-1].lower() if paragraphs else ''
+    has_introduction = any(marker in first for marker in INTRODUCTION_MARKERS)
+    has_conclusion = len(paragraphs) > 1 and any(marker in last for marker in CONCLUSION_MARKERS)
+
+    return [
+        float(len(paragraphs)),
+        float(len(sentence_parts)),
+        float(words),
+        round(mean_sentence_length, 2),
+        1.0 if has_introduction else 0.0,
+        1.0 if has_conclusion else 0.0
+    ]
+
+def load_structure_features(stored: Optional[str], text: str) -> List[float]:
+    """Decode a stored feature vector, recomputing it for rows written before it existed"""
+    if stored:
+        features = json.loads(stored)
+        if len(features) == len(FEATURE_NAMES):
+            return features
+    return extract_structure_features(text)
+
+def structure_feature_matrix(features: List[List[float]]) -> np.ndarray:
+    """Stack feature vectors into an (n x len(FEATURE_NAMES)) matrix"""
+    return np.asarray(features, dtype=float).reshape(-1, len(FEATURE_NAMES))
@@ -2,12 +2,14 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from extensions import db
+from app.services.content_version import SYLLABUS, bump_content_version
 
 def seed_upsc_sociology_syllabus():
     """Seed the UPSC CSE Sociology syllabus"""
     
     # Import models here to avoid circular imports
     from app.models.syllabus import SyllabusTopic, SyllabusSubtopic
+    from app.services.syllabus_tree import invalidate_syllabus_tree
     
     # Check if syllabus already exists
     if SyllabusTopic.query.first():
@@ -308,5 +310,7 @@ def seed_upsc_sociology_syllabus():
     for subtopic in paper2_subtopics:
         db.session.add(subtopic)
     
+    bump_content_version(db.session, SYLLABUS)
     db.session.commit()
+    invalidate_syllabus_tree()
     print("UPSC CSE Sociology syllabus seeded successfully!") 
\ No newline at end of file
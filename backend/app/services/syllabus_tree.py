@@ -0,0 +1,141 @@
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from extensions import db
+from app.models.content_version import ContentVersion  # Registered so db.create_all creates its table
+from app.models.syllabus import SyllabusTopic, SyllabusSubtopic
+from app.services.content_version import SYLLABUS, read_content_version
+
+# How often each process asks the database whether the syllabus version moved
+VERSION_CHECK_SECONDS = float(os.environ.get('SYLLABUS_VERSION_CHECK_SECONDS', 5))
+
+class SubtopicNode(NamedTuple):
+    id: int
+    name: str
+    code: str
+    description: Optional[str]
+    weightage: float
+    order_index: int
+    topic_id: int
+    topic_name: str
+
+    def to_dict(self) -> Dict:
+        """Same shape as SyllabusSubtopic.to_dict"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'code': self.code,
+            'description': self.description,
+            'weightage': self.weightage,
+            'order_index': self.order_index,
+            'topic_id': self.topic_id,
+            'topic_name': self.topic_name
+        }
+
+class TopicNode(NamedTuple):
+    id: int
+    name: str
+    code: str
+    description: Optional[str]
+    weightage: float
+    order_index: int
+    paper: str
+    subtopics: Tuple[SubtopicNode, ...]
+
+    def to_dict(self) -> Dict:
+        """Same shape as SyllabusTopic.to_dict"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'code': self.code,
+            'description': self.description,
+            'weightage': self.weightage,
+            'order_index': self.order_index,
+            'subtopics_count': len(self.subtopics)
+        }
+
+class SyllabusTree(NamedTuple):
+    """Immutable snapshot of the syllabus, tagged with the content version it was loaded at"""
+    version: int
+    topics: Tuple[TopicNode, ...]  # Ordered by order_index
+    topics_by_id: Mapping[int, TopicNode]
+    topics_by_code: Mapping[str, TopicNode]
+    subtopics_by_id: Mapping[int, SubtopicNode]
+    subtopics_by_code: Mapping[str, SubtopicNode]
+
+    def paper(self, paper: str) -> Tuple[TopicNode, ...]:
+        return tuple(topic for topic in self.topics if topic.paper == paper)
+
+def load_syllabus_tree(version: int) -> SyllabusTree:
+    """Read the whole syllabus in two queries"""
+    topic_rows = db.session.query(
+        SyllabusTopic.id, SyllabusTopic.name, SyllabusTopic.code, SyllabusTopic.description,
+        SyllabusTopic.weightage, SyllabusTopic.order_index, SyllabusTopic.paper
+    ).order_by(SyllabusTopic.order_index, SyllabusTopic.id).all()
+    subtopic_rows = db.session.query(
+        SyllabusSubtopic.id, SyllabusSubtopic.name, SyllabusSubtopic.code, SyllabusSubtopic.description,
+        SyllabusSubtopic.weightage, SyllabusSubtopic.order_index, SyllabusSubtopic.topic_id
+    ).order_by(SyllabusSubtopic.order_index, SyllabusSubtopic.id).all()
+
+    names = {row.id: row.name for row in topic_rows}
+    children: Dict[int, list] = {row.id: [] for row in topic_rows}
+    for row in subtopic_rows:
+        if row.topic_id in children:
+            children[row.topic_id].append(SubtopicNode(
+                row.id, row.name, row.code, row.description,
+                row.weightage if row.weightage is not None else 1.0, row.order_index or 0,
+                row.topic_id, names[row.topic_id]
+            ))
+
+    topics = tuple(
+        TopicNode(
+            row.id, row.name, row.code, row.description,
+            row.weightage if row.weightage is not None else 1.0, row.order_index or 0,
+            row.paper, tuple(children[row.id])
+        )
+        for row in topic_rows
+    )
+    subtopics = [subtopic for topic in topics for subtopic in topic.subtopics]
+    return SyllabusTree(
+        version=version,
+        topics=topics,
+        topics_by_id=MappingProxyType({topic.id: topic for topic in topics}),
+        topics_by_code=MappingProxyType({topic.code: topic for topic in topics}),
+        subtopics_by_id=MappingProxyType({subtopic.id: subtopic for subtopic in subtopics}),
+        subtopics_by_code=MappingProxyType({subtopic.code: subtopic for subtopic in subtopics})
+    )
+
+_tree: Optional[SyllabusTree] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+def get_syllabus_tree() -> SyllabusTree:
+    """
+    The cached syllabus tree. The content version is re-read at most every
+    VERSION_CHECK_SECONDS, so a seed or reorganise run in another process is
+    picked up without a restart.
+    """
+    global _tree, _checked_at
+    tree = _tree
+    if tree is not None and time.monotonic() - _checked_at < VERSION_CHECK_SECONDS:
+        return tree
+
+    with _lock:
+        if _tree is not None and time.monotonic() - _checked_at < VERSION_CHECK_SECONDS:
+            return _tree
+        version = read_content_version(db.engine, SYLLABUS)
+        if _tree is None or _tree.version != version:
+            _tree = load_syllabus_tree(version)
+        _checked_at = time.monotonic()
+        return _tree
+
+def invalidate_syllabus_tree():
+    """Drop this process's copy; the next get_syllabus_tree reloads"""
+    global _tree
+    with _lock:
+        _tree = None
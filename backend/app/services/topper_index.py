@@ -0,0 +1,304 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.random_projection import SparseRandomProjection
+
+# Cross-process locking of the index directory; unavailable on Windows, where
+# only threads of one process are serialised
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Embedding space shared by every topper answer, independent of question
+HASH_FEATURES = 2 ** 16
+EMBEDDING_DIM = 256
+RANDOM_STATE = 42
+# Below this many vectors the index is searched by brute force, without centroids
+MIN_TRAIN_VECTORS = 256
+
+class TextEmbedder:
+    """Stateless text embedder: hashed uni/bi-gram counts projected to a small dense space.
+
+    Nothing is fitted on the corpus, so vectors stay comparable as answers are added.
+    """
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.vectorizer = HashingVectorizer(
+            n_features=HASH_FEATURES,
+            stop_words='english',
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm=None
+        )
+        self.projection = SparseRandomProjection(n_components=dim, dense_output=True, random_state=RANDOM_STATE)
+        self.projection.fit(sparse.csr_matrix((1, HASH_FEATURES)))
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Return L2-normalised float32 vectors, one row per text"""
+        counts = self.vectorizer.transform([text or '' for text in texts])
+        counts.data = np.log1p(counts.data)
+        vectors = np.asarray(self.projection.transform(counts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+def _kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 10) -> np.ndarray:
+    """Spherical k-means on normalised vectors, returns centroids"""
+    rng = np.random.default_rng(RANDOM_STATE)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = (vectors @ centroids.T).argmax(axis=1)
+        for cluster in range(n_clusters):
+            members = vectors[assignments == cluster]
+            if len(members):
+                centroid = members.sum(axis=0)
+                norm = np.linalg.norm(centroid)
+                centroids[cluster] = centroid / norm if norm > 0 else centroid
+    return centroids
+
+class TopperAnswerIndex:
+    """Inverted-file (IVF) nearest-neighbour index over topper answer vectors.
+
+    The base segment lives on disk with vectors stored contiguously per cluster and
+    is memory-mapped on load. Inserts go to a small delta segment that is searched by
+    brute force and merged into the base once it grows past compact_threshold.
+    Writers in every process serialise on an flock of the index directory's lock
+    file; readers take it shared while loading.
+    """
+    def __init__(self, path: str, embedder: Optional[TextEmbedder] = None,
+                 nprobe: int = 8, compact_threshold: int = 1000):
+        self.path = path
+        self.embedder = embedder or TextEmbedder()
+        self.nprobe = nprobe
+        self.compact_threshold = compact_threshold
+        self.lock = threading.Lock()
+        self._loaded_stamp = None
+        self._reset()
+        self.load()
+
+    def _reset(self):
+        dim = self.embedder.dim
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.question_ids = np.zeros(0, dtype=np.int64)
+        self.centroids = np.zeros((0, dim), dtype=np.float32)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.delta_vectors = np.zeros((0, dim), dtype=np.float32)
+        self.delta_ids = np.zeros(0, dtype=np.int64)
+        self.delta_question_ids = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids) + len(self.delta_ids)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _stamp(self):
+        """Modification times of the index files, used to pick up writes from other processes"""
+        stamp = []
+        for name in ('meta.json', 'delta.npz'):
+            try:
+                stamp.append(os.stat(self._file(name)).st_mtime_ns)
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool = True):
+        # Readers of an index that was never written have nothing to lock against
+        if fcntl is None or (not exclusive and not os.path.isdir(self.path)):
+            yield
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._file('.lock'), 'a+b') as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def load(self):
+        """Memory-map the base segment and read the delta segment from disk"""
+        with self._file_lock(exclusive=False):
+            self._load()
+
+    def _load(self):
+        with self.lock:
+            self._reset()
+            if os.path.exists(self._file('meta.json')):
+                self.vectors = np.load(self._file('vectors.npy'), mmap_mode='r')
+                self.ids = np.load(self._file('ids.npy'))
+                self.question_ids = np.load(self._file('question_ids.npy'))
+                self.centroids = np.load(self._file('centroids.npy'))
+                self.offsets = np.load(self._file('offsets.npy'))
+            if os.path.exists(self._file('delta.npz')):
+                with np.load(self._file('delta.npz')) as delta:
+                    self.delta_vectors = delta['vectors']
+                    self.delta_ids = delta['ids']
+                    self.delta_question_ids = delta['question_ids']
+            self._loaded_stamp = self._stamp()
+
+    def _refresh(self):
+        if self._stamp() != self._loaded_stamp:
+            self.load()
+
+    def _save_atomic(self, name: str, writer):
+        # A unique temp name per write, so concurrent writers never share one
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix=f'{name}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                writer(f)
+            os.replace(tmp_path, self._file(name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _write_base(self, vectors, ids, question_ids, centroids):
+        """Sort rows by cluster so each inverted list is one contiguous slice, then persist"""
+        os.makedirs(self.path, exist_ok=True)
+        if len(centroids):
+            assignments = (vectors @ centroids.T).argmax(axis=1)
+        else:
+            assignments = np.zeros(len(vectors), dtype=np.int64)
+        order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=max(len(centroids), 1))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        self._save_atomic('vectors.npy', lambda f: np.save(f, np.ascontiguousarray(vectors[order], dtype=np.float32)))
+        self._save_atomic('ids.npy', lambda f: np.save(f, ids[order].astype(np.int64)))
+        self._save_atomic('question_ids.npy', lambda f: np.save(f, question_ids[order].astype(np.int64)))
+        self._save_atomic('centroids.npy', lambda f: np.save(f, centroids.astype(np.float32)))
+        self._save_atomic('offsets.npy', lambda f: np.save(f, offsets))
+        if os.path.exists(self._file('delta.npz')):
+            os.remove(self._file('delta.npz'))
+        meta = {'count': int(len(ids)), 'nlist': int(len(centroids)), 'dim': self.embedder.dim, 'built_at': time.time()}
+        self._save_atomic('meta.json', lambda f: f.write(json.dumps(meta).encode('utf-8')))
+
+    def build(self, ids: List[int], question_ids: List[int], texts: List[str]) -> Dict:
+        """Rebuild the whole index, retraining the cluster centroids"""
+        vectors = self.embedder.embed(texts) if texts else np.zeros((0, self.embedder.dim), dtype=np.float32)
+        centroids = self._train(vectors)
+
+        with self._file_lock():
+            with self.lock:
+                self._write_base(vectors, np.asarray(ids), np.asarray(question_ids), centroids)
+            self._load()
+
+        return {'count': len(ids), 'nlist': len(centroids)}
+
+    def _train(self, vectors: np.ndarray) -> np.ndarray:
+        """sqrt(n) centroids, or none below MIN_TRAIN_VECTORS"""
+        if len(vectors) < MIN_TRAIN_VECTORS:
+            return np.zeros((0, self.embedder.dim), dtype=np.float32)
+        return _kmeans(vectors, int(np.sqrt(len(vectors))))
+
+    def add(self, topper_answer_id: int, question_id: int, text: str):
+        """Insert one topper answer; merges into the base segment when the delta is large"""
+        vector = self.embedder.embed([text])
+
+        # Refresh, append and save under one lock so concurrent writers never drop an insert
+        with self._file_lock():
+            if self._stamp() != self._loaded_stamp:
+                self._load()
+
+            with self.lock:
+                keep = self.delta_ids != topper_answer_id
+                self.delta_vectors = np.vstack([self.delta_vectors[keep], vector])
+                self.delta_ids = np.append(self.delta_ids[keep], topper_answer_id)
+                self.delta_question_ids = np.append(self.delta_question_ids[keep], question_id)
+
+                self._save_atomic('delta.npz', lambda f: np.savez(
+                    f, vectors=self.delta_vectors, ids=self.delta_ids, question_ids=self.delta_question_ids
+                ))
+                needs_compaction = len(self.delta_ids) >= self.compact_threshold
+
+            if needs_compaction:
+                self._compact()
+            else:
+                self._loaded_stamp = self._stamp()
+
+    def compact(self):
+        """Merge the delta segment into the base"""
+        with self._file_lock():
+            self._load()
+            self._compact()
+
+    def _compact(self):
+        # Existing centroids are reused; an index built too small for them is
+        # trained here once the merged base reaches MIN_TRAIN_VECTORS
+        with self.lock:
+            replaced = np.isin(self.ids, self.delta_ids)
+            vectors = np.vstack([np.asarray(self.vectors)[~replaced], self.delta_vectors])
+            ids = np.concatenate([self.ids[~replaced], self.delta_ids])
+            question_ids = np.concatenate([self.question_ids[~replaced], self.delta_question_ids])
+            centroids = np.asarray(self.centroids) if len(self.centroids) else self._train(vectors)
+            self._write_base(vectors, ids, question_ids, centroids)
+        self._load()
+
+    def search(self, text: str, k: int = 5, exclude_question_id: int = None) -> List[Dict]:
+        """Approximate k nearest topper answers to a text by cosine similarity"""
+        self._refresh()
+        query = self.embedder.embed([text])[0]
+
+        with self.lock:
+            if len(self.centroids):
+                nprobe = min(self.nprobe, len(self.centroids))
+                probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+                rows = np.concatenate([
+                    np.arange(self.offsets[p], self.offsets[p + 1]) for p in probes
+                ]).astype(np.int64)
+            else:
+                rows = np.arange(len(self.ids))
+
+            candidate_vectors = [np.asarray(self.vectors[np.sort(rows)]), self.delta_vectors]
+            candidate_ids = [self.ids[np.sort(rows)], self.delta_ids]
+            candidate_questions = [self.question_ids[np.sort(rows)], self.delta_question_ids]
+
+        vectors = np.vstack(candidate_vectors)
+        ids = np.concatenate(candidate_ids)
+        question_ids = np.concatenate(candidate_questions)
+
+        # Delta entries shadow older base entries for the same topper answer
+        _, last = np.unique(ids[::-1], return_index=True)
+        keep = np.zeros(len(ids), dtype=bool)
+        keep[len(ids) - 1 - last] = True
+        if exclude_question_id is not None:
+            keep &= question_ids != exclude_question_id
+
+        vectors, ids, question_ids = vectors[keep], ids[keep], question_ids[keep]
+        if not len(ids):
+            return []
+
+        scores = vectors @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        return [
+            {'topper_answer_id': int(ids[i]), 'question_id': int(question_ids[i]), 'similarity': round(float(scores[i]), 3)}
+            for i in top
+        ]
+
+_topper_index = None
+_topper_index_lock = threading.Lock()
+
+def get_topper_index() -> TopperAnswerIndex:
+    """Process-wide index, memory-mapped from TOPPER_INDEX_DIR on first use"""
+    global _topper_index
+    if _topper_index is None:
+        with _topper_index_lock:
+            if _topper_index is None:
+                _topper_index = TopperAnswerIndex(
+                    os.environ.get('TOPPER_INDEX_DIR', 'topper_index'),
+                    nprobe=int(os.environ.get('TOPPER_INDEX_NPROBE', 8))
+                )
+    return _topper_index
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Recompute per-user activity state from the answers table.
+
+Streaks and daily activity buckets are maintained incrementally as answers are
+written; run this once after migrate_add_user_streak.py and
+migrate_add_daily_activity.py for existing users, or after importing backdated
+answers.
+
+Usage:
+    python backfill_activity.py [--user-id 12 --user-id 40]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import argparse
+import time
+
+from app.services.activity_service import rebuild_activity
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill practice streaks and daily activity from existing answers')
+    parser.add_argument('--user-id', type=int, action='append', dest='user_ids',
+                        help='Only rebuild this user (repeatable); default is every user')
+    args = parser.parse_args()
+
+    # Import create_app function from app.py
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("app_module", os.path.join(os.path.dirname(__file__), "app.py"))
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+
+    flask_app = app_module.create_app()
+
+    with flask_app.app_context():
+        started = time.perf_counter()
+        rebuilt = rebuild_activity(args.user_ids)
+        print(f"✓ Rebuilt {rebuilt['streaks']} streaks and {rebuilt['days']} daily buckets "
+              f"in {time.perf_counter() - started:.2f}s")
+
+if __name__ == '__main__':
+    main()
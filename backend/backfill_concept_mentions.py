@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Rebuild the concept mention index from stored answers and topper answers.
+
+Mentions are indexed as answers are evaluated and topper answers added; run
+this once after migrate_add_concept_mention.py (and after migrate_json_columns.py
+on older databases), or after importing rows that bypass the write path.
+
+Usage:
+    python backfill_concept_mentions.py [--source answer --source topper]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import argparse
+import time
+
+from app.services.concept_index import rebuild_concept_index
+from app.services.minhash_service import SOURCE_ANSWER, SOURCE_TOPPER
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill the concept mention index from extracted features')
+    parser.add_argument('--source', choices=[SOURCE_ANSWER, SOURCE_TOPPER], action='append', dest='sources',
+                        help='Only rebuild this document type (repeatable); default is both')
+    args = parser.parse_args()
+
+    # Import create_app function from app.py
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("app_module", os.path.join(os.path.dirname(__file__), "app.py"))
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+
+    flask_app = app_module.create_app()
+
+    with flask_app.app_context():
+        started = time.perf_counter()
+        written = rebuild_concept_index(args.sources or (SOURCE_ANSWER, SOURCE_TOPPER))
+        for source_type, count in written.items():
+            print(f"✓ Indexed {count} {source_type} mentions")
+        print(f"✓ Done in {time.perf_counter() - started:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+import importlib.util
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench.db')
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+def create_bench_app(db_path):
+    """Create the Flask app from app.py against a benchmark SQLite database"""
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.abspath(db_path)}"
+    # Repeated GETs with an unchanged data version would otherwise time cache hits, not the queries
+    os.environ['RESPONSE_CACHE_BACKEND'] = 'off'
+
+    spec = importlib.util.spec_from_file_location("app_module", os.path.join(BACKEND_DIR, "app.py"))
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+
+    return app_module.create_app()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for the backend benchmarks.
+
+Builds a SQLite database with users, syllabus topics, questions, topper answers
+and answers. Row counts come from a preset (--scale) and can be overridden
+individually. Generation is deterministic for a given --seed.
+
+Usage:
+    python benchmarks/datagen.py --scale full --db benchmarks/bench.db
+    python benchmarks/datagen.py --users 500 --answers 50000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.common import create_bench_app, DEFAULT_DB
+
+SCALES = {
+    'tiny': {'users': 20, 'questions': 60, 'toppers': 120, 'answers': 2000},
+    'small': {'users': 500, 'questions': 600, 'toppers': 1200, 'answers': 50000},
+    'full': {'users': 10000, 'questions': 3000, 'toppers': 6000, 'answers': 1000000},
+}
+
+TOPICS_PER_PAPER = 10
+SUBTOPICS_PER_TOPIC = 8
+INSERT_CHUNK = 10000
+
+THINKERS = ['karl marx', 'emile durkheim', 'max weber', 'robert merton', 'talcott parsons']
+THEORIES = ['functionalism', 'conflict theory', 'symbolic interactionism', 'feminism', 'postmodernism']
+CONCEPTS = ['socialization', 'social stratification', 'social mobility', 'social change', 'social institutions']
+FILLER = (
+    'society caste class religion family kinship village urban rural migration labour education '
+    'gender tribe modernity tradition development state market community identity power authority '
+    'norms values culture institution structure agency movement inequality globalization'
+).split()
+THEMES = ['Social Stratification', 'Social Change', 'Religion', 'Family', 'Work and Economy', 'Politics', 'Research Methods']
+
+def make_text(rng, min_words, max_words):
+    """Paragraphed pseudo-answer mixing sociology terms and filler words"""
+    vocabulary = FILLER * 4 + THINKERS + THEORIES + CONCEPTS
+    paragraphs = []
+    remaining = rng.randint(min_words, max_words)
+    while remaining > 0:
+        size = min(remaining, rng.randint(40, 90))
+        words = [rng.choice(vocabulary) for _ in range(size)]
+        sentences = [' '.join(words[i:i + 15]).capitalize() + '.' for i in range(0, size, 15)]
+        paragraphs.append(' '.join(sentences))
+        remaining -= size
+    return '\n\n'.join(paragraphs)
+
+def insert_rows(db, table, rows):
+    for start in range(0, len(rows), INSERT_CHUNK):
+        db.session.execute(table.insert(), rows[start:start + INSERT_CHUNK])
+    db.session.commit()
+
+def generate(db_path, users, questions, toppers, answers, seed):
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    app = create_bench_app(db_path)
+    rng = random.Random(seed)
+
+    from extensions import db, bcrypt
+    from app.models.user import User
+    from app.models.question import Question
+    from app.models.answer import Answer
+    from app.models.syllabus import SyllabusTopic, SyllabusSubtopic
+    from app.models.topper_answer import TopperAnswer
+    from app.services.structure_features import extract_structure_features
+
+    started = time.perf_counter()
+    with app.app_context():
+        db.create_all()
+        now = datetime.utcnow()
+
+        # One hash shared by every user, bcrypt per row would dominate generation time
+        password_hash = bcrypt.generate_password_hash('benchmark').decode('utf-8')
+        insert_rows(db, User.__table__, [
+            {'id': i, 'username': f'bench_user_{i}', 'email': f'bench_user_{i}@example.com',
+             'password_hash': password_hash, 'created_at': now, 'updated_at': now}
+            for i in range(1, users + 1)
+        ])
+        print(f"  users: {users}")
+
+        topic_rows, subtopic_rows = [], []
+        for paper_index, paper in enumerate(('PAPER1', 'PAPER2')):
+            for t in range(1, TOPICS_PER_PAPER + 1):
+                topic_id = paper_index * TOPICS_PER_PAPER + t
+                topic_rows.append({
+                    'id': topic_id, 'name': f'{paper} Topic {t}', 'code': f'{paper}_{t}',
+                    'description': f'Synthetic topic {t}', 'weightage': round(rng.uniform(0.4, 1.0), 2),
+                    'order_index': t, 'paper': paper, 'created_at': now
+                })
+                for s in range(1, SUBTOPICS_PER_TOPIC + 1):
+                    subtopic_rows.append({
+                        'id': (topic_id - 1) * SUBTOPICS_PER_TOPIC + s, 'name': f'{paper} Topic {t}.{s}',
+                        'code': f'{paper}_{t}.{s}', 'description': f'Synthetic subtopic {t}.{s}',
+                        'weightage': round(rng.uniform(0.3, 1.0), 2), 'order_index': s,
+                        'topic_id': topic_id, 'created_at': now
+                    })
+        insert_rows(db, SyllabusTopic.__table__, topic_rows)
+        insert_rows(db, SyllabusSubtopic.__table__, subtopic_rows)
+        print(f"  syllabus: {len(topic_rows)} topics, {len(subtopic_rows)} subtopics")
+
+        question_rows = []
+        for i in range(1, questions + 1):
+            subtopic = rng.choice(subtopic_rows)
+            question_rows.append({
+                'id': i, 'question_text': make_text(rng, 12, 30), 'year': rng.randint(2010, 2024),
+                'theme': rng.choice(THEMES), 'topic': f"Topic {subtopic['topic_id']}",
+                'marks': rng.choice([10, 15, 20]), 'created_at': now,
+                'syllabus_topic_id': subtopic['topic_id'], 'syllabus_subtopic_id': subtopic['id']
+            })
+        insert_rows(db, Question.__table__, question_rows)
+        print(f"  questions: {questions}")
+
+        topper_rows = []
+        for i in range(1, toppers + 1):
+            text = make_text(rng, 250, 450)
+            topper_rows.append({
+                'id': i, 'question_id': rng.randint(1, questions), 'topper_name': f'Topper {i}',
+                'year': rng.randint(2010, 2024), 'rank': rng.randint(1, 100),
+                'marks_obtained': round(rng.uniform(100, 160), 1), 'answer_text': text,
+                'keywords_used': [k for k in THINKERS + THEORIES + CONCEPTS if k in text],
+                'thinkers_mentioned': [k for k in THINKERS if k in text],
+                'theories_referenced': [k for k in THEORIES if k in text],
+                'structure_features': json.dumps(extract_structure_features(text)),
+                'word_count': len(text.split()), 'created_at': now, 'updated_at': now
+            })
+        insert_rows(db, TopperAnswer.__table__, topper_rows)
+        print(f"  topper answers: {toppers}")
+
+        # Answers are streamed in chunks to keep memory flat at the full scale
+        question_topics = {q['id']: q['topic'] for q in question_rows}
+        generated = 0
+        while generated < answers:
+            chunk = []
+            for _ in range(min(INSERT_CHUNK, answers - generated)):
+                generated += 1
+                question_id = rng.randint(1, questions)
+                text = make_text(rng, 120, 400)
+                scores = [round(rng.uniform(3, 9.5), 2) for _ in range(3)]
+                submitted_at = now - timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86399))
+                chunk.append({
+                    'id': generated, 'user_id': rng.randint(1, users), 'question_id': question_id,
+                    'answer_text': text, 'structure_score': scores[0], 'content_score': scores[1],
+                    'sociological_depth_score': scores[2], 'overall_score': round(sum(scores) / 3, 2),
+                    'feedback': 'Synthetic feedback.',
+                    'keywords_used': [k for k in CONCEPTS if k in text],
+                    'thinkers_mentioned': [k for k in THINKERS if k in text],
+                    'theories_referenced': [k for k in THEORIES if k in text],
+                    'structure_features': json.dumps(extract_structure_features(text)),
+                    'topic': question_topics[question_id], 'submitted_at': submitted_at,
+                    'evaluated_at': submitted_at
+                })
+            db.session.execute(Answer.__table__.insert(), chunk)
+            db.session.commit()
+            print(f"  answers: {generated}/{answers}", end='\r')
+        print()
+
+        from app.services.activity_service import rebuild_activity
+        rebuilt = rebuild_activity()
+        print(f"  activity: {rebuilt['streaks']} streaks, {rebuilt['days']} daily buckets")
+
+        from app.services.concept_index import rebuild_concept_index
+        mentions = rebuild_concept_index()
+        print(f"  concept mentions: {sum(mentions.values())}")
+
+    print(f"✓ Generated {db_path} in {time.perf_counter() - started:.1f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic benchmark database')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--seed', type=int, default=1)
+    for name in ('users', 'questions', 'toppers', 'answers'):
+        parser.add_argument(f'--{name}', type=int, default=None)
+    args = parser.parse_args()
+
+    counts = dict(SCALES[args.scale])
+    for name in counts:
+        if getattr(args, name) is not None:
+            counts[name] = getattr(args, name)
+
+    generate(args.db, seed=args.seed, **counts)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat-completions API.
+
+Serves POST /v1/chat/completions with schema-valid evaluation or suggestion JSON
+(picked from the prompt), after a latency drawn from a configurable distribution.
+A share of requests can fail with 500s or 429s, and --rpm enforces a per-minute
+request budget the way the real API does. Point the backend at it with:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8090/v1 OPENAI_API_KEY=fake python app.py
+
+Usage:
+    python benchmarks/fake_openai_server.py --latency lognormal:900:0.4 --error-rate 0.02 --rate-limit-rate 0.05
+    python benchmarks/fake_openai_server.py --latency fixed:0 --rpm 600 --seed 7
+
+Requests with "stream": true get chat.completion.chunk server-sent events, one
+small piece of the content every --token-interval-ms after the sampled latency.
+
+GET /stats returns request counts by outcome; POST /stats/reset clears them.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+THINKERS = ['Karl Marx', 'Emile Durkheim', 'Max Weber', 'Robert Merton', 'Talcott Parsons', 'M.N. Srinivas', 'G.S. Ghurye']
+THEORIES = ['Functionalism', 'Conflict theory', 'Symbolic interactionism', 'Structuration', 'Sanskritization']
+CONCEPTS = ['Social stratification', 'Social mobility', 'Anomie', 'Alienation', 'Dominant caste', 'Reference group']
+
+class LatencyModel:
+    """Latency in seconds drawn from fixed, uniform, normal or lognormal distributions.
+
+    Specs are in milliseconds: fixed:MS, uniform:LOW:HIGH, normal:MEAN:SD,
+    lognormal:MEDIAN:SIGMA.
+    """
+    def __init__(self, spec: str, rng: random.Random):
+        parts = spec.split(':')
+        self.kind = parts[0]
+        self.params = [float(p) for p in parts[1:]]
+        self.rng = rng
+        expected = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+        if self.kind not in expected or len(self.params) != expected[self.kind]:
+            raise ValueError(f"Invalid latency spec '{spec}'")
+
+    def sample(self) -> float:
+        if self.kind == 'fixed':
+            ms = self.params[0]
+        elif self.kind == 'uniform':
+            ms = self.rng.uniform(*self.params)
+        elif self.kind == 'normal':
+            ms = self.rng.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            ms = self.rng.lognormvariate(math.log(max(median, 1e-3)), sigma)
+        return max(ms, 0.0) / 1000.0
+
+class FakeOpenAI:
+    """Shared state behind the request handler: randomness, rate limits and stats"""
+    def __init__(self, latency: str, error_rate: float, rate_limit_rate: float, rpm: int, seed: int,
+                 token_interval: float = 0.015):
+        self.token_interval = token_interval
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(latency, self.rng)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm = rpm
+        self.window = deque()
+        self.stats = {}
+
+    def record(self, outcome: str):
+        with self.lock:
+            self.stats[outcome] = self.stats.get(outcome, 0) + 1
+
+    def decide(self):
+        """(outcome, delay seconds) for the next request"""
+        with self.lock:
+            now = time.monotonic()
+            if self.rpm:
+                while self.window and now - self.window[0] >= 60:
+                    self.window.popleft()
+                if len(self.window) >= self.rpm:
+                    return 'rate_limited', 0.0
+                self.window.append(now)
+            roll = self.rng.random()
+            delay = self.latency.sample()
+        if roll < self.rate_limit_rate:
+            return 'rate_limited', 0.0
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 'error', delay
+        return 'ok', delay
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, int(len(text.split()) * 1.3))
+
+def _pick(items, digest, offset, count):
+    return [items[(digest[offset + i]) % len(items)] for i in range(count)]
+
+def evaluation_payload(prompt: str) -> dict:
+    """Deterministic evaluation JSON for a prompt, in the shape ChatGPTService expects"""
+    digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+    structure, content, depth = (round(4 + digest[i] / 255 * 5.5, 1) for i in range(3))
+    return {
+        'structure_score': structure,
+        'content_score': content,
+        'sociological_depth_score': depth,
+        'overall_score': round((structure + content + depth) / 3, 2),
+        'feedback': 'The answer addresses the question with a clear structure. Strengthen it with more '
+                    'thinkers and empirical examples from the Indian context.',
+        'keywords_used': sorted(set(_pick(CONCEPTS, digest, 3, 3))),
+        'thinkers_mentioned': sorted(set(_pick(THINKERS, digest, 6, 2))),
+        'theories_referenced': sorted(set(_pick(THEORIES, digest, 8, 2))),
+        'strengths': ['Relevant introduction', 'Logical flow between paragraphs'],
+        'areas_for_improvement': ['Add a critical evaluation', 'Conclude with a way forward']
+    }
+
+def suggestions_payload(prompt: str) -> dict:
+    """Deterministic suggestions JSON for a prompt"""
+    digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+    return {
+        'structure_suggestions': ['Open with a definition', 'Use subheadings for each dimension'],
+        'content_suggestions': ['Quote recent data', 'Cover both rural and urban contexts'],
+        'theoretical_suggestions': [f"Apply {t}" for t in sorted(set(_pick(THEORIES, digest, 0, 2)))],
+        'examples_to_add': ['Census 2011 figures', 'A field study from Kerala'],
+        'thinkers_to_mention': sorted(set(_pick(THINKERS, digest, 2, 2))),
+        'concepts_to_include': sorted(set(_pick(CONCEPTS, digest, 4, 2)))
+    }
+
+def completion_body(request: dict) -> dict:
+    messages = request.get('messages') or []
+    prompt = '\n'.join(str(m.get('content', '')) for m in messages)
+    payload = suggestions_payload(prompt) if 'structure_suggestions' in prompt else evaluation_payload(prompt)
+    content = json.dumps(payload, indent=2)
+    prompt_tokens = _estimate_tokens(prompt)
+    completion_tokens = _estimate_tokens(content)
+    return {
+        'id': 'chatcmpl-' + hashlib.sha1(f"{prompt}{time.time()}".encode('utf-8')).hexdigest()[:24],
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': request.get('model', 'gpt-4'),
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': content},
+            'finish_reason': 'stop'
+        }],
+        'usage': {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens
+        }
+    }
+
+def stream_chunks(body: dict):
+    """chat.completion.chunk payloads for a streamed completion, content split into word-sized pieces"""
+    base = {'id': body['id'], 'object': 'chat.completion.chunk', 'created': body['created'], 'model': body['model']}
+    yield dict(base, choices=[{'index': 0, 'delta': {'role': 'assistant', 'content': ''}, 'finish_reason': None}])
+    for piece in re.findall(r'\s*\S+', body['choices'][0]['message']['content']):
+        yield dict(base, choices=[{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}])
+    yield dict(base, choices=[{'index': 0, 'delta': {}, 'finish_reason': 'stop'}])
+
+def error_body(message: str, error_type: str, code: str) -> dict:
+    return {'error': {'message': message, 'type': error_type, 'param': None, 'code': code}}
+
+def make_handler(fake: FakeOpenAI):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict, headers: dict = None):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+        def _send_stream(self, body: dict):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for chunk in stream_chunks(body):
+                self._send_chunk(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                if fake.token_interval:
+                    time.sleep(fake.token_interval)
+            self._send_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def do_GET(self):
+            if self.path == '/stats':
+                with fake.lock:
+                    self._send_json(200, dict(fake.stats))
+            elif self.path.rstrip('/') == '/v1/models':
+                self._send_json(200, {'object': 'list', 'data': [{'id': 'gpt-4', 'object': 'model'}]})
+            else:
+                self._send_json(404, error_body('Not found', 'invalid_request_error', 'not_found'))
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+
+            if self.path == '/stats/reset':
+                with fake.lock:
+                    fake.stats.clear()
+                self._send_json(200, {'reset': True})
+                return
+            if self.path.rstrip('/') != '/v1/chat/completions':
+                self._send_json(404, error_body('Not found', 'invalid_request_error', 'not_found'))
+                return
+
+            try:
+                body = json.loads(raw or b'{}')
+            except ValueError:
+                fake.record('bad_request')
+                self._send_json(400, error_body('Invalid JSON body', 'invalid_request_error', None))
+                return
+
+            outcome, delay = fake.decide()
+            if delay:
+                time.sleep(delay)
+            fake.record(outcome)
+
+            if outcome == 'rate_limited':
+                self._send_json(429, error_body('Rate limit reached for requests', 'requests', 'rate_limit_exceeded'),
+                                {'Retry-After': '1', 'x-ratelimit-remaining-requests': '0'})
+            elif outcome == 'error':
+                self._send_json(500, error_body('The server had an error while processing your request.',
+                                                'server_error', None))
+            elif body.get('stream'):
+                self._send_stream(completion_body(body))
+            else:
+                self._send_json(200, completion_body(body))
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description='Local OpenAI-compatible chat-completions server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', default='lognormal:800:0.35',
+                        help='fixed:MS, uniform:LOW:HIGH, normal:MEAN:SD or lognormal:MEDIAN:SIGMA (milliseconds)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with a 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Share of requests answered with a 429')
+    parser.add_argument('--rpm', type=int, default=0, help='Requests per minute before returning 429 (0 = unlimited)')
+    parser.add_argument('--token-interval-ms', type=float, default=15.0,
+                        help='Delay between streamed content chunks when "stream": true')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    fake = FakeOpenAI(args.latency, args.error_rate, args.rate_limit_rate, args.rpm, args.seed,
+                      token_interval=args.token_interval_ms / 1000.0)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fake))
+    server.daemon_threads = True
+    print(f"Fake OpenAI server on http://{args.host}:{args.port}/v1 "
+          f"(latency {args.latency}, errors {args.error_rate:.0%}, 429s {args.rate_limit_rate:.0%}, rpm {args.rpm or 'unlimited'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner for the backend hot paths.
+
+Runs against a database produced by benchmarks/datagen.py. The OpenAI call is
+replaced by a deterministic stub (with optional simulated latency) so runs are
+repeatable and offline; pass --openai-base-url to go through the real client
+against benchmarks/fake_openai_server.py instead. Results are written as JSON; pass --compare with an
+earlier results file to print the change per benchmark and fail on regressions.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output benchmarks/results.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json --fail-threshold 0.2
+    python benchmarks/run_benchmarks.py --only progress --iterations 50
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.common import create_bench_app, DEFAULT_DB
+
+STUB_EVALUATION = {
+    'structure_score': 7.0,
+    'content_score': 6.5,
+    'sociological_depth_score': 6.0,
+    'overall_score': 6.5,
+    'feedback': 'Stubbed evaluation for benchmarking.',
+    'keywords_used': ['socialization', 'social stratification'],
+    'thinkers_mentioned': ['max weber'],
+    'theories_referenced': ['functionalism'],
+    'strengths': [],
+    'areas_for_improvement': []
+}
+
+def install_llm_stub(latency_ms):
+    """Route evaluate_answer through ChatGPTService with the API call replaced"""
+    from app.services.chatgpt_service import ChatGPTService
+
+    def evaluate_answer(self, answer_text, question_text):
+        if latency_ms:
+            time.sleep(latency_ms / 1000.0)
+        return dict(STUB_EVALUATION)
+
+    os.environ['OPENAI_API_KEY'] = 'benchmark-stub'
+    ChatGPTService.evaluate_answer = evaluate_answer
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def measure(name, func, iterations, warmup):
+    """Call func repeatedly and summarise wall-clock latency in milliseconds"""
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - call_started) * 1000)
+    total = time.perf_counter() - started
+
+    timings.sort()
+    result = {
+        'iterations': iterations,
+        'mean_ms': round(statistics.mean(timings), 3),
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'max_ms': round(timings[-1], 3),
+        'ops_per_sec': round(iterations / total, 2) if total else 0.0
+    }
+    print(f"  {name:<40} p50 {result['p50_ms']:>9.2f} ms   p95 {result['p95_ms']:>9.2f} ms   {result['ops_per_sec']:>8.1f} ops/s")
+    return result
+
+def checked_get(client, url, headers):
+    def call():
+        response = client.get(url, headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return call
+
+def encoding_benchmarks(app, client, headers, endpoints):
+    """Encode and compression timings for captured payloads, with bytes on the wire per encoding"""
+    from flask.json.provider import DefaultJSONProvider
+    from app.services.response_encoding import FastJSONProvider, brotli, compress, fast_json_available
+
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app) if fast_json_available() else None
+    benchmarks = []
+    for name, url in endpoints:
+        response = client.get(url, headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        payload = json.loads(response.get_data())
+        body = stdlib.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+        sizes = {'identity': len(body), 'gzip': len(compress(body, 'gzip'))}
+        if brotli is not None:
+            sizes['br'] = len(compress(body, 'br'))
+        print(f"  {name:<40} " + '   '.join(f"{encoding} {size:>9,} B" for encoding, size in sizes.items()))
+
+        benchmarks.append((f'encoding.{name}.stdlib', lambda payload=payload: stdlib.dumps(payload, separators=(',', ':')).encode('utf-8'), sizes))
+        if fast is not None:
+            benchmarks.append((f'encoding.{name}.orjson', lambda payload=payload: fast.encode(payload), sizes))
+        benchmarks.append((f'encoding.{name}.gzip', lambda body=body: compress(body, 'gzip'), sizes))
+        if brotli is not None:
+            benchmarks.append((f'encoding.{name}.br', lambda body=body: compress(body, 'br'), sizes))
+    if fast is None:
+        print("  orjson is not installed, only the stdlib encoder is measured")
+    return benchmarks
+
+def build_benchmarks(app, rng, args):
+    """Map of group -> list of (name, callable) for the selected groups"""
+    from flask_jwt_extended import create_access_token
+    from extensions import db
+    from app.models.answer import Answer
+    from app.models.question import Question
+    from app.models.syllabus import SyllabusTopic
+    from app.models.topper_answer import TopperAnswer
+    from app.services.similarity_service import SimilarityAnalysisService
+
+    client = app.test_client()
+
+    with app.app_context():
+        # The busiest user exercises the progress queries at their worst
+        heavy_user_id, heavy_count = db.session.query(
+            Answer.user_id, db.func.count(Answer.id)
+        ).group_by(Answer.user_id).order_by(db.func.count(Answer.id).desc()).first()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=heavy_user_id)}'}
+
+        question_ids = [qid for (qid,) in db.session.query(TopperAnswer.question_id).distinct()]
+        topic_id = db.session.query(SyllabusTopic.id).order_by(SyllabusTopic.id).first()[0]
+        sample_answer_ids = [
+            answer_id for (answer_id,) in db.session.query(Answer.id).filter(
+                Answer.question_id.in_(question_ids[:200])
+            ).limit(args.iterations + args.warmup)
+        ]
+        submit_texts = [a.answer_text for a in Answer.query.limit(50).all()]
+        search_theme = Question.query.first().theme
+        topper_question_id = db.session.query(TopperAnswer.question_id).group_by(
+            TopperAnswer.question_id
+        ).order_by(db.func.count(TopperAnswer.id).desc()).first()[0]
+
+    print(f"Heavy user {heavy_user_id} with {heavy_count} answers")
+
+    similarity = SimilarityAnalysisService()
+
+    def submit_answer():
+        response = client.post('/api/answers/submit', headers=headers, json={
+            'question_id': rng.choice(question_ids),
+            'answer_text': rng.choice(submit_texts)
+        })
+        if response.status_code != 201:
+            raise RuntimeError(f"submit returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+    def analyze_user_answer():
+        with app.app_context():
+            similarity.analyze_user_answer(rng.choice(sample_answer_ids))
+
+    def preprocess_text():
+        similarity.preprocess_text(rng.choice(submit_texts))
+
+    def encoding():
+        # Payloads are captured lazily so other groups can run without this one
+        with app.app_context():
+            return encoding_benchmarks(app, client, headers, [
+                ('answers_history', '/api/answers/history?limit=100'),
+                ('topper_answers', f'/api/topper-analysis/topper-answers/{topper_question_id}'),
+                ('user_analysis_history', '/api/topper-analysis/user-analysis-history'),
+                ('questions_search', f'/api/questions/search?theme={search_theme}&limit=100'),
+            ])
+
+    return {
+        'answers': [
+            ('answers.submit', submit_answer),
+        ],
+        'similarity': [
+            ('similarity.analyze_user_answer', analyze_user_answer),
+            ('similarity.preprocess_text', preprocess_text),
+        ],
+        'progress': [
+            ('progress.summary', checked_get(client, '/api/progress/summary', headers)),
+            ('progress.timeline', checked_get(client, '/api/progress/timeline', headers)),
+            ('progress.topics', checked_get(client, '/api/progress/topics', headers)),
+            ('progress.streak', checked_get(client, '/api/progress/streak', headers)),
+        ],
+        'syllabus': [
+            ('syllabus.overview', checked_get(client, '/api/syllabus-progress/syllabus-overview', headers)),
+            ('syllabus.topic_subtopics', checked_get(client, f'/api/syllabus-progress/topic/{topic_id}/subtopics', headers)),
+            ('syllabus.strength_analysis', checked_get(client, '/api/syllabus-progress/strength-analysis', headers)),
+            ('syllabus.recommendations', checked_get(client, '/api/syllabus-progress/recommendations', headers)),
+        ],
+        'questions': [
+            ('questions.random', checked_get(client, '/api/questions/random', headers)),
+            ('questions.themes', checked_get(client, '/api/questions/themes', headers)),
+            ('questions.topics', checked_get(client, '/api/questions/topics', headers)),
+            ('questions.years', checked_get(client, '/api/questions/years', headers)),
+            ('questions.search', checked_get(client, f'/api/questions/search?theme={search_theme}&limit=20', headers)),
+        ],
+        'encoding': encoding,
+    }
+
+def compare(results, baseline_path, fail_threshold):
+    """Print the change against a baseline; returns the names that regressed"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['benchmarks']
+
+    regressions = []
+    print(f"\nComparison with {baseline_path} (p50, negative is faster)")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous['p50_ms']:
+            print(f"  {name:<40} (no baseline)")
+            continue
+        change = (current['p50_ms'] - previous['p50_ms']) / previous['p50_ms']
+        marker = ''
+        if change > fail_threshold:
+            marker = '  REGRESSION'
+            regressions.append(name)
+        print(f"  {name:<40} {previous['p50_ms']:>9.2f} -> {current['p50_ms']:>9.2f} ms  {change:+7.1%}{marker}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the backend hot paths')
+    parser.add_argument('--db', default=DEFAULT_DB, help='Database generated by benchmarks/datagen.py')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--only', action='append', choices=['answers', 'similarity', 'progress', 'syllabus', 'questions', 'encoding'],
+                        help='Run only these groups (repeatable)')
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0, help='Simulated latency of the stubbed LLM call')
+    parser.add_argument('--openai-base-url',
+                        help='Call this OpenAI-compatible server (e.g. http://127.0.0.1:8090/v1) instead of stubbing')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--query-warnings', action='store_true',
+                        help='Keep the slow-query and repeated-query log output while benchmarking')
+    parser.add_argument('--output', help='Write results JSON to this path')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    parser.add_argument('--fail-threshold', type=float, default=0.2,
+                        help='Relative p50 slowdown that counts as a regression in --compare mode')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ {args.db} not found, run benchmarks/datagen.py first")
+        sys.exit(1)
+
+    app = create_bench_app(args.db)
+    if not args.query_warnings:
+        logging.getLogger('sociowizard.queries').setLevel(logging.ERROR)
+    if args.openai_base_url:
+        os.environ['OPENAI_BASE_URL'] = args.openai_base_url
+        os.environ.setdefault('OPENAI_API_KEY', 'benchmark-fake')
+    else:
+        install_llm_stub(args.llm_latency_ms)
+    rng = random.Random(args.seed)
+    groups = build_benchmarks(app, rng, args)
+
+    results = {}
+    for group, benchmarks in groups.items():
+        if args.only and group not in args.only:
+            continue
+        print(f"\n[{group}]")
+        if callable(benchmarks):
+            # Encoding benchmarks also report the payload size per encoding
+            for name, func, sizes in benchmarks():
+                results[name] = dict(measure(name, func, args.iterations, args.warmup), bytes=sizes)
+            continue
+        for name, func in benchmarks:
+            results[name] = measure(name, func, args.iterations, args.warmup)
+
+    report = {
+        'created_at': datetime.utcnow().isoformat(),
+        'database': os.path.abspath(args.db),
+        'database_bytes': os.path.getsize(args.db),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'iterations': args.iterations,
+        'llm_latency_ms': args.llm_latency_ms,
+        'openai_base_url': args.openai_base_url,
+        'benchmarks': results
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.fail_threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) above {args.fail_threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✓ No regressions")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Rebuild the nearest-neighbour index over all topper answers.
+
+New topper answers are added to the index incrementally by
+SimilarityAnalysisService.add_topper_answer; run this after bulk imports or to
+retrain the cluster centroids once the corpus has grown.
+
+Usage:
+    python build_topper_index.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import time
+
+from extensions import db
+from app.models.topper_answer import TopperAnswer
+from app.services.topper_index import get_topper_index
+
+def build_topper_index():
+    """Embed every topper answer and write a fresh index to TOPPER_INDEX_DIR"""
+    # Import create_app function from app.py
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("app_module", os.path.join(os.path.dirname(__file__), "app.py"))
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+
+    flask_app = app_module.create_app()
+
+    with flask_app.app_context():
+        rows = db.session.query(
+            TopperAnswer.id, TopperAnswer.question_id, TopperAnswer.answer_text
+        ).order_by(TopperAnswer.id).all()
+
+        started = time.perf_counter()
+        index = get_topper_index()
+        result = index.build(
+            [row.id for row in rows],
+            [row.question_id for row in rows],
+            [row.answer_text for row in rows]
+        )
+        elapsed = time.perf_counter() - started
+
+        print(f"✓ Indexed {result['count']} topper answers into {result['nlist'] or 1} lists "
+              f"at {index.path} in {elapsed:.2f}s")
+
+if __name__ == '__main__':
+    build_topper_index()
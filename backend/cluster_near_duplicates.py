@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate clustering of stored answers and topper answers.
+
+With --backfill, MinHash signatures and LSH buckets are first computed for rows
+written before near-duplicate detection existed. Clusters are then built from
+LSH bucket collisions, verified against the signatures, and printed (or
+written as JSON with --output).
+
+Usage:
+    python cluster_near_duplicates.py [--backfill] [--threshold 0.8] [--output clusters.json]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import argparse
+import json
+import time
+
+from extensions import db
+from app.models.answer import Answer
+from app.models.topper_answer import TopperAnswer
+from app.services.minhash_service import NearDuplicateService, SOURCE_ANSWER
+
+BATCH_SIZE = 500
+
+def backfill(service):
+    """Fingerprint every answer and topper answer that has no signature yet"""
+    for model, index in ((Answer, service.index_answer), (TopperAnswer, service.index_topper_answer)):
+        total = 0
+        started = time.perf_counter()
+        while True:
+            rows = model.query.filter(model.minhash_signature.is_(None)).order_by(model.id).limit(BATCH_SIZE).all()
+            if not rows:
+                break
+            for row in rows:
+                index(row)
+                if row.minhash_signature is None:
+                    # Texts without words get an empty marker so they are not retried
+                    row.minhash_signature = b''
+            db.session.commit()
+            total += len(rows)
+            elapsed = time.perf_counter() - started
+            print(f"  {model.__name__}: {total} fingerprinted ({total / elapsed:.0f}/sec)")
+        print(f"✓ Backfilled {total} {model.__name__} rows")
+
+def main():
+    parser = argparse.ArgumentParser(description='Cluster near-duplicate answers')
+    parser.add_argument('--backfill', action='store_true', help='Fingerprint rows without signatures first')
+    parser.add_argument('--threshold', type=float, default=None, help='Minimum estimated Jaccard similarity')
+    parser.add_argument('--output', default=None, help='Write clusters as JSON to this file')
+    args = parser.parse_args()
+
+    # Import create_app function from app.py
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("app_module", os.path.join(os.path.dirname(__file__), "app.py"))
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+
+    flask_app = app_module.create_app()
+
+    with flask_app.app_context():
+        service = NearDuplicateService(threshold=args.threshold)
+        if args.backfill:
+            backfill(service)
+
+        started = time.perf_counter()
+        clusters = service.cluster()
+        print(f"\nFound {len(clusters)} near-duplicate clusters in {time.perf_counter() - started:.2f}s")
+        for cluster in clusters[:20]:
+            members = ', '.join(f"{'answer' if kind == SOURCE_ANSWER else 'topper'} {doc_id}" for kind, doc_id in cluster)
+            print(f"  [{len(cluster)}] {members}")
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump([[{'source_type': kind, 'source_id': doc_id} for kind, doc_id in c] for c in clusters], f, indent=2)
+            print(f"\nClusters written to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -67,9 +67,12 @@ class Answer(db.Model):
     sociological_depth_score = db.Column(db.Float, nullable=True)
     overall_score = db.Column(db.Float, nullable=True)
     feedback = db.Column(db.Text, nullable=True)
-    keywords_used = db.Column(db.Text, nullable=True)
-    thinkers_mentioned = db.Column(db.Text, nullable=True)
-    theories_referenced = db.Column(db.Text, nullable=True)
+    keywords_used = db.Column(db.JSON(none_as_null=True), nullable=True)
+    thinkers_mentioned = db.Column(db.JSON(none_as_null=True), nullable=True)
+    theories_referenced = db.Column(db.JSON(none_as_null=True), nullable=True)
+    structure_features = db.Column(db.Text, nullable=True)
+    minhash_signature = db.Column(db.LargeBinary, nullable=True)
+    activity_day = db.Column(db.Date, nullable=True)
     topic = db.Column(db.String(100), nullable=True)
     submitted_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     evaluated_at = db.Column(db.DateTime, nullable=True)
@@ -82,9 +85,11 @@ class TopperAnswer(db.Model):
     rank = db.Column(db.Integer, nullable=True)
     marks_obtained = db.Column(db.Float, nullable=True)
     answer_text = db.Column(db.Text, nullable=False)
-    keywords_used = db.Column(db.Text, nullable=True)
-    thinkers_mentioned = db.Column(db.Text, nullable=True)
-    theories_referenced = db.Column(db.Text, nullable=True)
+    keywords_used = db.Column(db.JSON(none_as_null=True), nullable=True)
+    thinkers_mentioned = db.Column(db.JSON(none_as_null=True), nullable=True)
+    theories_referenced = db.Column(db.JSON(none_as_null=True), nullable=True)
+    structure_features = db.Column(db.Text, nullable=True)
+    minhash_signature = db.Column(db.LargeBinary, nullable=True)
     word_count = db.Column(db.Integer, nullable=True)
     structure_score = db.Column(db.Float, nullable=True)
     content_depth = db.Column(db.Float, nullable=True)
@@ -103,9 +108,78 @@ class AnswerSimilarity(db.Model):
     keyword_similarity = db.Column(db.Float, nullable=True)
     theory_similarity = db.Column(db.Float, nullable=True)
     feedback_text = db.Column(db.Text, nullable=True)
-    improvement_suggestions = db.Column(db.Text, nullable=True)
+    improvement_suggestions = db.Column(db.JSON(none_as_null=True), nullable=True)
+    ranked_matches = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
 
+class LshBucket(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    band = db.Column(db.Integer, nullable=False)
+    bucket = db.Column(db.BigInteger, nullable=False)
+    source_type = db.Column(db.String(10), nullable=False)
+    source_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)
+    __table_args__ = (
+        db.Index('ix_lsh_bucket_band_bucket', 'band', 'bucket'),
+        db.Index('ix_lsh_bucket_source', 'source_type', 'source_id'),
+    )
+
+class LLMJob(db.Model):
+    __tablename__ = 'llm_job'
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    owner_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(10), nullable=False)
+    info = db.Column(db.Text, nullable=True)
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.Float, nullable=False)
+    finished_at = db.Column(db.Float, nullable=True)
+    __table_args__ = (
+        db.Index('ix_llm_job_finished_at', 'finished_at'),
+    )
+
+class ConceptMention(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(10), nullable=False)
+    entity = db.Column(db.String(200), nullable=False)
+    source_type = db.Column(db.String(10), nullable=False)
+    source_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)
+    question_id = db.Column(db.Integer, nullable=False)
+    __table_args__ = (
+        db.Index('ix_concept_mention_source', 'source_type', 'source_id'),
+        db.Index('ix_concept_mention_user', 'user_id', 'entity_type', 'entity', 'question_id'),
+        db.Index('ix_concept_mention_question', 'question_id', 'source_type', 'entity_type', 'entity'),
+    )
+
+class UserStreak(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    timezone = db.Column(db.String(64), nullable=False, default='UTC')
+    current_streak = db.Column(db.Integer, nullable=False, default=0)
+    longest_streak = db.Column(db.Integer, nullable=False, default=0)
+    last_active_day = db.Column(db.Date, nullable=True)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+class DailyActivity(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    week_start = db.Column(db.Date, nullable=False)
+    month_start = db.Column(db.Date, nullable=False)
+    answers_count = db.Column(db.Integer, nullable=False, default=0)
+    scored_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+class ContentVersion(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+class UserDataVersion(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
 with app.app_context():
     db.create_all()
     
@@ -0,0 +1,26 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+import os
+
+# Initialize Flask app
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///sociowizard.db')
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Initialize SQLAlchemy
+db = SQLAlchemy(app)
+
+def migrate_add_answer_activity_day():
+    """Add the activity_day column recording which daily bucket each answer was counted in"""
+    with app.app_context():
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(db.text('ALTER TABLE answer ADD COLUMN activity_day DATE'))
+                conn.commit()
+            print("✅ Added activity_day column to answer table")
+            print("ℹ️  Run backfill_activity.py to fill it for existing answers")
+        except Exception as e:
+            print(f"ℹ️  Skipped adding column (may already exist): {e}")
+
+if __name__ == '__main__':
+    migrate_add_answer_activity_day()
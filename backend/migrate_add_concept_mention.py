@@ -0,0 +1,47 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+import os
+
+# Initialize Flask app
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///sociowizard.db')
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Initialize SQLAlchemy
+db = SQLAlchemy(app)
+
+def migrate_add_concept_mention():
+    """Add the concept_mention table indexing extracted keywords, thinkers and theories"""
+    with app.app_context():
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(db.text('''
+                    CREATE TABLE IF NOT EXISTS concept_mention (
+                        id INTEGER PRIMARY KEY,
+                        entity_type VARCHAR(10) NOT NULL,
+                        entity VARCHAR(200) NOT NULL,
+                        source_type VARCHAR(10) NOT NULL,
+                        source_id INTEGER NOT NULL,
+                        user_id INTEGER,
+                        question_id INTEGER NOT NULL
+                    )
+                '''))
+                conn.execute(db.text(
+                    'CREATE INDEX IF NOT EXISTS ix_concept_mention_source ON concept_mention (source_type, source_id)'
+                ))
+                conn.execute(db.text(
+                    'CREATE INDEX IF NOT EXISTS ix_concept_mention_user '
+                    'ON concept_mention (user_id, entity_type, entity, question_id)'
+                ))
+                conn.execute(db.text(
+                    'CREATE INDEX IF NOT EXISTS ix_concept_mention_question '
+                    'ON concept_mention (question_id, source_type, entity_type, entity)'
+                ))
+                conn.commit()
+            print("✅ Created concept_mention table")
+            print("ℹ️  Run backfill_concept_mentions.py to index existing answers and topper answers")
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+
+if __name__ == '__main__':
+    migrate_add_concept_mention()
@@ -0,0 +1,27 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+import os
+from app.services.content_version import CREATE_TABLE
+
+# Initialize Flask app
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///sociowizard.db')
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Initialize SQLAlchemy
+db = SQLAlchemy(app)
+
+def migrate_add_content_version():
+    """Add the content_version table that tells running servers when to reload cached reference data"""
+    with app.app_context():
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(db.text(CREATE_TABLE))
+                conn.commit()
+            print("✅ Created content_version table")
+            print("ℹ️  Seed and reorganise scripts bump the syllabus version; servers pick it up within SYLLABUS_VERSION_CHECK_SECONDS")
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+
+if __name__ == '__main__':
+    migrate_add_content_version()
@@ -0,0 +1,37 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+import os
+
+# Initialize Flask app
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///sociowizard.db')
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Initialize SQLAlchemy
+db = SQLAlchemy(app)
+
+def migrate_add_daily_activity():
+    """Add the daily_activity table of per-user, per-day answer counts and score sums"""
+    with app.app_context():
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(db.text('''
+                    CREATE TABLE IF NOT EXISTS daily_activity (
+                        user_id INTEGER NOT NULL REFERENCES user (id),
+                        day DATE NOT NULL,
+                        week_start DATE NOT NULL,
+                        month_start DATE NOT NULL,
+                        answers_count INTEGER NOT NULL DEFAULT 0,
+                        scored_count INTEGER NOT NULL DEFAULT 0,
+                        score_sum FLOAT NOT NULL DEFAULT 0,
+                        PRIMARY KEY (user_id, day)
+                    )
+                '''))
+                conn.commit()
+            print("✅ Created daily_activity table")
+            print("ℹ️  Run backfill_activity.py to bucket existing answers")
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+
+if __name__ == '__main__':
+    migrate_add_daily_activity()
@@ -0,0 +1,38 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+import os
+
+# Initialize Flask app
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///sociowizard.db')
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Initialize SQLAlchemy
+db = SQLAlchemy(app)
+
+def migrate_add_llm_job():
+    """Add the llm_job table that holds background LLM job state for every server process"""
+    with app.app_context():
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(db.text('''
+                    CREATE TABLE IF NOT EXISTS llm_job (
+                        id VARCHAR(32) PRIMARY KEY,
+                        kind VARCHAR(20) NOT NULL,
+                        owner_id INTEGER NOT NULL,
+                        status VARCHAR(10) NOT NULL,
+                        info TEXT,
+                        result TEXT,
+                        error TEXT,
+                        created_at FLOAT NOT NULL,
+                        finished_at FLOAT
+                    )
+                '''))
+                conn.execute(db.text('CREATE INDEX IF NOT EXISTS ix_llm_job_finished_at ON llm_job (finished_at)'))
+                conn.commit()
+            print("✅ Created llm_job table")
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+
+if __name__ == '__main__':
+    migrate_add_llm_job()
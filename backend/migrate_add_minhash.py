@@ -0,0 +1,46 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+import os
+
+# Initialize Flask app
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///sociowizard.db')
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Initialize SQLAlchemy
+db = SQLAlchemy(app)
+
+def migrate_add_minhash():
+    """Add MinHash signature columns and the LSH bucket table for near-duplicate detection"""
+    with app.app_context():
+        for table in ('answer', 'topper_answer'):
+            try:
+                with db.engine.connect() as conn:
+                    conn.execute(db.text(f'ALTER TABLE {table} ADD COLUMN minhash_signature BLOB'))
+                    conn.commit()
+                print(f"✅ Added minhash_signature column to {table} table")
+            except Exception as e:
+                print(f"ℹ️  Skipped adding column to {table} (may already exist): {e}")
+
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(db.text('''
+                    CREATE TABLE IF NOT EXISTS lsh_bucket (
+                        id INTEGER PRIMARY KEY,
+                        band INTEGER NOT NULL,
+                        bucket BIGINT NOT NULL,
+                        source_type VARCHAR(10) NOT NULL,
+                        source_id INTEGER NOT NULL,
+                        user_id INTEGER
+                    )
+                '''))
+                conn.execute(db.text('CREATE INDEX IF NOT EXISTS ix_lsh_bucket_band_bucket ON lsh_bucket (band, bucket)'))
+                conn.execute(db.text('CREATE INDEX IF NOT EXISTS ix_lsh_bucket_source ON lsh_bucket (source_type, source_id)'))
+                conn.commit()
+            print("✅ Created lsh_bucket table")
+            print("ℹ️  Run cluster_near_duplicates.py --backfill to fingerprint existing answers")
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+
+if __name__ == '__main__':
+    migrate_add_minhash()
@@ -1,6 +1,7 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 import os
+from app.services.content_version import SYLLABUS, bump_content_version
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -24,6 +25,7 @@ def migrate_add_paper_field():
             with db.engine.connect() as conn:
                 conn.execute(db.text("UPDATE syllabus_topic SET paper = 'PAPER1' WHERE code LIKE 'PAPER1%' OR code = 'PAPER1'"))
                 conn.execute(db.text("UPDATE syllabus_topic SET paper = 'PAPER2' WHERE code LIKE 'PAPER2%' OR code = 'PAPER2'"))
+                bump_content_version(conn, SYLLABUS)
                 conn.commit()
             print("✅ Updated existing records with paper field")
             
@@ -43,6 +45,7 @@ def migrate_add_paper_field():
                 with db.engine.connect() as conn:
                     conn.execute(db.text("UPDATE syllabus_topic SET paper = 'PAPER1' WHERE code LIKE 'PAPER1%' OR code = 'PAPER1'"))
                     conn.execute(db.text("UPDATE syllabus_topic SET paper = 'PAPER2' WHERE code LIKE 'PAPER2%' OR code = 'PAPER2'"))
+                    bump_content_version(conn, SYLLABUS)
                     conn.commit()
                 print("✅ Updated existing records with paper field (column already existed)")
             except Exception as e2:
@@ -0,0 +1,26 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+import os
+
+# Initialize Flask app
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///sociowizard.db')
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Initialize SQLAlchemy
+db = SQLAlchemy(app)
+
+def migrate_add_ranked_matches():
+    """Add ranked_matches column to answer_similarity for top-k topper matches"""
+    with app.app_context():
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(db.text('ALTER TABLE answer_similarity ADD COLUMN ranked_matches TEXT'))
+                conn.commit()
+            print("✅ Added ranked_matches column to answer_similarity table")
+            print("ℹ️  Run reanalyze_similarity.py to populate ranked matches for existing answers")
+        except Exception as e:
+            print(f"❌ Migration failed (column may already exist): {e}")
+
+if __name__ == '__main__':
+    migrate_add_ranked_matches()
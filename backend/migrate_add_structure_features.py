@@ -0,0 +1,57 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from app.services.structure_features import extract_structure_features
+
+# Initialize Flask app
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///sociowizard.db')
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Initialize SQLAlchemy
+db = SQLAlchemy(app)
+
+BATCH_SIZE = 1000
+
+def backfill_table(conn, table):
+    """Compute structure features for rows that do not have them yet"""
+    updated = 0
+    while True:
+        rows = conn.execute(db.text(
+            f"SELECT id, answer_text FROM {table} WHERE structure_features IS NULL ORDER BY id LIMIT :limit"
+        ), {'limit': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            db.text(f"UPDATE {table} SET structure_features = :features WHERE id = :id"),
+            [{'id': row[0], 'features': json.dumps(extract_structure_features(row[1] or ''))} for row in rows]
+        )
+        conn.commit()
+        updated += len(rows)
+    return updated
+
+def migrate_add_structure_features():
+    """Add structure_features columns to answer and topper_answer and backfill them"""
+    with app.app_context():
+        for table in ('answer', 'topper_answer'):
+            try:
+                with db.engine.connect() as conn:
+                    conn.execute(db.text(f'ALTER TABLE {table} ADD COLUMN structure_features TEXT'))
+                    conn.commit()
+                print(f"✅ Added structure_features column to {table} table")
+            except Exception as e:
+                print(f"ℹ️  Skipped adding column to {table} (may already exist): {e}")
+
+            try:
+                with db.engine.connect() as conn:
+                    updated = backfill_table(conn, table)
+                print(f"✅ Backfilled structure features for {updated} {table} rows")
+            except Exception as e:
+                print(f"❌ Backfill failed for {table}: {e}")
+
+if __name__ == '__main__':
+    migrate_add_structure_features()
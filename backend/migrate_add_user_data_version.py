@@ -0,0 +1,31 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+import os
+
+# Initialize Flask app
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///sociowizard.db')
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Initialize SQLAlchemy
+db = SQLAlchemy(app)
+
+def migrate_add_user_data_version():
+    """Add the user_data_version table whose counters key the per-user response cache"""
+    with app.app_context():
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(db.text('''
+                    CREATE TABLE IF NOT EXISTS user_data_version (
+                        user_id INTEGER PRIMARY KEY REFERENCES user (id),
+                        version INTEGER NOT NULL DEFAULT 0,
+                        updated_at DATETIME
+                    )
+                '''))
+                conn.commit()
+            print("✅ Created user_data_version table")
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+
+if __name__ == '__main__':
+    migrate_add_user_data_version()
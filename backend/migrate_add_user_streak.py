@@ -0,0 +1,35 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+import os
+
+# Initialize Flask app
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///sociowizard.db')
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Initialize SQLAlchemy
+db = SQLAlchemy(app)
+
+def migrate_add_user_streak():
+    """Add the user_streak table that holds incrementally maintained practice streaks"""
+    with app.app_context():
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(db.text('''
+                    CREATE TABLE IF NOT EXISTS user_streak (
+                        user_id INTEGER PRIMARY KEY REFERENCES user (id),
+                        timezone VARCHAR(64) NOT NULL DEFAULT 'UTC',
+                        current_streak INTEGER NOT NULL DEFAULT 0,
+                        longest_streak INTEGER NOT NULL DEFAULT 0,
+                        last_active_day DATE,
+                        updated_at DATETIME
+                    )
+                '''))
+                conn.commit()
+            print("✅ Created user_streak table")
+            print("ℹ️  Run backfill_activity.py to compute streaks for existing answers")
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+
+if __name__ == '__main__':
+    migrate_add_user_streak()
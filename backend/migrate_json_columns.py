@@ -0,0 +1,99 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+import ast
+import json
+import os
+
+# Initialize Flask app
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///sociowizard.db')
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Initialize SQLAlchemy
+db = SQLAlchemy(app)
+
+BATCH_SIZE = 1000
+JSON_COLUMNS = {
+    'answer': ('keywords_used', 'thinkers_mentioned', 'theories_referenced'),
+    'topper_answer': ('keywords_used', 'thinkers_mentioned', 'theories_referenced'),
+    'answer_similarity': ('improvement_suggestions',),
+}
+
+def normalise(value):
+    """
+    (changed, value) for one stored text value. Valid JSON is kept; Python list
+    reprs written by str() in the old upload path are re-encoded; anything
+    unreadable becomes NULL.
+    """
+    if value is None:
+        return False, None
+    try:
+        json.loads(value)
+        return False, value
+    except ValueError:
+        pass
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return True, None
+    if isinstance(parsed, (list, tuple)):
+        return True, json.dumps([str(item) for item in parsed])
+    return True, None
+
+def normalise_table(conn, table, columns):
+    """Rewrite unparseable values in batches of BATCH_SIZE rows; returns (rows scanned, rows fixed)"""
+    scanned = fixed = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(db.text(
+            f"SELECT id, {', '.join(columns)} FROM {table} WHERE id > :last_id ORDER BY id LIMIT :limit"
+        ), {'last_id': last_id, 'limit': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        updates = []
+        for row in rows:
+            values = {}
+            for column, value in zip(columns, row[1:]):
+                changed, normalised = normalise(value)
+                if changed:
+                    values[column] = normalised
+            if values:
+                updates.append((row[0], values))
+        for row_id, values in updates:
+            assignments = ', '.join(f'{column} = :{column}' for column in values)
+            conn.execute(db.text(f"UPDATE {table} SET {assignments} WHERE id = :id"), dict(values, id=row_id))
+        conn.commit()
+        scanned += len(rows)
+        fixed += len(updates)
+        last_id = rows[-1][0]
+    return scanned, fixed
+
+def migrate_json_columns():
+    """Repair JSON-in-text feature columns and, on PostgreSQL, convert them to native JSON"""
+    with app.app_context():
+        for table, columns in JSON_COLUMNS.items():
+            try:
+                with db.engine.connect() as conn:
+                    scanned, fixed = normalise_table(conn, table, columns)
+                print(f"✅ Checked {scanned} {table} rows, repaired {fixed}")
+            except Exception as e:
+                print(f"❌ Repair failed for {table}: {e}")
+                continue
+
+            # SQLite stores JSON as text, so only PostgreSQL needs the column type changed
+            if db.engine.dialect.name != 'postgresql':
+                continue
+            for column in columns:
+                try:
+                    with db.engine.connect() as conn:
+                        conn.execute(db.text(
+                            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSON USING {column}::json"
+                        ))
+                        conn.commit()
+                    print(f"✅ Converted {table}.{column} to JSON")
+                except Exception as e:
+                    print(f"❌ Converting {table}.{column} failed: {e}")
+        print("ℹ️  Values written as Python lists by the old upload path are now readable JSON")
+
+if __name__ == '__main__':
+    migrate_json_columns()
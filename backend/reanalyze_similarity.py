@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Batch re-analysis of user answers against topper answers.
+
+Recomputes AnswerSimilarity for every answer whose question has topper answers.
+Answers are streamed from the database grouped by question_id, each group is
+scored as one matrix operation in a worker process, and the results are
+bulk-upserted back. Completed questions are written to a checkpoint file so an
+interrupted run can be resumed with --resume.
+
+Usage:
+    python reanalyze_similarity.py [--workers 4] [--question-id 12] [--resume]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from extensions import db
+from app.models.answer import Answer
+from app.models.topper_answer import TopperAnswer, AnswerSimilarity
+from app.services.response_cache import bump_user_data_versions
+from app.services.structure_features import load_structure_features
+
+DEFAULT_CHECKPOINT = 'reanalyze_checkpoint.json'
+UPSERT_CHUNK_SIZE = 500
+
+_worker_service = None
+
+def _init_worker():
+    """Create one similarity service per worker process"""
+    global _worker_service
+    from app.services.similarity_service import SimilarityAnalysisService
+    _worker_service = SimilarityAnalysisService()
+
+def _score_group(payload):
+    """Score all answers of one question against its topper answers (runs in a worker)"""
+    records = _worker_service.best_match_records(
+        payload['answer_ids'],
+        payload['answer_texts'],
+        payload['topper_answers'],
+        user_features=payload['answer_features']
+    )
+    return payload['question_id'], records
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return set(json.load(f).get('completed_question_ids', []))
+
+def save_checkpoint(path, completed):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'completed_question_ids': sorted(completed)}, f)
+    os.replace(tmp_path, path)
+
+def iter_question_groups(question_ids):
+    """Yield one worker payload per question, streaming answers from the database"""
+    for question_id in question_ids:
+        topper_answers = [
+            {
+                'id': topper.id,
+                'answer_text': topper.answer_text,
+                'keywords': topper.keywords_used or [],
+                'theories': topper.theories_referenced or [],
+                'structure_features': load_structure_features(topper.structure_features, topper.answer_text)
+            }
+            for topper in TopperAnswer.query.filter_by(question_id=question_id).order_by(TopperAnswer.id)
+        ]
+
+        answer_ids = []
+        answer_texts = []
+        answer_features = []
+        rows = db.session.query(Answer.id, Answer.answer_text, Answer.structure_features).filter(
+            Answer.question_id == question_id
+        ).order_by(Answer.id).yield_per(1000)
+        for answer_id, answer_text, structure_features in rows:
+            answer_ids.append(answer_id)
+            answer_texts.append(answer_text)
+            answer_features.append(load_structure_features(structure_features, answer_text))
+
+        yield {
+            'question_id': question_id,
+            'answer_ids': answer_ids,
+            'answer_texts': answer_texts,
+            'answer_features': answer_features,
+            'topper_answers': topper_answers
+        }
+
+def upsert_similarities(records):
+    """Replace existing AnswerSimilarity rows for the given answers and invalidate their owners' cached responses"""
+    user_ids = set()
+    for start in range(0, len(records), UPSERT_CHUNK_SIZE):
+        chunk = records[start:start + UPSERT_CHUNK_SIZE]
+        answer_ids = [r['user_answer_id'] for r in chunk]
+        AnswerSimilarity.query.filter(
+            AnswerSimilarity.user_answer_id.in_(answer_ids)
+        ).delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(AnswerSimilarity, chunk)
+        user_ids.update(row[0] for row in db.session.query(Answer.user_id).filter(Answer.id.in_(answer_ids)).distinct())
+    bump_user_data_versions(user_ids)
+    db.session.commit()
+
+def reanalyze(workers, question_id=None, resume=False, checkpoint_path=DEFAULT_CHECKPOINT):
+    query = db.session.query(TopperAnswer.question_id).distinct().order_by(TopperAnswer.question_id)
+    if question_id is not None:
+        query = query.filter(TopperAnswer.question_id == question_id)
+    question_ids = [row[0] for row in query.all()]
+
+    completed = load_checkpoint(checkpoint_path) if resume else set()
+    pending = [qid for qid in question_ids if qid not in completed]
+    print(f"Questions with topper answers: {len(question_ids)} ({len(pending)} pending)")
+
+    started = time.perf_counter()
+    answers_done = 0
+    groups_done = 0
+    in_flight = set()
+
+    def drain(return_when):
+        nonlocal answers_done, groups_done
+        done, _ = wait(in_flight, return_when=return_when)
+        for future in done:
+            in_flight.discard(future)
+            finished_question_id, records = future.result()
+            if records:
+                upsert_similarities(records)
+            completed.add(finished_question_id)
+            save_checkpoint(checkpoint_path, completed)
+
+            answers_done += len(records)
+            groups_done += 1
+            elapsed = time.perf_counter() - started
+            rate = answers_done / elapsed if elapsed > 0 else 0.0
+            print(f"[{groups_done}/{len(pending)}] question {finished_question_id}: "
+                  f"{len(records)} answers ({answers_done} total, {rate:.1f} answers/sec)")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for payload in iter_question_groups(pending):
+            in_flight.add(pool.submit(_score_group, payload))
+            # Keep a bounded number of groups in memory
+            if len(in_flight) >= workers * 2:
+                drain(FIRST_COMPLETED)
+        while in_flight:
+            drain(FIRST_COMPLETED)
+
+    elapsed = time.perf_counter() - started
+    rate = answers_done / elapsed if elapsed > 0 else 0.0
+    print(f"\nRe-analyzed {answers_done} answers across {groups_done} questions "
+          f"in {elapsed:.1f}s ({rate:.1f} answers/sec)")
+
+    return {'answers': answers_done, 'questions': groups_done, 'seconds': elapsed, 'answers_per_sec': rate}
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute topper similarity for stored answers')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    parser.add_argument('--question-id', type=int, default=None, help='Only re-analyze one question')
+    parser.add_argument('--resume', action='store_true', help='Skip questions completed by a previous run')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='Checkpoint file path')
+    args = parser.parse_args()
+
+    # Import create_app function from app.py
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("app_module", os.path.join(os.path.dirname(__file__), "app.py"))
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+
+    flask_app = app_module.create_app()
+
+    with flask_app.app_context():
+        reanalyze(args.workers, args.question_id, args.resume, args.checkpoint)
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 import os
+from app.services.content_version import SYLLABUS, bump_content_version
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -335,6 +336,8 @@ def reorganize_syllabus_hierarchy():
         for subtopic in paper1_subtopics + paper2_subtopics:
             db.session.add(subtopic)
         
+        # Cached syllabus trees in running servers reload on the next version check
+        bump_content_version(db.session, SYLLABUS)
         db.session.commit()
         print("✅ UPSC CSE Sociology syllabus reorganized with proper hierarchy!")
         print(f"📊 Created {SyllabusTopic.query.count()} main topics and {SyllabusSubtopic.query.count()} subtopics")
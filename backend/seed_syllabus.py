@@ -1,6 +1,7 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 import os
+from app.services.content_version import SYLLABUS, bump_content_version
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -105,6 +106,8 @@ def seed_syllabus():
         for subtopic in paper2_subtopics:
             db.session.add(subtopic)
         
+        # Cached syllabus trees in running servers reload on the next version check
+        bump_content_version(db.session, SYLLABUS)
         db.session.commit()
         print("UPSC CSE Sociology syllabus seeded successfully!")
         print(f"Created {SyllabusTopic.query.count()} topics and {SyllabusSubtopic.query.count()} subtopics")
@@ -0,0 +1,78 @@
+"""
+Statement budgets for the dashboard endpoints, checked with assert_max_queries
+against a tiny synthetic database.
+
+Run from backend/:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+# Budgets count the response cache's data-version read; stored bodies would hide the queries
+os.environ['RESPONSE_CACHE_BACKEND'] = 'off'
+
+from benchmarks.common import create_bench_app
+from benchmarks.datagen import SCALES, generate
+
+USER_ID = 3
+
+# Endpoint -> most statements one request may execute, with the syllabus tree already loaded
+BUDGETS = {
+    '/api/progress/summary': 2,
+    '/api/progress/topics': 2,
+    '/api/progress/timeline?days=90&granularity=week': 3,
+    '/api/progress/streak': 2,
+    '/api/syllabus-progress/syllabus-overview': 2,
+    '/api/syllabus-progress/topic/1/subtopics': 3,
+    '/api/syllabus-progress/strength-analysis': 2,
+    '/api/syllabus-progress/recommendations': 2,
+    '/api/progress/concepts': 3,
+}
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    db_path = str(tmp_path_factory.mktemp('budgets') / 'budgets.db')
+    generate(db_path, seed=1, **SCALES['tiny'])
+    app = create_bench_app(db_path)
+    with app.app_context():
+        from app.services.syllabus_tree import get_syllabus_tree
+        get_syllabus_tree()
+    return app
+
+@pytest.fixture(scope='module')
+def auth_headers(app):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity=USER_ID)}'}
+
+@pytest.mark.parametrize('path', sorted(BUDGETS))
+def test_endpoint_query_budget(app, auth_headers, path):
+    from app.services.query_profiler import assert_max_queries
+    client = app.test_client()
+    with assert_max_queries(BUDGETS[path]):
+        response = client.get(path, headers=auth_headers)
+    assert response.status_code == 200
+
+def test_assert_max_queries_reports_overrun(app, auth_headers):
+    from app.services.query_profiler import assert_max_queries
+    with pytest.raises(AssertionError, match='Expected at most 0 queries'):
+        with assert_max_queries(0):
+            app.test_client().get('/api/progress/summary', headers=auth_headers)
+
+def test_collectors_ignore_other_threads(app, auth_headers):
+    from app.services.query_profiler import collect_queries
+    client = app.test_client()
+
+    def request_elsewhere():
+        client.get('/api/progress/summary', headers=auth_headers)
+
+    with collect_queries() as collector:
+        thread = threading.Thread(target=request_elsewhere)
+        thread.start()
+        thread.join()
+    assert collector.count == 0
@@ -449,6 +449,7 @@ const SyllabusProgress = () => {
                   {rec.type === 'focus_area' && <Target className="h-4 w-4 text-red-600" />}
                   {rec.type === 'practice_more' && <TrendingUp className="h-4 w-4 text-yellow-600" />}
                   {rec.type === 'strength' && <Award className="h-4 w-4 text-green-600" />}
+                  {rec.type === 'not_started' && <BookOpen className="h-4 w-4 text-yellow-600" />}
                 </div>
                 <div className="ml-3">
                   <h4 className="font-medium text-gray-900">{rec.title}</h4>
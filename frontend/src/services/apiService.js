@@ -2,6 +2,9 @@ import axios from 'axios';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5001/api';
 
+// Practice streaks roll over at the user's local midnight
+const TIMEZONE = Intl.DateTimeFormat().resolvedOptions().timeZone;
+
 // Create axios instance with default config
 const api = axios.create({
   baseURL: API_BASE_URL,
@@ -16,6 +19,9 @@ api.interceptors.request.use((config) => {
   if (token) {
     config.headers.Authorization = `Bearer ${token}`;
   }
+  if (TIMEZONE) {
+    config.headers['X-Timezone'] = TIMEZONE;
+  }
   return config;
 });
 
@@ -66,6 +72,57 @@ export const apiService = {
     return response.data;
   },
 
+  // Returns 201 data with the evaluation, or 202 data with job_id and local_evaluation
+  async submitAnswerAsync(answerData) {
+    const response = await api.post('/answers/submit/async', answerData);
+    return response.data;
+  },
+
+  async getJob(jobId) {
+    const response = await api.get(`/jobs/${jobId}`);
+    return response.data;
+  },
+
+  // Streams evaluation events: onEvent(eventName, data) for answer, local, tier,
+  // token, field, result, topper_analysis, error and done
+  async submitAnswerStream(answerData, onEvent) {
+    const token = localStorage.getItem('token');
+    const response = await fetch(`${API_BASE_URL}/answers/submit/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(token ? { Authorization: `Bearer ${token}` } : {}),
+        ...(TIMEZONE ? { 'X-Timezone': TIMEZONE } : {}),
+      },
+      body: JSON.stringify(answerData),
+    });
+
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({}));
+      throw new Error(error.error || `Request failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const frame = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        const event = frame.match(/^event: (.*)$/m);
+        const data = frame.match(/^data: (.*)$/m);
+        if (event && data) {
+          onEvent(event[1], JSON.parse(data[1]));
+        }
+      }
+    }
+  },
+
   async getAnswerHistory(filters = {}) {
     const params = new URLSearchParams(filters);
     const response = await api.get(`/answers/history?${params}`);
@@ -115,8 +172,9 @@ export const apiService = {
     return response.data;
   },
 
-  async getProgressTimeline(days = 30) {
-    const response = await api.get(`/progress/timeline?days=${days}`);
+  // granularity: 'day', 'week' or 'month'
+  async getProgressTimeline(days = 30, granularity = 'day') {
+    const response = await api.get(`/progress/timeline?days=${days}&granularity=${granularity}`);
     return response.data;
   },
 